@@ -0,0 +1,5 @@
+-- CreateIndex
+CREATE INDEX IF NOT EXISTS "Grant_updatedAt_idx" ON "Grant"("updatedAt");
+
+-- CreateIndex
+CREATE INDEX IF NOT EXISTS "Grant_title_idx" ON "Grant" USING HASH ("title");
@@ -0,0 +1,12 @@
+-- Duplicate lookups of the incremental cleanup (database-cleanup/cleanup_grants.py):
+-- normalized title and canonical URL keys, as near_duplicates.TITLE_KEY_SQL and
+-- URL_KEY_SQL. The expressions must stay identical to those for the index to be used.
+
+-- CreateIndex
+CREATE INDEX IF NOT EXISTS "Grant_title_key_idx" ON "Grant" ((regexp_replace(lower(normalize(title, NFKD)), '[^a-z0-9]+', '', 'g')));
+
+-- CreateIndex
+CREATE INDEX IF NOT EXISTS "Grant_url_key_idx" ON "Grant" ((NULLIF(regexp_replace(lower(btrim(substring(btrim(url, E' \t\r\n') from '^[^:/?#]+://(?:[^/?#]*@)?(\[[^]/?#]*\]|[^/?#:]*)'), '[]')), '^www\.', ''), '') || NULLIF(rtrim(regexp_replace(regexp_replace(substring(btrim(url, E' \t\r\n') from '^[^:/?#]+://[^/?#]*([^?#]*)'), '/+', '/', 'g'), '/(index|default)\.(html?|php|aspx?)$', '/'), '/') || coalesce('?' || NULLIF(btrim(regexp_replace(regexp_replace('&' || coalesce(substring(btrim(url, E' \t\r\n') from '^[^?#]*\?([^#]*)'), ''), '&(?:utm_\w+|gclid|fbclid|msclkid|mc_cid|mc_eid|ref|src|_ga)(?:=[^&]*)?(?=&|$)', '', 'gi'), '&+', '&', 'g'), '&'), ''), ''), '')));
+
+-- DropIndex (exact-title lookup, replaced by Grant_title_key_idx)
+DROP INDEX IF EXISTS "Grant_title_idx";
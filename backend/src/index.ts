@@ -49,6 +49,9 @@ app.use(cors(corsOptions));
 // make sure OPTIONS preflights are handled globally
 app.options("*", cors(corsOptions));
 
+// Bulk ingest sends many grants per (gzip-compressed) request, so it gets a larger
+// limit; it must be mounted before the global parser, which would otherwise run first.
+app.use("/api/internal/grants/bulk", bodyParser.json({ limit: process.env.BULK_BODY_LIMIT || "25mb" }));
 app.use(bodyParser.json({ limit: "1mb" }));
 
 // ---- routes
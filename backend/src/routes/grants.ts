@@ -395,6 +395,47 @@ function calculateLocationScore(grant: any, profileTokens: string[]): number {
 }
 
 /** =====================  INTERNAL: INSERT / UPSERT  ===================== */
+/** Upsert one scraped grant on (source, sourceId). Shared by the single and bulk routes. */
+async function upsertGrant(data: any) {
+  return prisma.grant.upsert({
+    where: {
+      source_sourceId: {
+        source: data.source,
+        sourceId: data.sourceId ?? data.url ?? "unknown",
+      },
+    },
+    update: {
+      title: data.title,
+      description: data.description,
+      url: data.url,
+      deadline: data.deadline ? new Date(data.deadline) : null,
+      fundingMin: data.fundingMin,
+      fundingMax: data.fundingMax,
+      currency: data.currency,
+      eligibility: data.eligibility,
+      summary: data.summary,
+      aiTitle: data.aiTitle,
+      aiSummary: data.aiSummary,
+      updatedAt: new Date(),
+    },
+    create: {
+      source: data.source,
+      sourceId: data.sourceId ?? data.url ?? "unknown",
+      url: data.url,
+      title: data.title,
+      description: data.description,
+      deadline: data.deadline ? new Date(data.deadline) : null,
+      fundingMin: data.fundingMin,
+      fundingMax: data.fundingMax,
+      currency: data.currency,
+      eligibility: data.eligibility,
+      summary: data.summary,
+      aiTitle: data.aiTitle,
+      aiSummary: data.aiSummary,
+    },
+  });
+}
+
 router.post("/internal/grants", requireInternalToken, async (req: Request, res: Response) => {
   try {
     const data = req.body || {};
@@ -402,43 +443,7 @@ router.post("/internal/grants", requireInternalToken, async (req: Request, res:
       return res.status(400).json({ error: "Missing required fields: title, source" });
     }
 
-    const grant = await prisma.grant.upsert({
-      where: {
-        source_sourceId: {
-          source: data.source,
-          sourceId: data.sourceId ?? data.url ?? "unknown",
-        },
-      },
-      update: {
-        title: data.title,
-        description: data.description,
-        url: data.url,
-        deadline: data.deadline ? new Date(data.deadline) : null,
-        fundingMin: data.fundingMin,
-        fundingMax: data.fundingMax,
-        currency: data.currency,
-        eligibility: data.eligibility,
-        summary: data.summary,
-        aiTitle: data.aiTitle,
-        aiSummary: data.aiSummary,
-        updatedAt: new Date(),
-      },
-      create: {
-        source: data.source,
-        sourceId: data.sourceId ?? data.url ?? "unknown",
-        url: data.url,
-        title: data.title,
-        description: data.description,
-        deadline: data.deadline ? new Date(data.deadline) : null,
-        fundingMin: data.fundingMin,
-        fundingMax: data.fundingMax,
-        currency: data.currency,
-        eligibility: data.eligibility,
-        summary: data.summary,
-        aiTitle: data.aiTitle,
-        aiSummary: data.aiSummary,
-      },
-    });
+    const grant = await upsertGrant(data);
 
     return res.json({ ok: true, id: grant.id });
   } catch (err: any) {
@@ -447,6 +452,91 @@ router.post("/internal/grants", requireInternalToken, async (req: Request, res:
   }
 });
 
+/** =====================  INTERNAL: LIST (KEYSET PAGINATION)  =====================
+ * GET /api/internal/grants?after=<id>&limit=500[&source=...][&include=description]
+ * Returns: { ok, grants: [{ id, source, sourceId, url, title[, description] }], nextCursor[, total] }
+ * Pages are ordered by id; pass nextCursor as `after` until it is null. `total` is
+ * only counted for the first page.
+ */
+const LIST_DEFAULT_LIMIT = 500;
+const LIST_MAX_LIMIT = 5000;
+
+router.get("/internal/grants", requireInternalToken, async (req: Request, res: Response) => {
+  try {
+    const after = typeof req.query.after === "string" && req.query.after ? req.query.after : undefined;
+    const limit = Math.min(Math.max(Number(req.query.limit) || LIST_DEFAULT_LIMIT, 1), LIST_MAX_LIMIT);
+    const source = typeof req.query.source === "string" && req.query.source ? req.query.source : undefined;
+    const include = String(req.query.include || "").split(",");
+
+    const where: any = {};
+    if (source) where.source = source;
+    const grants = await prisma.grant.findMany({
+      where: after ? { ...where, id: { gt: after } } : where,
+      orderBy: { id: "asc" },
+      take: limit,
+      select: {
+        id: true,
+        source: true,
+        sourceId: true,
+        url: true,
+        title: true,
+        description: include.includes("description"),
+      },
+    });
+
+    const nextCursor = grants.length === limit ? grants[grants.length - 1].id : null;
+    const body: any = { ok: true, grants, nextCursor };
+    if (!after) body.total = await prisma.grant.count({ where });
+    return res.json(body);
+  } catch (err: any) {
+    console.error("Error listing grants:", err?.message || err);
+    return res.status(500).json({ ok: false, error: "Failed to list grants" });
+  }
+});
+
+/** =====================  INTERNAL: BULK UPSERT  =====================
+ * POST /api/internal/grants/bulk   (body may be gzip-compressed)
+ * Body: { grants: [ {...same fields as /internal/grants...}, ... ] }
+ * Returns: { ok, count, succeeded, failed, results: [{ index, ok, id } | { index, ok: false, error }] }
+ * Items are independent: one bad grant does not fail the batch.
+ */
+const BULK_MAX_ITEMS = Number(process.env.BULK_MAX_ITEMS || 1000);
+const BULK_CONCURRENCY = Number(process.env.BULK_CONCURRENCY || 10);
+
+router.post("/internal/grants/bulk", requireInternalToken, async (req: Request, res: Response) => {
+  const items: any[] = Array.isArray(req.body) ? req.body : req.body?.grants;
+  if (!Array.isArray(items)) {
+    return res.status(400).json({ error: "Body must be { grants: [...] }" });
+  }
+  if (items.length > BULK_MAX_ITEMS) {
+    return res.status(413).json({ error: `Too many grants in one request (max ${BULK_MAX_ITEMS})` });
+  }
+
+  const results: Array<{ index: number; ok: boolean; id?: string; error?: string }> = new Array(items.length);
+  for (let start = 0; start < items.length; start += BULK_CONCURRENCY) {
+    const slice = items.slice(start, start + BULK_CONCURRENCY);
+    await Promise.all(
+      slice.map(async (data, offset) => {
+        const index = start + offset;
+        if (!data || !data.title || !data.source) {
+          results[index] = { index, ok: false, error: "Missing required fields: title, source" };
+          return;
+        }
+        try {
+          const grant = await upsertGrant(data);
+          results[index] = { index, ok: true, id: grant.id };
+        } catch (err: any) {
+          console.error("Bulk grant insert failed", { index, source: data.source, sourceId: data.sourceId }, err);
+          results[index] = { index, ok: false, error: "Failed to insert grant" };
+        }
+      })
+    );
+  }
+
+  const succeeded = results.filter(r => r.ok).length;
+  return res.json({ ok: true, count: items.length, succeeded, failed: items.length - succeeded, results });
+});
+
 /** =====================  PUBLIC: SIMPLE SEARCH/LIST  =====================
  * POST /api/grants  (auth optional via SKIP_AUTH)
  * Body: { q?: string, limit?: number, offset?: number }
@@ -691,8 +781,10 @@ router.get("/grants/match-scores", requireAuthOrSkip, async (req: Request, res:
   }
 });
 
-/** ---------- grant validation endpoint ---------- */
-router.post("/validate", requireInternalToken, async (req: Request, res: Response) => {
+/** ---------- grant validation endpoint ----------
+ * POST /api/validate and POST /api/internal/grants/validate (the path the scraper uses)
+ */
+async function validateGrants(req: Request, res: Response) {
   try {
     const { grantIds } = req.body;
     
@@ -787,6 +879,9 @@ router.post("/validate", requireInternalToken, async (req: Request, res: Respons
     console.error("Grant validation error:", error);
     return res.status(500).json({ error: "Failed to validate grants" });
   }
-});
+}
+
+router.post("/validate", requireInternalToken, validateGrants);
+router.post("/internal/grants/validate", requireInternalToken, validateGrants);
 
 export default router;
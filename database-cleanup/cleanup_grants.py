@@ -6,8 +6,11 @@ This script connects to the Neon PostgreSQL database and:
 1. Identifies and removes "fake" grants (test data, placeholders)
 2. Identifies and marks expired grants (past deadline)
 3. Validates grant URLs and removes invalid ones
-4. Removes duplicate grants
+4. Removes near-duplicate grants, keeping the most complete one of each group
 5. Provides a summary of cleanup actions
+
+Runs are incremental: only grants updated since the last completed live run are
+classified (watermark in cleanup_state.json). Use --full to rescan the whole table.
 """
 
 import os
@@ -15,9 +18,12 @@ import sys
 import psycopg2
 from psycopg2.extras import RealDictCursor
 from datetime import datetime, timedelta
-import requests
 from urllib.parse import urlparse
+import csv
+import io
+import json
 import re
+import time
 
 # Configuration
 DATABASE_URL = os.environ.get('DATABASE_URL')
@@ -46,6 +52,190 @@ FAKE_DOMAINS = [
     'test.org',
 ]
 
+MIN_TITLE_LENGTH = 10
+
+# One alternation per check, so each row is scanned once instead of once per pattern.
+# The syntax is shared by Python re and PostgreSQL regular expressions. The Python
+# side matches lowercased text (the patterns are lowercase): re.IGNORECASE is several
+# times slower on long descriptions.
+FAKE_PATTERN = '(' + '|'.join(f'(?:{p})' for p in FAKE_PATTERNS) + ')'
+FAKE_DOMAIN_PATTERN = '(' + '|'.join(re.escape(d) for d in FAKE_DOMAINS) + ')'
+FAKE_RE = re.compile(FAKE_PATTERN)
+FAKE_DOMAIN_RE = re.compile(FAKE_DOMAIN_PATTERN)
+
+# Fake-grant checks evaluated in PostgreSQL: only the matched text comes back,
+# never the full description
+_SHORT_TITLE_SQL = "(title <> '' AND length(btrim(title, E' \\t\\r\\n')) < %(min_title)s)"
+FAKE_COLUMNS_SQL = f'''
+           (regexp_match(title, %(pattern)s, 'i'))[1] AS title_match,
+           (regexp_match(description, %(pattern)s, 'i'))[1] AS description_match,
+           CASE WHEN host ~* %(domains)s THEN host END AS fake_domain,
+           {_SHORT_TITLE_SQL} AS short_title'''
+FAKE_PARAMS = {'pattern': FAKE_PATTERN, 'domains': FAKE_DOMAIN_PATTERN, 'min_title': MIN_TITLE_LENGTH}
+
+# Duplicates: near_duplicates.py groups the candidates from duplicate_candidates_query
+# How complete a grant is; the most complete grant of a duplicate group is kept
+COMPLETENESS_SQL = '''(
+             (CASE WHEN length(description) >= 200 THEN 2 WHEN description <> '' THEN 1 ELSE 0 END)
+           + (deadline IS NOT NULL)::int
+           + ("fundingMin" IS NOT NULL OR "fundingMax" IS NOT NULL)::int
+           + (COALESCE(eligibility, '') <> '')::int
+           + (COALESCE(summary, "aiSummary", '') <> '')::int
+           + (COALESCE(url, '') <> '')::int
+           + ("agencyId" IS NOT NULL)::int
+           + COALESCE("isValid", true)::int
+           )'''
+
+
+def scan_query(since=None, in_python=False):
+    """
+    SQL for GrantCleaner.scan: every classifier's inputs per row, over the whole table
+    or only grants updated after `since` (bound as %(since)s). With in_python the
+    description is returned for classify_fake instead of the fake-grant columns.
+    """
+    where = 'WHERE "updatedAt" > %(since)s' if since else ''
+    if in_python:
+        return f'''
+    SELECT id, title, url, deadline, "updatedAt", description
+    FROM "Grant" g
+    {where}
+'''
+    return f'''
+    SELECT id, title, url, deadline, "updatedAt",{FAKE_COLUMNS_SQL}
+    FROM (
+        SELECT *, substring(url from '^[^:/?#]+://([^/?#]*)') AS host
+        FROM "Grant"
+        {where}
+    ) g
+'''
+
+
+# Rule 3 (similar titles) buckets of every grant, filled by a full scan; grouped in SQL
+_LSH_TABLE_SQL = '''
+    DROP TABLE IF EXISTS grant_lsh;
+    CREATE TEMP TABLE grant_lsh (id TEXT NOT NULL, band SMALLINT NOT NULL, key BIGINT NOT NULL)
+'''
+
+
+def duplicate_candidates_query(since=None):
+    """
+    SQL for the grants that can be near-duplicates: those sharing a normalized title,
+    a canonical URL (in a group of 2 to MAX_URL_GROUP) or an LSH bucket in grant_lsh
+    with another grant, as near_duplicates rows, oldest first. The URL is only returned
+    where its URL group counts, so duplicate_groups sees the same URL groups as the table.
+
+    With `since`, only the title and URL groups of grants updated after it: their keys
+    are looked up in the whole table through the expression indexes of
+    backend/prisma/migrations/2_grant_duplicate_keys, and grant_lsh is not used.
+    """
+    from near_duplicates import TITLE_KEY_SQL, URL_KEY_SQL
+    changed, where, lsh_join, lsh_match = '', '', '', ''
+    if since:
+        changed = f'''
+    WITH changed AS (
+        SELECT {TITLE_KEY_SQL} AS title_key, {URL_KEY_SQL} AS url_key
+        FROM "Grant" WHERE "updatedAt" > %(since)s
+    )'''
+        where = f'''
+            WHERE {TITLE_KEY_SQL} = ANY (ARRAY(SELECT title_key FROM changed))
+               OR {URL_KEY_SQL} = ANY (ARRAY(SELECT url_key FROM changed WHERE url_key IS NOT NULL))'''
+    else:
+        lsh_join = '''
+    LEFT JOIN (
+        SELECT DISTINCT id FROM (SELECT id, count(*) OVER (PARTITION BY band, key) AS n FROM grant_lsh) b WHERE n > 1
+    ) lsh ON lsh.id = c.id'''
+        lsh_match = ' OR lsh.id IS NOT NULL'
+    return f'''{changed}
+    SELECT c.id, title, CASE WHEN url_group THEN url END AS url, "createdAt", completeness
+    FROM (
+        SELECT *, count(*) OVER (PARTITION BY title_key) > 1 AS title_group,
+               url_key IS NOT NULL AND count(*) OVER (PARTITION BY url_key) BETWEEN 2 AND %(max_url)s AS url_group
+        FROM (
+            SELECT id, title, url, "createdAt", {COMPLETENESS_SQL} AS completeness,
+                   {TITLE_KEY_SQL} AS title_key, {URL_KEY_SQL} AS url_key
+            FROM "Grant"{where}
+        ) k
+    ) c{lsh_join}
+    WHERE title_group OR url_group{lsh_match}
+    ORDER BY "createdAt", c.id
+'''
+
+
+# Incremental runs: newest updatedAt already classified, kept between runs. Rows
+# committed late can carry an older updatedAt, so each run re-reads a small overlap.
+STATE_FILE = os.environ.get('CLEANUP_STATE_FILE', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cleanup_state.json'))
+WATERMARK_OVERLAP = timedelta(minutes=int(os.environ.get('CLEANUP_WATERMARK_OVERLAP_MIN', '10')))
+# Rows fetched per round trip by the server-side scan cursor
+SCAN_ITERSIZE = int(os.environ.get('CLEANUP_ITERSIZE', '5000'))
+# Titles hashed into grant_lsh at a time, and grants per URL validation batch (--check-urls)
+LSH_BATCH = 20_000
+URL_CHECK_BATCH = int(os.environ.get('CLEANUP_URL_BATCH', '2000'))
+# Expired grants are only reported, so the scan keeps a few examples and a count
+EXPIRED_EXAMPLES = 5
+DUPLICATE_EXAMPLES = 3
+
+
+def load_state(path=None):
+    """Cleanup state from the last completed run ({} if there is none)"""
+    path = path or STATE_FILE
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError) as e:
+        print(f"⚠️  Ignoring unreadable state file {path}: {e}")
+        return {}
+
+
+def save_state(state, path=None):
+    path = path or STATE_FILE
+    tmp = f"{path}.tmp"
+    with open(tmp, 'w') as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp, path)
+
+
+def _matched_pattern(text):
+    """Which of FAKE_PATTERNS a matched snippet came from"""
+    for pattern in FAKE_PATTERNS:
+        if re.search(pattern, text, re.IGNORECASE):
+            return pattern
+    return FAKE_PATTERN
+
+
+def fake_reasons(title_match=None, description_match=None, domain=None, short_title=False):
+    """Human-readable reasons from the matched title/description text, fake host and length check"""
+    reasons = []
+    if title_match:
+        reasons.append(f"Title matches pattern: {_matched_pattern(title_match)}")
+    if description_match:
+        reasons.append(f"Description matches pattern: {_matched_pattern(description_match)}")
+    if domain:
+        reasons.append(f"URL contains fake domain: {domain}")
+    if short_title:
+        reasons.append(f"Title too short (< {MIN_TITLE_LENGTH} chars)")
+    return reasons
+
+
+def classify_fake(title, description, url):
+    """Python equivalent of FAKE_GRANTS_SQL for one row; empty list if the grant looks real"""
+    title_match = FAKE_RE.search((title or '').lower())
+    description_match = FAKE_RE.search((description or '').lower())
+    domain = None
+    if url:
+        try:
+            netloc = urlparse(url).netloc
+            if FAKE_DOMAIN_RE.search(netloc.lower()):
+                domain = netloc
+        except ValueError:
+            pass
+    short_title = bool(title) and len(title.strip()) < MIN_TITLE_LENGTH
+    return fake_reasons(title_match and title_match.group(0),
+                        description_match and description_match.group(0),
+                        domain, short_title)
+
+
 class GrantCleaner:
     def __init__(self, database_url, dry_run=True):
         self.database_url = database_url
@@ -70,140 +260,170 @@ class GrantCleaner:
             print(f"✗ Failed to connect to database: {e}")
             return False
     
-    def get_total_grants(self):
-        """Get total number of grants"""
+    def scan(self, since=None):
+        """
+        Classify grants in one streaming pass (server-side cursor): fake, expired
+        and duplicate grants. With `since`, only grants updated after it are classified,
+        and duplicates come from the groups of grants sharing their title or URL key
+        anywhere in the table; survivors are picked as in a full scan.
+
+        Client memory grows with the flagged grants and duplicate candidates, not the
+        table. A full scan streams the LSH keys of each batch of titles into grant_lsh;
+        a second query then returns only the grants that share a title, URL or LSH
+        bucket with another, and near_duplicates groups those.
+        """
+        started = time.monotonic()
+        full = since is None
+        try:
+            report = self._scan(scan_query(since), dict(FAKE_PARAMS, since=since), full)
+        except psycopg2.Error as e:
+            # e.g. a server without regexp_match (PostgreSQL < 10)
+            self.conn.rollback()
+            print(f"⚠️  SQL fake-grant check failed ({str(e).strip()[:100]}), classifying in Python")
+            report = self._scan(scan_query(since, in_python=True), {'since': since}, full)
+        
+        from near_duplicates import MAX_URL_GROUP, duplicate_groups
+        with self.conn.cursor(name='duplicate_candidates') as cur:
+            cur.itersize = SCAN_ITERSIZE
+            cur.execute(duplicate_candidates_query(since), {'max_url': MAX_URL_GROUP, 'since': since})
+            rows = [tuple(row) for row in cur]
+        if full:
+            with self.conn.cursor() as cur:
+                cur.execute('DROP TABLE grant_lsh')
+        self.conn.commit()
+        groups, report['duplicate_links'] = duplicate_groups(rows)
+        report['duplicate_candidates'] = len(rows)
+        report['duplicates'] = [dup[0] for _, dups in groups for dup in dups]
+        report['duplicate_groups'] = len(groups)
+        report['duplicate_examples'] = groups[:DUPLICATE_EXAMPLES]
+        report['seconds'] = time.monotonic() - started
+        
+        self.stats['total_grants'] = report['total']
+        self.stats['fake_grants'] = len(report['fake'])
+        self.stats['expired_grants'] = report['expired']
+        self.stats['duplicates'] = len(report['duplicates'])
+        return report
+    
+    def _store_lsh_keys(self, grants):
+        """Append the LSH bucket keys of (id, title) pairs to grant_lsh"""
+        from near_duplicates import lsh_keys, spaced_title
+        indexes, keys = lsh_keys([spaced_title(title) for _, title in grants])
+        buf = io.StringIO()
+        writer = csv.writer(buf)
+        for i, row in zip(indexes.tolist(), keys.tolist()):
+            writer.writerows((grants[i][0], band, key) for band, key in enumerate(row))
+        buf.seek(0)
         with self.conn.cursor() as cur:
-            cur.execute('SELECT COUNT(*) FROM "Grant"')
-            count = cur.fetchone()[0]
-            self.stats['total_grants'] = count
-            return count
+            cur.copy_expert('COPY grant_lsh (id, band, key) FROM STDIN WITH (FORMAT csv)', buf)
     
-    def find_fake_grants(self):
-        """Find grants that appear to be fake/test data"""
-        fake_ids = []
+    def _scan(self, sql, params, full):
+        report = {'total': 0, 'fake': [], 'expired': 0, 'expired_examples': [], 'max_updated': None}
+        titles = []
+        if full:
+            with self.conn.cursor() as cur:
+                cur.execute(_LSH_TABLE_SQL)
+        now = datetime.now()
         
-        with self.conn.cursor(cursor_factory=RealDictCursor) as cur:
-            cur.execute('SELECT id, title, description, url FROM "Grant"')
-            grants = cur.fetchall()
-            
-            for grant in grants:
-                is_fake = False
-                reasons = []
-                
-                # Check title and description for fake patterns
-                for pattern in FAKE_PATTERNS:
-                    if re.search(pattern, grant['title'] or '', re.IGNORECASE):
-                        is_fake = True
-                        reasons.append(f"Title matches pattern: {pattern}")
-                    if grant['description'] and re.search(pattern, grant['description'], re.IGNORECASE):
-                        is_fake = True
-                        reasons.append(f"Description matches pattern: {pattern}")
+        with self.conn.cursor(name='grant_scan', cursor_factory=RealDictCursor) as cur:
+            cur.itersize = SCAN_ITERSIZE
+            cur.execute(sql, params)
+            for grant in cur:
+                report['total'] += 1
+                if report['max_updated'] is None or grant['updatedAt'] > report['max_updated']:
+                    report['max_updated'] = grant['updatedAt']
                 
-                # Check for fake domains
-                if grant['url']:
-                    try:
-                        domain = urlparse(grant['url']).netloc
-                        if any(fake_domain in domain for fake_domain in FAKE_DOMAINS):
-                            is_fake = True
-                            reasons.append(f"URL contains fake domain: {domain}")
-                    except:
-                        pass
+                if 'description' in grant:
+                    reasons = classify_fake(grant['title'], grant['description'], grant['url'])
+                elif grant['title_match'] or grant['description_match'] or grant['fake_domain'] or grant['short_title']:
+                    reasons = fake_reasons(grant['title_match'], grant['description_match'],
+                                           grant['fake_domain'], grant['short_title'])
+                else:
+                    reasons = None
+                if reasons:
+                    report['fake'].append({'id': grant['id'], 'title': grant['title'], 'reasons': reasons})
                 
-                # Check for very short titles (likely test data)
-                if grant['title'] and len(grant['title'].strip()) < 10:
-                    is_fake = True
-                    reasons.append("Title too short (< 10 chars)")
+                if grant['deadline'] is not None and grant['deadline'] < now:
+                    report['expired'] += 1
+                    if len(report['expired_examples']) < EXPIRED_EXAMPLES:
+                        report['expired_examples'].append({
+                            'id': grant['id'],
+                            'title': grant['title'],
+                            'deadline': grant['deadline'],
+                            'days_past': (now - grant['deadline']).days
+                        })
                 
-                if is_fake:
-                    fake_ids.append({
-                        'id': grant['id'],
-                        'title': grant['title'],
-                        'reasons': reasons
-                    })
+                if full:
+                    titles.append((grant['id'], grant['title']))
+                    if len(titles) >= LSH_BATCH:
+                        self._store_lsh_keys(titles)
+                        titles = []
         
-        self.stats['fake_grants'] = len(fake_ids)
-        return fake_ids
+        if titles:
+            self._store_lsh_keys(titles)
+        self.conn.commit()  # close the scan's transaction (grant_lsh lasts for the session)
+        return report
     
-    def find_expired_grants(self):
-        """Find grants with past deadlines"""
-        expired_ids = []
+    def find_invalid_urls(self, since=None):
+        """
+        Find grants whose URLs are dead (checked concurrently, see url_validator.py):
+        404/410 or a host that does not exist. Rate limits, server errors and timeouts
+        are inconclusive and never flag a grant. Grants are read and checked URL_CHECK_BATCH
+        at a time (keyset pages on id); with `since`, only grants updated after it.
+        """
+        from url_validator import PROGRESS_EVERY, UrlValidator
         
-        with self.conn.cursor(cursor_factory=RealDictCursor) as cur:
-            cur.execute('''
-                SELECT id, title, deadline 
-                FROM "Grant" 
-                WHERE deadline IS NOT NULL AND deadline < NOW()
-            ''')
-            grants = cur.fetchall()
-            
-            for grant in grants:
-                days_past = (datetime.now() - grant['deadline']).days
-                expired_ids.append({
-                    'id': grant['id'],
-                    'title': grant['title'],
-                    'deadline': grant['deadline'],
-                    'days_past': days_past
-                })
+        changed = ' AND "updatedAt" > %(since)s' if since else ''
+        with self.conn.cursor() as cur:
+            cur.execute(f'SELECT count(*) FROM "Grant" WHERE url IS NOT NULL{changed}', {'since': since})
+            total = cur.fetchone()[0]
+        print(f"\nValidating {total} grant URLs...")
         
-        self.stats['expired_grants'] = len(expired_ids)
-        return expired_ids
-    
-    def find_invalid_urls(self):
-        """Find grants with invalid or unreachable URLs"""
+        validator = UrlValidator()
         invalid_ids = []
+        done, after = 0, ''
+        started = last_report = time.monotonic()
+        try:
+            while True:
+                with self.conn.cursor(cursor_factory=RealDictCursor) as cur:
+                    cur.execute(f'''SELECT id, title, url FROM "Grant"
+                                   WHERE url IS NOT NULL AND id > %(after)s{changed}
+                                   ORDER BY id LIMIT %(limit)s''',
+                                {'after': after, 'since': since, 'limit': URL_CHECK_BATCH})
+                    grants = cur.fetchall()
+                self.conn.commit()  # no transaction held open while URLs are checked
+                if not grants:
+                    break
+                after = grants[-1]['id']
+                results = validator.validate((grant['url'] for grant in grants), progress=False)
+                for grant in grants:
+                    check = results.get(grant['url'])
+                    if check is None or not check.dead:
+                        continue
+                    entry = {'id': grant['id'], 'title': grant['title'], 'url': grant['url']}
+                    if check.status is not None:
+                        entry['status'] = check.status
+                    else:
+                        entry['error'] = check.error
+                    if check.redirects:
+                        entry['redirects'] = check.redirects
+                    invalid_ids.append(entry)
+                done += len(grants)
+                now = time.monotonic()
+                if now - last_report >= PROGRESS_EVERY:
+                    last_report = now
+                    print(f"  Progress: {done}/{total} ({done / (now - started):.0f} grants/s, "
+                          f"{len(invalid_ids)} dead so far)")
+        finally:
+            validator.close()
         
-        with self.conn.cursor(cursor_factory=RealDictCursor) as cur:
-            cur.execute('SELECT id, title, url FROM "Grant" WHERE url IS NOT NULL')
-            grants = cur.fetchall()
-            
-            print(f"\nValidating {len(grants)} grant URLs...")
-            for i, grant in enumerate(grants):
-                if (i + 1) % 10 == 0:
-                    print(f"  Progress: {i + 1}/{len(grants)}")
-                
-                try:
-                    # Try to access the URL
-                    response = requests.head(grant['url'], timeout=5, allow_redirects=True)
-                    if response.status_code >= 400:
-                        invalid_ids.append({
-                            'id': grant['id'],
-                            'title': grant['title'],
-                            'url': grant['url'],
-                            'status': response.status_code
-                        })
-                except requests.exceptions.RequestException as e:
-                    invalid_ids.append({
-                        'id': grant['id'],
-                        'title': grant['title'],
-                        'url': grant['url'],
-                        'error': str(e)[:100]
-                    })
-        
+        print(f"  Checked {validator.stats['checked']} URLs ({validator.stats['cached']} skipped as recently verified, "
+              f"{validator.stats['get_fallback']} needed a GET after HEAD failed)")
+        if validator.stats['inconclusive']:
+            print(f"  ⚠️  {validator.stats['inconclusive']} URLs inconclusive (rate limits, server errors, timeouts); "
+                  f"kept, and checked again next run")
         self.stats['invalid_urls'] = len(invalid_ids)
         return invalid_ids
     
-    def find_duplicates(self):
-        """Find duplicate grants based on title similarity"""
-        duplicates = []
-        
-        with self.conn.cursor(cursor_factory=RealDictCursor) as cur:
-            # Find grants with exact same title
-            cur.execute('''
-                SELECT title, array_agg(id) as ids, COUNT(*) as count
-                FROM "Grant"
-                GROUP BY title
-                HAVING COUNT(*) > 1
-            ''')
-            duplicate_groups = cur.fetchall()
-            
-            for group in duplicate_groups:
-                # Keep the oldest grant, mark others as duplicates
-                ids = group['ids']
-                duplicates.extend(ids[1:])  # Skip the first (oldest) one
-        
-        self.stats['duplicates'] = len(duplicates)
-        return duplicates
-    
     def delete_grants(self, grant_ids):
         """Delete grants by IDs"""
         if not grant_ids:
@@ -220,8 +440,11 @@ class GrantCleaner:
             self.stats['deleted'] = deleted
             return deleted
     
-    def run_cleanup(self, check_urls=False):
-        """Run the full cleanup process"""
+    def run_cleanup(self, check_urls=False, full=False):
+        """
+        Run the cleanup process. Unless `full`, only grants updated since the last
+        completed live run (see STATE_FILE) are classified.
+        """
         print("\n" + "="*70)
         print("Grant Database Cleanup Script")
         print("="*70)
@@ -232,12 +455,22 @@ class GrantCleaner:
         if not self.connect():
             return False
         
-        total = self.get_total_grants()
-        print(f"Total grants in database: {total}\n")
+        state = load_state()
+        since = None
+        if not full and state.get('watermark'):
+            since = datetime.fromisoformat(state['watermark']) - WATERMARK_OVERLAP
+        
+        if since:
+            print(f"🔍 Scanning grants updated since {since:%Y-%m-%d %H:%M} (fake/test, expired, duplicates)...")
+        else:
+            print("🔍 Scanning all grants (fake/test, expired, near-duplicates)...")
+        report = self.scan(since=since)
+        total = report['total']
+        scope = "changed " if since else ""
+        print(f"Scanned {total} {scope}grants ({report['seconds']:.1f}s)\n")
         
-        # Find fake grants
-        print("🔍 Searching for fake/test grants...")
-        fake_grants = self.find_fake_grants()
+        # Fake grants
+        fake_grants = report['fake']
         if fake_grants:
             print(f"✗ Found {len(fake_grants)} fake/test grants:")
             for grant in fake_grants[:5]:  # Show first 5
@@ -248,35 +481,50 @@ class GrantCleaner:
         else:
             print("✓ No fake/test grants found")
         
-        # Find expired grants
-        print("\n🔍 Searching for expired grants...")
-        expired_grants = self.find_expired_grants()
-        if expired_grants:
-            print(f"✗ Found {len(expired_grants)} expired grants:")
-            for grant in expired_grants[:5]:  # Show first 5
+        # Expired grants
+        expired_count = report['expired']
+        if expired_count:
+            print(f"\n✗ Found {expired_count} expired grants:")
+            for grant in report['expired_examples']:
                 print(f"  - {grant['title']} (expired {grant['days_past']} days ago)")
-            if len(expired_grants) > 5:
-                print(f"  ... and {len(expired_grants) - 5} more")
+            if expired_count > len(report['expired_examples']):
+                print(f"  ... and {expired_count - len(report['expired_examples'])} more")
+            if since:
+                print("  (changed grants only; run with --full to count the whole table)")
         else:
-            print("✓ No expired grants found")
+            print("\n✓ No expired grants found")
         
-        # Find duplicates
-        print("\n🔍 Searching for duplicate grants...")
-        duplicate_ids = self.find_duplicates()
+        # Duplicates
+        duplicate_ids = report['duplicates']
         if duplicate_ids:
-            print(f"✗ Found {len(duplicate_ids)} duplicate grants")
+            links = report['duplicate_links']
+            print(f"\n✗ Found {len(duplicate_ids)} duplicate grants in {report['duplicate_groups']} groups "
+                  f"(most complete of each kept; {links['title']} same title, {links['url']} same URL, "
+                  f"{links['fuzzy']} similar title)")
+            for kept, dups in report['duplicate_examples']:
+                print(f"  - Keep: {kept[1]} (ID: {kept[0]})")
+                for dup in dups[:3]:
+                    print(f"    Drop: {dup[1]} (ID: {dup[0]})")
+                if len(dups) > 3:
+                    print(f"    ... and {len(dups) - 3} more")
+            if report['duplicate_groups'] > len(report['duplicate_examples']):
+                print(f"  ... and {report['duplicate_groups'] - len(report['duplicate_examples'])} more groups")
+            if since:
+                print("  (title and URL groups of changed grants only; run with --full for similar titles)")
         else:
-            print("✓ No duplicate grants found")
+            print("\n✓ No duplicate grants found")
         
         # Find invalid URLs (optional, can be slow)
         if check_urls:
             print("\n🔍 Validating grant URLs...")
-            invalid_urls = self.find_invalid_urls()
+            invalid_urls = self.find_invalid_urls(since)
             if invalid_urls:
                 print(f"✗ Found {len(invalid_urls)} grants with invalid URLs:")
                 for grant in invalid_urls[:5]:
                     print(f"  - {grant['title']}")
-                    print(f"    URL: {grant['url']}")
+                    print(f"    URL: {grant['url']} ({grant.get('status') or grant.get('error')})")
+                    if grant.get('redirects'):
+                        print(f"    Redirects: {' -> '.join(grant['redirects'])}")
                 if len(invalid_urls) > 5:
                     print(f"  ... and {len(invalid_urls) - 5} more")
             else:
@@ -289,7 +537,6 @@ class GrantCleaner:
         ids_to_delete = []
         ids_to_delete.extend([g['id'] for g in fake_grants])
         # Don't auto-delete expired grants, just report them
-        # ids_to_delete.extend([g['id'] for g in expired_grants])
         ids_to_delete.extend(duplicate_ids)
         if check_urls:
             ids_to_delete.extend([g['id'] for g in invalid_urls])
@@ -301,9 +548,9 @@ class GrantCleaner:
         print("\n" + "="*70)
         print("CLEANUP SUMMARY")
         print("="*70)
-        print(f"Total grants: {total}")
+        print(f"{'Changed grants scanned' if since else 'Total grants'}: {total}")
         print(f"Fake/test grants: {len(fake_grants)}")
-        print(f"Expired grants: {len(expired_grants)} (not auto-deleted)")
+        print(f"Expired grants: {expired_count} (not auto-deleted)")
         print(f"Duplicate grants: {len(duplicate_ids)}")
         if check_urls:
             print(f"Invalid URLs: {len(invalid_urls)}")
@@ -311,6 +558,7 @@ class GrantCleaner:
         print("="*70 + "\n")
         
         # Delete grants
+        completed = not self.dry_run
         if ids_to_delete:
             if self.dry_run:
                 print("⚠️  DRY RUN MODE: No changes will be made")
@@ -322,24 +570,48 @@ class GrantCleaner:
                     print(f"\n✓ Deleted {deleted} grants")
                 else:
                     print("\n✗ Deletion cancelled")
+                    completed = False
         else:
             print("✓ No grants need to be deleted")
         
+        # Advance the watermark only once the flagged grants have been dealt with,
+        # so dry runs and cancelled runs report them again next time
+        if completed:
+            watermark = report['max_updated']
+            if state.get('watermark') and (watermark is None or
+                                           datetime.fromisoformat(state['watermark']) > watermark):
+                watermark = datetime.fromisoformat(state['watermark'])
+            save_state({
+                'watermark': watermark.isoformat() if watermark else None,
+                'last_run': datetime.now().isoformat(timespec='seconds'),
+                'last_mode': 'incremental' if since else 'full',
+                'last_scanned': total,
+            })
+        
         self.conn.close()
         return True
 
 
 def main():
+    if '--benchmark-duplicates' in sys.argv:
+        # Near-duplicate grouping on synthetic grants; no database needed
+        from near_duplicates import benchmark
+        args = sys.argv[sys.argv.index('--benchmark-duplicates') + 1:]
+        benchmark(int(args[0]) if args and args[0].isdigit() else 1_000_000)
+        return
+    
     if not DATABASE_URL:
         print("Error: DATABASE_URL environment variable not set")
-        print("Usage: DATABASE_URL='your-connection-string' python cleanup_grants.py")
+        print("Usage: DATABASE_URL='your-connection-string' python cleanup_grants.py [--full] [--check-urls]")
+        print("       python cleanup_grants.py --benchmark-duplicates [N]")
         sys.exit(1)
     
     # Parse command line arguments
     check_urls = '--check-urls' in sys.argv
+    full = '--full' in sys.argv
     
     cleaner = GrantCleaner(DATABASE_URL, dry_run=DRY_RUN)
-    cleaner.run_cleanup(check_urls=check_urls)
+    cleaner.run_cleanup(check_urls=check_urls, full=full)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,433 @@
+#!/usr/bin/env python3
+"""
+Near-duplicate grant detection for cleanup_grants.py
+
+Grants are grouped when any of these hold:
+1. Same normalized title: case, accents, whitespace and punctuation are ignored,
+   so "FY2025" and "FY 2025" agree
+2. Same canonical URL (scheme, www, fragment and tracking parameters ignored)
+   and a loosely matching title: the same numbers, and every word of one title
+   (plurals and stopwords aside) in the other, so a re-listing may add a site
+   name but separate grants behind a shared apply page do not merge. Site roots
+   and URLs shared by many grants are listing pages and are not used
+3. Near-identical titles: the same numbers (years, phases), character-trigram
+   Jaccard similarity >= TITLE_SIMILARITY, and word for word the same apart from
+   plurals, one misspelt word or a stopword. Candidate pairs come from
+   MinHash-LSH blocking, so each title is only compared with the few that share
+   a band
+
+Each group keeps its most complete grant (ties: the oldest) and flags the rest.
+Rows are (id, title, url, created, completeness) tuples.
+
+cleanup_grants.py does not load the whole table: TITLE_KEY_SQL and URL_KEY_SQL
+compute the rule 1 and 2 keys in PostgreSQL, lsh_keys gives each title its rule 3
+buckets, and only grants sharing a key with another grant are passed to
+duplicate_groups.
+"""
+
+import difflib
+import os
+import random
+import re
+import time
+import unicodedata
+import zlib
+from collections import defaultdict
+from urllib.parse import urlsplit
+
+import numpy as np
+
+TITLE_SIMILARITY = float(os.environ.get('CLEANUP_TITLE_SIMILARITY', '0.8'))
+# A canonical URL shared by more grants than this is a listing page, not a grant page
+MAX_URL_GROUP = int(os.environ.get('CLEANUP_MAX_URL_GROUP', '5'))
+
+# 6 bands of 8 rows: titles with trigram Jaccard 0.9 become candidates ~97% of the time
+NUM_PERM = 48
+BANDS = 6
+# Buckets up to this size are compared pairwise; larger ones only between neighbours
+FULL_BUCKET = 50
+# Title characters hashed per block and trigram positions per vectorized step
+# (bound the buffer-wide arrays and the positions x NUM_PERM array)
+CHUNK_POSITIONS = 250_000
+
+TRACKING_PARAM_NAMES = r'utm_\w+|gclid|fbclid|msclkid|mc_cid|mc_eid|ref|src|_ga'
+TRACKING_PARAMS = re.compile(f'^({TRACKING_PARAM_NAMES})$', re.IGNORECASE)
+_NON_ALNUM_RE = re.compile(r'[^a-z0-9]+')
+_SLASHES_RE = re.compile(r'/+')
+_INDEX_PAGE_RE = re.compile(r'/(index|default)\.(html?|php|aspx?)$')
+# Tokens that tell otherwise identical titles apart: years, numbers, phase numerals
+_DISTINCT_RE = re.compile(r'\d+|\b(?:i{1,3}|iv|vi{0,3}|ix|x)\b')
+_STOPWORDS = {'a', 'an', 'the', 'of', 'for', 'and', 'in', 'on', 'to', 'program', 'opportunity'}
+# Minimum character similarity of the one word two titles may spell differently
+WORD_SIMILARITY = 0.8
+
+
+def spaced_title(title):
+    """Lowercase ASCII words separated by single spaces"""
+    text = unicodedata.normalize('NFKD', title or '').encode('ascii', 'ignore').decode('ascii')
+    return _NON_ALNUM_RE.sub(' ', text.lower()).strip()
+
+
+def canonical_url(url):
+    """Scheme-, www-, fragment- and tracking-insensitive URL; '' for none or a site root"""
+    if not url:
+        return ''
+    try:
+        parts = urlsplit(url.strip())
+        host = (parts.hostname or '').lower()
+    except ValueError:
+        return ''
+    if host.startswith('www.'):
+        host = host[4:]
+    path = _INDEX_PAGE_RE.sub('/', _SLASHES_RE.sub('/', parts.path)).rstrip('/')
+    # parameters keep their order and encoding, so URL_KEY_SQL can compute the same key
+    query = '&'.join(p for p in parts.query.split('&') if p and not TRACKING_PARAMS.match(p.split('=', 1)[0]))
+    if not host or (not path and not query):
+        return ''
+    return f"{host}{path}?{query}" if query else f"{host}{path}"
+
+
+# The same keys in PostgreSQL (columns title and url; IMMUTABLE, so they can be indexed).
+# TITLE_KEY_SQL is spaced_title without the spaces; URL_KEY_SQL is canonical_url, NULL for ''.
+TITLE_KEY_SQL = "regexp_replace(lower(normalize(title, NFKD)), '[^a-z0-9]+', '', 'g')"
+_URL_SQL = "btrim(url, E' \\t\\r\\n')"
+_HOST_SQL = (f"regexp_replace(lower(btrim(substring({_URL_SQL} from '^[^:/?#]+://(?:[^/?#]*@)?(\\[[^]/?#]*\\]|[^/?#:]*)'),"
+             f" '[]')), '^www\\.', '')")
+_PATH_SQL = (f"rtrim(regexp_replace(regexp_replace(substring({_URL_SQL} from '^[^:/?#]+://[^/?#]*([^?#]*)'),"
+             f" '/+', '/', 'g'), '/(index|default)\\.(html?|php|aspx?)$', '/'), '/')")
+_QUERY_SQL = (f"btrim(regexp_replace(regexp_replace('&' || coalesce(substring({_URL_SQL} from '^[^?#]*\\?([^#]*)'), ''),"
+              f" '&(?:{TRACKING_PARAM_NAMES})(?:=[^&]*)?(?=&|$)', '', 'gi'), '&+', '&', 'g'), '&')")
+# NULL (no key) without a host, or for a site root with neither path nor query
+URL_KEY_SQL = f"NULLIF({_HOST_SQL}, '') || NULLIF({_PATH_SQL} || coalesce('?' || NULLIF({_QUERY_SQL}, ''), ''), '')"
+
+
+def completeness_sort_key(row):
+    """Most complete first, then oldest, then lowest id"""
+    _, _, _, created, score = row
+    return (-score, created, row[0])
+
+
+class _UnionFind:
+    def __init__(self, n):
+        self.parent = list(range(n))
+
+    def find(self, i):
+        parent = self.parent
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    def union(self, i, j):
+        ri, rj = self.find(i), self.find(j)
+        if ri != rj:
+            self.parent[max(ri, rj)] = min(ri, rj)
+
+
+def _minhash(titles):
+    """(len(titles), NUM_PERM) MinHash of each title's character trigrams; all-max rows for titles under 3 chars"""
+    rng = np.random.default_rng(7)
+    a = rng.integers(1, 2**63, size=NUM_PERM, dtype=np.uint64) | np.uint64(1)
+    b = rng.integers(0, 2**63, size=NUM_PERM, dtype=np.uint64)
+    sig = np.full((len(titles), NUM_PERM), np.iinfo(np.uint32).max, dtype=np.uint32)
+
+    # Blocks of about CHUNK_POSITIONS characters, so the per-position arrays do not grow with the table
+    first = 0
+    while first < len(titles):
+        last, size = first + 1, len(titles[first]) + 1
+        while last < len(titles) and size + len(titles[last]) < CHUNK_POSITIONS:
+            size += len(titles[last]) + 1
+            last += 1
+        _minhash_block(titles[first:last], a, b, sig[first:last])
+        first = last
+    return sig
+
+
+def _minhash_block(titles, a, b, sig):
+    """Fill sig (a view, one row per title) with the MinHash of titles"""
+    # The block's titles in one buffer; a trigram is valid if it does not cross a separator
+    buf = np.frombuffer('\n'.join(titles).encode('ascii'), dtype=np.uint8)
+    if len(buf) < 3:
+        return
+    # 24-bit codes and 32-bit owners keep the buffer-wide arrays small; chunks widen to 64 bits
+    codes = (buf[:-2].astype(np.uint32) << 16) | (buf[1:-1].astype(np.uint32) << 8) | buf[2:]
+    newline = buf == 10
+    owner = np.cumsum(newline, dtype=np.int32)[:-2]
+    valid = ~(newline[:-2] | newline[1:-1] | newline[2:])
+    codes, owner = codes[valid], owner[valid]
+
+    for start in range(0, len(codes), CHUNK_POSITIONS):
+        x = codes[start:start + CHUNK_POSITIONS].astype(np.uint64)
+        who = owner[start:start + CHUNK_POSITIONS]
+        hashed = ((a[:, None] * x[None, :] + b[:, None]) >> np.uint64(32)).astype(np.uint32)
+        # owners are ascending, so each title's trigrams in this chunk are one run
+        starts = np.flatnonzero(np.r_[True, who[1:] != who[:-1]])
+        docs = who[starts]
+        sig[docs] = np.minimum(sig[docs], np.minimum.reduceat(hashed, starts, axis=1).T)
+
+
+def _bucket_pairs(order, sorted_keys):
+    """Index pairs (into order) of rows sharing a key: all pairs in small buckets, neighbours in large ones"""
+    starts = np.flatnonzero(np.r_[True, sorted_keys[1:] != sorted_keys[:-1]])
+    sizes = np.diff(np.r_[starts, len(order)])
+    xs, ys = [], []
+    for size in np.unique(sizes[(sizes > 1) & (sizes <= FULL_BUCKET)]).tolist():
+        first = starts[sizes == size][:, None]
+        i, j = np.triu_indices(size, 1)
+        xs.append(order[first + i].ravel())
+        ys.append(order[first + j].ravel())
+    large = np.repeat(sizes > FULL_BUCKET, sizes)[:-1] & (sorted_keys[1:] == sorted_keys[:-1])
+    xs.append(order[:-1][large])
+    ys.append(order[1:][large])
+    return np.concatenate(xs), np.concatenate(ys)
+
+
+_BAND_MIX = np.asarray([0x9E3779B97F4A7C15 * (k + 1) & 0xFFFFFFFFFFFFFFFF for k in range(NUM_PERM // BANDS)],
+                       dtype=np.uint64)
+
+
+def _band_keys(sig, band):
+    """uint64 bucket key of each signature row in one LSH band"""
+    rows = NUM_PERM // BANDS
+    return (sig[:, band * rows:(band + 1) * rows].astype(np.uint64) * _BAND_MIX).sum(axis=1)
+
+
+def _hashed(sig):
+    """Rows of sig with a MinHash (titles of 3 or more characters)"""
+    return np.flatnonzero(~np.all(sig == np.iinfo(np.uint32).max, axis=1))
+
+
+def lsh_keys(spaced):
+    """
+    Rule 3 buckets of spaced titles: (indexes, keys), keys an (len(indexes), BANDS)
+    int64 array. Titles only become candidates if they share a bucket, and a bucket
+    key includes the title's numbers, so it is the same for a title in any batch.
+    """
+    sig = _minhash(spaced)
+    keep = _hashed(sig)
+    sig = sig[keep]
+    numbers = np.asarray([zlib.crc32(' '.join(_DISTINCT_RE.findall(spaced[i])).encode()) for i in keep.tolist()],
+                         dtype=np.uint64)
+    keys = np.empty((len(keep), BANDS), dtype=np.uint64)
+    for band in range(BANDS):
+        keys[:, band] = _band_keys(sig, band) + numbers * _BAND_MIX[0]
+    return keep, keys.view(np.int64)
+
+
+def _candidate_pairs(sig, labels):
+    """
+    Pairs (x, y), x < y, of title indexes sharing at least one LSH band bucket and
+    the same label; two int64 arrays, so millions of candidates stay compact
+    """
+    n = len(sig)
+    keep = _hashed(sig)
+    sig = sig[keep]
+    labels = np.asarray(labels, dtype=np.int64)[keep]
+    codes = []
+    for band in range(BANDS):
+        keys = _band_keys(sig, band)
+        order = np.argsort(keys, kind='stable')
+        x, y = _bucket_pairs(order, keys[order])
+        same = labels[x] == labels[y]
+        x, y = keep[x[same]], keep[y[same]]
+        codes.append(np.minimum(x, y) * n + np.maximum(x, y))
+    codes = np.unique(np.concatenate(codes)) if codes else np.empty(0, dtype=np.int64)
+    return codes // n, codes % n
+
+
+def _trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def _stem(word):
+    return word[:-1] if len(word) > 3 and word.endswith('s') and not word.endswith('ss') else word
+
+
+def _same_words(s1, s2):
+    """Word sequences equal up to plurals, stopwords and a single close misspelling"""
+    w1 = [_stem(w) for w in s1.split()]
+    w2 = [_stem(w) for w in s2.split()]
+    replaced = 0
+    for op, i1, i2, j1, j2 in difflib.SequenceMatcher(None, w1, w2, autojunk=False).get_opcodes():
+        if op == 'equal':
+            continue
+        if op in ('insert', 'delete'):
+            if not set(w1[i1:i2] + w2[j1:j2]) <= _STOPWORDS:
+                return False
+            continue
+        if i2 - i1 != 1 or j2 - j1 != 1 or replaced:
+            return False
+        replaced += 1
+        if difflib.SequenceMatcher(None, w1[i1], w2[j1]).ratio() < WORD_SIMILARITY:
+            return False
+    return True
+
+
+def _similar_titles(s1, s2, threshold):
+    t1, t2 = _trigrams(s1), _trigrams(s2)
+    if not t1 or not t2 or len(t1 & t2) / len(t1 | t2) < threshold:
+        return False
+    return _same_words(s1, s2)
+
+
+def _contained_title(s1, s2):
+    """Same numbers, and the words of one title (plurals and stopwords aside) all occur in the other"""
+    if _DISTINCT_RE.findall(s1) != _DISTINCT_RE.findall(s2):
+        return False
+    w1 = {_stem(w) for w in s1.split()} - _STOPWORDS
+    w2 = {_stem(w) for w in s2.split()} - _STOPWORDS
+    return bool(w1 and w2) and (w1 <= w2 or w2 <= w1)
+
+
+def duplicate_groups(rows, threshold=TITLE_SIMILARITY):
+    """
+    Group near-duplicate rows. Returns [(kept row, [duplicate rows])], one entry
+    per group of two or more, plus counts of the links found by each rule.
+    """
+    n = len(rows)
+    uf = _UnionFind(n)
+    links = {'title': 0, 'url': 0, 'fuzzy': 0}
+
+    # 1. Same normalized title; one representative per distinct title for step 3
+    by_key = {}
+    spaced = []
+    reps = []
+    for i, row in enumerate(rows):
+        s = spaced_title(row[1])
+        key = s.replace(' ', '')
+        first = by_key.get(key)
+        if first is None:
+            by_key[key] = i
+            spaced.append(s)
+            reps.append(i)
+        else:
+            uf.union(first, i)
+            links['title'] += 1
+
+    # 2. Same canonical URL, unless it is shared widely (listing page), with a contained title
+    by_url = defaultdict(list)
+    for i, row in enumerate(rows):
+        url = canonical_url(row[2])
+        if url:
+            by_url[url].append(i)
+    for members in by_url.values():
+        if not 1 < len(members) <= MAX_URL_GROUP:
+            continue
+        titles = [spaced_title(rows[i][1]) for i in members]
+        for a in range(len(members)):
+            for b in range(a + 1, len(members)):
+                x, y = members[a], members[b]
+                if uf.find(x) != uf.find(y) and _contained_title(titles[a], titles[b]):
+                    uf.union(x, y)
+                    links['url'] += 1
+
+    del by_key, by_url  # not needed for step 3, which has the largest arrays
+    # 3. Similar titles among the distinct ones (numbers must match exactly)
+    number_ids = {}
+    labels = [number_ids.setdefault(tuple(_DISTINCT_RE.findall(t)), len(number_ids)) for t in spaced]
+    xs, ys = _candidate_pairs(_minhash(spaced), labels)
+    for x, y in zip(xs.tolist(), ys.tolist()):
+        if (uf.find(reps[x]) != uf.find(reps[y])
+                and _similar_titles(spaced[x], spaced[y], threshold)):
+            uf.union(reps[x], reps[y])
+            links['fuzzy'] += 1
+
+    members = defaultdict(list)
+    for i in range(n):
+        members[uf.find(i)].append(rows[i])
+    groups = []
+    for group in members.values():
+        if len(group) > 1:
+            group.sort(key=completeness_sort_key)
+            groups.append((group[0], group[1:]))
+    return groups, links
+
+
+# ----------------- Synthetic benchmark -----------------
+
+_AGENCIES = ['NSF', 'NIH', 'USDA', 'DOE', 'EPA', 'NEA', 'HRSA', 'NOAA', 'DOT', 'HUD', 'Ford Foundation',
+             'Gates Foundation', 'California', 'Texas', 'New York', 'Florida', 'Kellogg', 'Mellon', 'Knight', 'Walton']
+_TOPICS = ['Rural Health', 'Climate Resilience', 'STEM Education', 'Arts Access', 'Broadband Expansion',
+           'Food Security', 'Clean Water', 'Workforce Training', 'Housing Stability', 'Youth Mentoring',
+           'Small Business', 'Wildlife Habitat', 'Mental Health', 'Digital Literacy', 'Public Transit',
+           'Cancer Research', 'Energy Efficiency', 'Literacy', 'Veterans Services', 'Disaster Recovery',
+           'Ocean Science', 'Quantum Computing', 'Maternal Health', 'Indigenous Languages', 'Urban Forestry']
+_KINDS = ['Grant', 'Fellowship', 'Award', 'Initiative', 'Challenge', 'Program', 'Cooperative Agreement', 'Prize']
+_EXTRAS = ['Planning', 'Implementation', 'Capacity Building', 'Pilot', 'Research', 'Demonstration', 'Community',
+           'Innovation', 'Regional', 'National', 'Emerging Investigator', 'Partnership', 'Equity', 'Infrastructure']
+
+
+def _variant(title, url, rng, i):
+    """A re-listing of the same grant: cosmetic title edits, or a site suffix at the same page"""
+    kind = rng.randrange(6)
+    if kind == 0:
+        return title.upper(), url
+    if kind == 1:
+        return re.sub(r'FY(\d{4})', r'FY \1', title) + '.', url + '?utm_source=newsletter'
+    if kind == 2:
+        return title.replace(' - ', ': ').replace('  ', ' '), url.replace('https://www.', 'http://')
+    if kind == 3:
+        return re.sub(r'\b(Grant|Award|Prize|Program)\b', r'\1s', title, count=1), None
+    if kind == 4:
+        return '  ' + title.lower() + ' ', url + '#apply'
+    return f"{title} | {rng.choice(_AGENCIES)} Funding", url
+
+
+def synthetic_rows(n, dup_rate=0.1, seed=1, shared_rate=0.05):
+    """
+    n rows with about dup_rate of them re-listings of earlier rows; also returns each
+    row's true group. About shared_rate of the distinct grants link a foundation-wide
+    apply page shared with a few other grants, which must not make them duplicates.
+    """
+    rng = random.Random(seed)
+    rows, truth = [], []
+    originals = []
+    used = set()
+    for i in range(n):
+        created = 1_600_000_000 + i
+        score = rng.randrange(8)
+        if originals and rng.random() < dup_rate:
+            j = rng.choice(originals)
+            title, url = _variant(rows[j][1], rows[j][2], rng, i)
+            rows.append((f"g{i}", title, url, created, score))
+            truth.append(truth[j])
+            continue
+        url = f"https://www.grants.example.net/opportunity/{i}"
+        page = None
+        if rng.random() < shared_rate:
+            # grants behind one apply page share the funder, year and cycle
+            page_id = rng.randrange(n // 40 + 1)
+            page = random.Random(page_id)
+            url = f"https://www.grants.example.net/apply/{page_id}"
+        title = None
+        while title is None or title in used:  # distinct grants get distinct titles
+            funder = page or rng
+            state = funder.getstate()
+            title = (f"{funder.choice(_AGENCIES)} {rng.choice(_EXTRAS)} {rng.choice(_TOPICS)} {rng.choice(_KINDS)}"
+                     f" - FY{funder.randrange(2015, 2027)} Cycle {funder.randrange(1, 400)}")
+            if page:
+                page.setstate(state)
+        used.add(title)
+        rows.append((f"g{i}", title, url, created, score))
+        truth.append(i)
+        originals.append(i)
+    return rows, truth
+
+
+def benchmark(n, dup_rate=0.1):
+    rows, truth = synthetic_rows(n, dup_rate)
+    group_of = {row[0]: g for row, g in zip(rows, truth)}
+    planted = n - len(set(truth))
+
+    started = time.perf_counter()
+    groups, links = duplicate_groups(rows)
+    elapsed = time.perf_counter() - started
+
+    flagged = sum(len(dups) for _, dups in groups)
+    wrong = sum(1 for keep, dups in groups for d in dups if group_of[d[0]] != group_of[keep[0]])
+    best = sum(1 for keep, dups in groups if keep[4] < max(r[4] for r in dups))
+    print(f"Rows: {n}, planted duplicates: {planted}")
+    print(f"Time: {elapsed:.1f}s ({n / elapsed:,.0f} rows/s)")
+    print(f"Flagged: {flagged} in {len(groups)} groups (links: {links})")
+    print(f"Recall: {(flagged - wrong) / max(planted, 1):.4f}, wrongly flagged: {wrong}, "
+          f"groups keeping a less complete grant: {best}")
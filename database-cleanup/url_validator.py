@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+"""
+Concurrent URL validator for cleanup_grants.py --check-urls
+
+Checks many URLs at once on one asyncio event loop:
+1. Keep-alive connection pool with a global and a per-host connection limit
+2. URLs interleaved by host, so a large site never starves the others
+3. HEAD first; servers that reject HEAD get a one-byte ranged GET
+4. The redirect chain of every URL is recorded
+5. Results are cached in SQLite; URLs verified OK within the TTL are skipped
+
+Each URL is ok, dead or inconclusive. Only dead URLs get their grants deleted:
+404/410 confirmed by the ranged GET, or a host that does not exist (NXDOMAIN,
+trusted only when a host looked up by name answered in the same validate call). Rate limits, server
+errors, other 4xx, timeouts and connection errors are inconclusive; they are
+not cached, so the next run checks them again.
+"""
+
+import asyncio
+import ipaddress
+import json
+import os
+import socket
+import sqlite3
+import time
+from collections import defaultdict, deque
+from dataclasses import dataclass, field
+from email.utils import parsedate_to_datetime
+from typing import Dict, Iterable, List, Optional
+from urllib.parse import urlparse
+
+import aiohttp
+
+CONCURRENCY = int(os.environ.get('URL_CHECK_CONCURRENCY', '200'))
+PER_HOST = int(os.environ.get('URL_CHECK_PER_HOST', '4'))
+TIMEOUT = float(os.environ.get('URL_CHECK_TIMEOUT', '10'))
+CACHE_PATH = os.environ.get('URL_CHECK_CACHE', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'url_cache.sqlite'))
+CACHE_TTL_DAYS = float(os.environ.get('URL_CHECK_TTL_DAYS', '7'))
+USER_AGENT = 'Mozilla/5.0 (compatible; GrantFinderLinkCheck/1.0)'
+# Longest Retry-After honoured within a run; a longer wait is left to the next run
+RETRY_AFTER_MAX = float(os.environ.get('URL_CHECK_RETRY_AFTER_MAX', '30'))
+PROGRESS_EVERY = 10  # seconds
+
+OK = 'ok'
+DEAD = 'dead'
+INCONCLUSIVE = 'inconclusive'
+# Statuses (from the ranged GET) that mean the page is gone
+DEAD_STATUSES = (404, 410)
+# getaddrinfo errors for a name that does not exist, as opposed to a failed lookup
+_NO_SUCH_HOST = {socket.EAI_NONAME, getattr(socket, 'EAI_NODATA', socket.EAI_NONAME)}
+
+
+@dataclass
+class UrlCheck:
+    url: str
+    outcome: str
+    status: Optional[int] = None
+    error: Optional[str] = None
+    method: str = 'HEAD'
+    redirects: List[str] = field(default_factory=list)
+    checked: float = 0.0
+    cached: bool = False
+
+    @property
+    def ok(self):
+        return self.outcome == OK
+
+    @property
+    def dead(self):
+        return self.outcome == DEAD
+
+    @property
+    def final_url(self):
+        return self.redirects[-1] if self.redirects else self.url
+
+
+class ResultCache:
+    """URL check results in SQLite, keyed by URL"""
+
+    def __init__(self, path, ttl_sec):
+        self.ttl_sec = ttl_sec
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute(
+            'CREATE TABLE IF NOT EXISTS url_checks ('
+            ' url TEXT PRIMARY KEY,'
+            ' ok INTEGER NOT NULL,'
+            ' status INTEGER,'
+            ' error TEXT,'
+            ' method TEXT,'
+            ' redirects TEXT,'
+            ' checked REAL NOT NULL)'
+        )
+        self.conn.commit()
+
+    def fresh_ok(self, urls):
+        """URLs among `urls` that were verified OK within the TTL, with their cached results"""
+        oldest = time.time() - self.ttl_sec
+        found = {}
+        urls = list(urls)
+        for i in range(0, len(urls), 500):
+            chunk = urls[i:i + 500]
+            rows = self.conn.execute(
+                f'SELECT url, status, method, redirects, checked FROM url_checks'
+                f' WHERE ok = 1 AND checked >= ? AND url IN ({",".join("?" * len(chunk))})',
+                [oldest, *chunk],
+            )
+            for url, status, method, redirects, checked in rows:
+                found[url] = UrlCheck(url, OK, status, None, method, json.loads(redirects or '[]'),
+                                      checked, cached=True)
+        return found
+
+    def put_many(self, results):
+        """Store ok and dead results; inconclusive ones are checked again next run"""
+        self.conn.executemany(
+            'INSERT OR REPLACE INTO url_checks (url, ok, status, error, method, redirects, checked)'
+            ' VALUES (?, ?, ?, ?, ?, ?, ?)',
+            [(r.url, int(r.ok), r.status, r.error, r.method, json.dumps(r.redirects), r.checked)
+             for r in results if r.outcome != INCONCLUSIVE],
+        )
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+
+def interleave_by_host(urls):
+    """Round-robin over hosts, so consecutive URLs rarely share a host"""
+    by_host = defaultdict(deque)
+    for url in urls:
+        by_host[(urlparse(url).hostname or '').lower()].append(url)
+    queues = deque(by_host.values())
+    while queues:
+        q = queues.popleft()
+        yield q.popleft()
+        if q:
+            queues.append(q)
+
+
+def status_outcome(status):
+    """OK, DEAD or INCONCLUSIVE for an HTTP status"""
+    if status < 400 or status == 416:  # 416: the resource exists, the byte range did not
+        return OK
+    if status in DEAD_STATUSES:
+        return DEAD
+    return INCONCLUSIVE
+
+
+def no_such_host(error):
+    """Whether a connection error is a DNS answer that the host does not exist"""
+    return (isinstance(error, aiohttp.ClientConnectorError)
+            and isinstance(error.os_error, socket.gaierror)
+            and error.os_error.errno in _NO_SUCH_HOST)
+
+
+def resolved_by_name(url):
+    """Whether reaching the URL's host took a DNS lookup (not an IP literal or localhost)"""
+    host = (urlparse(url).hostname or '').lower()
+    if not host or host == 'localhost':
+        return False
+    try:
+        ipaddress.ip_address(host)
+        return False
+    except ValueError:
+        return True
+
+
+def retry_after_seconds(value):
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date), None if absent"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class UrlValidator:
+    def __init__(self, concurrency=CONCURRENCY, per_host=PER_HOST, timeout=TIMEOUT,
+                 cache_path=CACHE_PATH, ttl_days=CACHE_TTL_DAYS):
+        self.concurrency = concurrency
+        self.per_host = per_host
+        self.timeout = timeout
+        self.cache = ResultCache(cache_path, ttl_days * 86400) if cache_path else None
+        self.stats = {'checked': 0, 'cached': 0, 'dead': 0, 'inconclusive': 0, 'get_fallback': 0}
+        # host -> monotonic time before which it is not contacted again (Retry-After)
+        self.host_ready = {}
+
+    async def _request(self, session, method, url):
+        headers = {'Range': 'bytes=0-0'} if method == 'GET' else None
+        async with session.request(method, url, headers=headers, allow_redirects=True) as resp:
+            chain = [str(r.url) for r in resp.history]
+            if chain:
+                chain.append(str(resp.url))
+            return resp.status, chain, resp.headers.get('Retry-After')
+
+    async def _wait_for_host(self, host):
+        delay = self.host_ready.get(host, 0) - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    async def check(self, session, url, attempts=2):
+        """
+        HEAD the URL; if the server answers HEAD with an error, the status comes from a
+        ranged GET, so a dead page is always confirmed by GET. Inconclusive results are
+        retried once, after the server's Retry-After if it sent one.
+        """
+        result = UrlCheck(url, INCONCLUSIVE)
+        host = (urlparse(url).hostname or '').lower()
+        for _ in range(attempts):
+            result.status = result.error = None
+            result.method = 'HEAD'
+            retry_after = None
+            await self._wait_for_host(host)
+            try:
+                result.status, result.redirects, retry_after = await self._request(session, 'HEAD', url)
+                if result.status >= 400 and result.status != 429:
+                    self.stats['get_fallback'] += 1
+                    result.method = 'GET'
+                    result.status, result.redirects, retry_after = await self._request(session, 'GET', url)
+                result.outcome = status_outcome(result.status)
+            except aiohttp.InvalidURL as e:
+                result.error = f'Invalid URL: {e}'[:100]
+                break
+            except asyncio.TimeoutError:
+                result.error = f'Timed out after {self.timeout:g}s'
+            except (aiohttp.ClientError, ValueError) as e:
+                result.error = f'{type(e).__name__}: {e}'[:100]
+                if no_such_host(e):
+                    result.outcome = DEAD
+            if result.outcome != INCONCLUSIVE:
+                break
+            delay = retry_after_seconds(retry_after)
+            if delay is not None:
+                if delay > RETRY_AFTER_MAX:
+                    break
+                self.host_ready[host] = max(self.host_ready.get(host, 0), time.monotonic() + delay)
+        result.checked = time.time()
+        return result
+
+    async def _check_all(self, urls, progress):
+        results = {}
+        queue = deque(interleave_by_host(urls))
+        total = len(queue)
+        started = last_report = time.monotonic()
+
+        connector = aiohttp.TCPConnector(limit=self.concurrency, limit_per_host=self.per_host,
+                                         ttl_dns_cache=3600)
+        timeout = aiohttp.ClientTimeout(total=self.timeout)
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout,
+                                         headers={'User-Agent': USER_AGENT}) as session:
+            async def worker():
+                nonlocal last_report
+                while queue:
+                    url = queue.popleft()
+                    results[url] = await self.check(session, url)
+                    now = time.monotonic()
+                    if progress and now - last_report >= PROGRESS_EVERY:
+                        last_report = now
+                        done = len(results)
+                        rate = done / (now - started)
+                        print(f"  Progress: {done}/{total} ({rate:.0f} URLs/s, "
+                              f"~{(total - done) / rate / 60:.0f} min left)")
+
+            await asyncio.gather(*(worker() for _ in range(min(self.concurrency, total))))
+        return results
+
+    def validate(self, urls: Iterable[str], progress=True) -> Dict[str, UrlCheck]:
+        """Check every distinct URL (cached OK results within the TTL are reused)"""
+        urls = list(dict.fromkeys(u for u in urls if u))
+        cached = self.cache.fresh_ok(urls) if self.cache else {}
+        todo = [u for u in urls if u not in cached]
+        if progress:
+            print(f"  {len(urls)} distinct URLs, {len(cached)} verified recently, checking {len(todo)}")
+
+        results = asyncio.run(self._check_all(todo, progress)) if todo else {}
+        if not any(r.status is not None and resolved_by_name(r.url) for r in results.values()):
+            # No host looked up by name answered: the resolver or the network is down, not the hosts
+            for r in results.values():
+                if r.dead and r.status is None:
+                    r.outcome = INCONCLUSIVE
+        if self.cache:
+            self.cache.put_many(results.values())
+
+        self.stats['checked'] += len(results)
+        self.stats['cached'] += len(cached)
+        self.stats['dead'] += sum(1 for r in results.values() if r.dead)
+        self.stats['inconclusive'] += sum(1 for r in results.values() if r.outcome == INCONCLUSIVE)
+        results.update(cached)
+        return results
+
+    def close(self):
+        if self.cache:
+            self.cache.close()
@@ -23,12 +23,21 @@ from datetime import datetime, timedelta
 import re
 from urllib.parse import urljoin, urlparse
 import time
+import threading
+from collections import Counter
 from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import partial
 import hashlib
 from dataclasses import dataclass, asdict
-from typing import List, Dict, Optional, Set
+from typing import Callable, List, Dict, Optional, Set, Tuple
 import logging
 
+from requests.adapters import HTTPAdapter, Retry
+
+from amounts import amount_range
+from fingerprints import FingerprintStore
+from ingest import BulkIngestClient
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -42,6 +51,37 @@ INTERNAL_TOKEN = os.environ.get('INTERNAL_API_TOKEN', 'internal-token-placeholde
 MAX_WORKERS = int(os.environ.get('MAX_WORKERS', '10'))
 MAX_GRANTS_PER_SOURCE = int(os.environ.get('MAX_GRANTS_PER_SOURCE', '50'))
 GOAL = int(os.environ.get('GRANT_GOAL', '1000'))
+# Fingerprints of grants from earlier runs (shared with scraper.py); '' disables the check
+STATE_DB = os.environ.get('SCRAPER_STATE_DB', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'scraper_state.sqlite'))
+FINGERPRINTS_ENABLED = os.environ.get('SCRAPER_FINGERPRINTS_ENABLED', 'true').lower() == 'true'
+# Minimum seconds between two requests to the same host, across all workers
+HOST_INTERVAL = float(os.environ.get('SCRAPER_HOST_INTERVAL_SEC', '0.5'))
+REQUEST_TIMEOUT = 15
+
+GRANTS_GOV_URL = "https://www.grants.gov/grantsws/rest/opportunities/search/"
+GRANTS_GOV_PAGES = 10
+NSF_FEEDS = [
+    'https://www.nsf.gov/funding/rss/custom_rss.jsp?org=NSF&rss_action=display',
+    'https://www.research.gov/common/rss/recent_funding_opps.xml',
+]
+NIH_GUIDE_URL = "https://grants.nih.gov/funding/searchguide/index.html"
+# Foundation URLs (public listings)
+FOUNDATIONS = [
+    ('gatesfoundation', 'https://www.gatesfoundation.org/about/committed-grants'),
+    ('ford-foundation', 'https://www.fordfoundation.org/work/our-grants/grants-database/'),
+]
+# Major state grant portals
+STATE_PORTALS = {
+    'california': 'https://www.grants.ca.gov/',
+    'texas': 'https://comptroller.texas.gov/programs/seco/grant-opportunities/',
+    'newyork': 'https://grantsgateway.ny.gov/',
+    'florida': 'https://www.floridagrants.org/',
+}
+CORPORATE_SOURCES = [
+    ('google-grants', 'https://www.google.com/grants/'),
+    ('microsoft-grants', 'https://www.microsoft.com/en-us/philanthropies/grants'),
+    ('amazon-grants', 'https://www.aboutamazon.com/news/community/amazon-announces-grants'),
+]
 
 @dataclass
 class Grant:
@@ -60,28 +100,58 @@ class Grant:
     def to_dict(self):
         return {k: v for k, v in asdict(self).items() if v is not None}
 
-class AggressiveGrantScraper:
-    def __init__(self):
-        self.grants = []
-        self.seen_urls = set()
-        self.seen_titles = set()
+def build_session(pool_size: int = MAX_WORKERS) -> requests.Session:
+    """One keep-alive pool shared by all workers (requests.get opens a new connection per call)."""
+    s = requests.Session()
+    retries = Retry(total=2, backoff_factor=0.5, status_forcelist=(429, 500, 502, 503, 504),
+                    allowed_methods=frozenset(["GET", "HEAD"]))
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retries)
+    s.mount("http://", adapter)
+    s.mount("https://", adapter)
+    return s
+
+class HostPacer:
+    """Spaces requests to the same host at least `interval` seconds apart, whichever thread sends them."""
+
+    def __init__(self, interval: float = HOST_INTERVAL):
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._next: Dict[str, float] = {}
+
+    def wait(self, url: str):
+        host = (urlparse(url).hostname or '').lower()
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next.get(host, 0.0))
+            self._next[host] = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+class GrantRegistry:
+    """Grants accepted this run plus the counters; every update happens under one lock."""
+
+    def __init__(self, fingerprints: Optional[FingerprintStore] = None):
+        self.grants: List[Grant] = []
+        self.seen_urls: Set[str] = set()
+        self.seen_titles: Set[str] = set()
+        self.fingerprints = fingerprints
         self.stats = {
             'total_found': 0,
             'duplicates': 0,
             'uploaded': 0,
             'errors': 0
         }
-        
-    def generate_source_id(self, grant: Grant) -> str:
-        """Generate unique source ID"""
-        if grant.sourceId:
-            return grant.sourceId
-        # Create hash from URL or title
-        unique_str = grant.url or grant.title
-        return hashlib.md5(unique_str.encode()).hexdigest()
-    
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.grants)
+
+    def bump(self, stat: str, n: int = 1):
+        with self._lock:
+            self.stats[stat] += n
+
     def is_duplicate(self, grant: Grant) -> bool:
-        """Check if grant is duplicate"""
+        """Check if grant is duplicate (caller holds the lock)"""
         # Check URL
         if grant.url and grant.url in self.seen_urls:
             return True
@@ -91,20 +161,66 @@ class AggressiveGrantScraper:
         if title_lower in self.seen_titles:
             return True
         
+        # Check the whole corpus from earlier runs (canonical URL / SimHash); a grant
+        # not seen before is reserved in the same step and stored once uploaded
+        if self.fingerprints and self.fingerprints.reserve(grant.to_dict()):
+            return True
+        
         return False
+
+    def add(self, grant: Grant) -> bool:
+        """Add grant if not duplicate; the check and the insert are one step"""
+        with self._lock:
+            if self.is_duplicate(grant):
+                self.stats['duplicates'] += 1
+                return False
+            self.grants.append(grant)
+            self.seen_urls.add(grant.url)
+            self.seen_titles.add(grant.title.lower().strip())
+            self.stats['total_found'] += 1
+            return True
+
+class AggressiveGrantScraper:
+    def __init__(self):
+        self.registry = GrantRegistry(self._open_fingerprints())
+        self.session = build_session()
+        self.pacer = HostPacer()
+
+    @property
+    def grants(self) -> List[Grant]:
+        return self.registry.grants
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        return self.registry.stats
+        
+    def _open_fingerprints(self) -> Optional[FingerprintStore]:
+        if not FINGERPRINTS_ENABLED:
+            return None
+        try:
+            return FingerprintStore(STATE_DB)
+        except Exception as e:
+            logger.warning(f"Fingerprint store unavailable: {e}")
+            return None
+    
+    def generate_source_id(self, grant: Grant) -> str:
+        """Generate unique source ID"""
+        if grant.sourceId:
+            return grant.sourceId
+        # Create hash from URL or title
+        unique_str = grant.url or grant.title
+        return hashlib.md5(unique_str.encode()).hexdigest()
     
     def add_grant(self, grant: Grant):
         """Add grant if not duplicate"""
-        if self.is_duplicate(grant):
-            self.stats['duplicates'] += 1
-            return False
-        
+        # sourceId first, so re-finding the same grant is an update rather than a duplicate
         grant.sourceId = self.generate_source_id(grant)
-        self.grants.append(grant)
-        self.seen_urls.add(grant.url)
-        self.seen_titles.add(grant.title.lower().strip())
-        self.stats['total_found'] += 1
-        return True
+        return self.registry.add(grant)
+
+    def fetch(self, url: str, **kwargs) -> requests.Response:
+        """GET through the shared session, paced per host"""
+        self.pacer.wait(url)
+        return self.session.get(url, timeout=REQUEST_TIMEOUT, **kwargs)
     
     def parse_date(self, date_str: str) -> Optional[str]:
         """Parse various date formats"""
@@ -134,357 +250,234 @@ class AggressiveGrantScraper:
     
     def extract_funding(self, text: str) -> tuple:
         """Extract funding amounts from text"""
-        if not text:
-            return None, None
-        
-        # Patterns for funding amounts
-        patterns = [
-            r'\$(\d+(?:,\d{3})*(?:\.\d{2})?)\s*(?:to|-)\s*\$(\d+(?:,\d{3})*(?:\.\d{2})?)',
-            r'\$(\d+(?:,\d{3})*(?:\.\d{2})?)',
-            r'(\d+(?:,\d{3})*(?:\.\d{2})?)\s*(?:dollars|USD)',
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                try:
-                    if len(match.groups()) == 2:
-                        min_val = float(match.group(1).replace(',', ''))
-                        max_val = float(match.group(2).replace(',', ''))
-                        return min_val, max_val
-                    else:
-                        val = float(match.group(1).replace(',', ''))
-                        return val, val
-                except:
-                    pass
-        
-        return None, None
+        min_val, max_val, _ = amount_range(text)
+        return min_val, max_val
     
     # ============= SOURCE SCRAPERS =============
+    # Each method fetches one page or feed, so every fetch is its own pool task
     
-    def scrape_grants_gov(self) -> List[Grant]:
-        """Scrape Grants.gov API"""
+    def scrape_grants_gov_page(self, page: int) -> List[Grant]:
+        """Scrape one page of the Grants.gov API"""
         grants = []
-        logger.info("Scraping Grants.gov...")
+        response = self.fetch(GRANTS_GOV_URL, params={'oppNum': page, 'rows': 25})
         
-        try:
-            # Use Grants.gov API
-            url = "https://www.grants.gov/grantsws/rest/opportunities/search/"
+        if response.status_code == 200:
+            data = response.json()
             
-            for page in range(1, 11):  # Get 10 pages
-                try:
-                    response = requests.get(
-                        url,
-                        params={'oppNum': page, 'rows': 25},
-                        timeout=15
-                    )
-                    
-                    if response.status_code == 200:
-                        data = response.json()
-                        
-                        for opp in data.get('oppHits', []):
-                            grant = Grant(
-                                title=opp.get('oppTitle', ''),
-                                source='grants.gov',
-                                url=f"https://www.grants.gov/web/grants/view-opportunity.html?oppId={opp.get('oppNumber', '')}",
-                                description=opp.get('oppDescription', ''),
-                                deadline=self.parse_date(opp.get('closeDate', '')),
-                                fundingMin=opp.get('awardFloor'),
-                                fundingMax=opp.get('awardCeiling'),
-                                eligibility=opp.get('eligibility', ''),
-                                sourceId=opp.get('oppNumber', '')
-                            )
-                            
-                            if grant.title:
-                                self.add_grant(grant)
-                                grants.append(grant)
-                    
-                    time.sleep(0.5)  # Rate limiting
-                    
-                except Exception as e:
-                    logger.error(f"Error scraping Grants.gov page {page}: {e}")
-                    continue
-                    
-        except Exception as e:
-            logger.error(f"Error scraping Grants.gov: {e}")
-            self.stats['errors'] += 1
+            for opp in data.get('oppHits', []):
+                grant = Grant(
+                    title=opp.get('oppTitle', ''),
+                    source='grants.gov',
+                    url=f"https://www.grants.gov/web/grants/view-opportunity.html?oppId={opp.get('oppNumber', '')}",
+                    description=opp.get('oppDescription', ''),
+                    deadline=self.parse_date(opp.get('closeDate', '')),
+                    fundingMin=opp.get('awardFloor'),
+                    fundingMax=opp.get('awardCeiling'),
+                    eligibility=opp.get('eligibility', ''),
+                    sourceId=opp.get('oppNumber', '')
+                )
+                
+                if grant.title:
+                    self.add_grant(grant)
+                    grants.append(grant)
         
-        logger.info(f"Found {len(grants)} grants from Grants.gov")
         return grants
     
-    def scrape_nsf_rss(self) -> List[Grant]:
-        """Scrape NSF RSS feeds"""
+    def scrape_nsf_feed(self, feed_url: str) -> List[Grant]:
+        """Scrape one NSF RSS feed"""
         grants = []
-        logger.info("Scraping NSF RSS feeds...")
-        
-        feeds = [
-            'https://www.nsf.gov/funding/rss/custom_rss.jsp?org=NSF&rss_action=display',
-            'https://www.research.gov/common/rss/recent_funding_opps.xml',
-        ]
-        
-        for feed_url in feeds:
-            try:
-                feed = feedparser.parse(feed_url)
-                
-                for entry in feed.entries[:MAX_GRANTS_PER_SOURCE]:
-                    grant = Grant(
-                        title=entry.get('title', ''),
-                        source='nsf',
-                        url=entry.get('link', ''),
-                        description=entry.get('summary', ''),
-                        deadline=self.parse_date(entry.get('published', ''))
-                    )
-                    
-                    if grant.title and grant.url:
-                        self.add_grant(grant)
-                        grants.append(grant)
-                        
-            except Exception as e:
-                logger.error(f"Error scraping NSF feed {feed_url}: {e}")
-                self.stats['errors'] += 1
+        feed = feedparser.parse(self.fetch(feed_url).content)
+        
+        for entry in feed.entries[:MAX_GRANTS_PER_SOURCE]:
+            grant = Grant(
+                title=entry.get('title', ''),
+                source='nsf',
+                url=entry.get('link', ''),
+                description=entry.get('summary', ''),
+                deadline=self.parse_date(entry.get('published', ''))
+            )
+            
+            if grant.title and grant.url:
+                self.add_grant(grant)
+                grants.append(grant)
         
-        logger.info(f"Found {len(grants)} grants from NSF")
         return grants
     
     def scrape_nih_guide(self) -> List[Grant]:
         """Scrape NIH Guide"""
         grants = []
-        logger.info("Scraping NIH Guide...")
+        url = NIH_GUIDE_URL
+        response = self.fetch(url)
+        soup = BeautifulSoup(response.content, 'html.parser')
         
-        try:
-            url = "https://grants.nih.gov/funding/searchguide/index.html"
-            response = requests.get(url, timeout=15)
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            # Find grant listings
-            for item in soup.find_all('div', class_='guide-item')[:MAX_GRANTS_PER_SOURCE]:
-                try:
-                    title_elem = item.find('a')
-                    if not title_elem:
-                        continue
-                    
-                    grant = Grant(
-                        title=title_elem.text.strip(),
-                        source='nih',
-                        url=urljoin(url, title_elem.get('href', '')),
-                        description=item.get_text(strip=True)
-                    )
-                    
-                    # Try to find deadline
-                    deadline_text = item.find(text=re.compile(r'deadline|due date', re.I))
-                    if deadline_text:
-                        grant.deadline = self.parse_date(deadline_text)
-                    
-                    if grant.title and grant.url:
-                        self.add_grant(grant)
-                        grants.append(grant)
-                        
-                except Exception as e:
-                    logger.error(f"Error parsing NIH grant: {e}")
+        # Find grant listings
+        for item in soup.find_all('div', class_='guide-item')[:MAX_GRANTS_PER_SOURCE]:
+            try:
+                title_elem = item.find('a')
+                if not title_elem:
                     continue
+                
+                grant = Grant(
+                    title=title_elem.text.strip(),
+                    source='nih',
+                    url=urljoin(url, title_elem.get('href', '')),
+                    description=item.get_text(strip=True)
+                )
+                
+                # Try to find deadline
+                deadline_text = item.find(text=re.compile(r'deadline|due date', re.I))
+                if deadline_text:
+                    grant.deadline = self.parse_date(deadline_text)
+                
+                if grant.title and grant.url:
+                    self.add_grant(grant)
+                    grants.append(grant)
                     
-        except Exception as e:
-            logger.error(f"Error scraping NIH Guide: {e}")
-            self.stats['errors'] += 1
+            except Exception as e:
+                logger.error(f"Error parsing NIH grant: {e}")
+                continue
         
-        logger.info(f"Found {len(grants)} grants from NIH")
         return grants
     
-    def scrape_foundation_center(self) -> List[Grant]:
-        """Scrape foundation databases"""
+    def scrape_foundation(self, source: str, url: str) -> List[Grant]:
+        """Scrape one foundation listing"""
         grants = []
-        logger.info("Scraping foundation sources...")
+        response = self.fetch(url)
+        soup = BeautifulSoup(response.content, 'html.parser')
         
-        # Foundation URLs (public listings)
-        foundations = [
-            ('gatesfoundation', 'https://www.gatesfoundation.org/about/committed-grants'),
-            ('ford-foundation', 'https://www.fordfoundation.org/work/our-grants/grants-database/'),
-        ]
-        
-        for source, url in foundations:
-            try:
-                response = requests.get(url, timeout=15)
-                soup = BeautifulSoup(response.content, 'html.parser')
+        # Find grant links (generic selectors)
+        for link in soup.find_all('a', href=True)[:MAX_GRANTS_PER_SOURCE]:
+            title = link.text.strip()
+            href = urljoin(url, link.get('href', ''))
+            
+            # Filter out navigation links
+            if len(title) > 20 and 'grant' in title.lower():
+                grant = Grant(
+                    title=title,
+                    source=source,
+                    url=href,
+                    description=title
+                )
                 
-                # Find grant links (generic selectors)
-                for link in soup.find_all('a', href=True)[:MAX_GRANTS_PER_SOURCE]:
-                    title = link.text.strip()
-                    href = urljoin(url, link.get('href', ''))
-                    
-                    # Filter out navigation links
-                    if len(title) > 20 and 'grant' in title.lower():
-                        grant = Grant(
-                            title=title,
-                            source=source,
-                            url=href,
-                            description=title
-                        )
-                        
-                        if self.add_grant(grant):
-                            grants.append(grant)
-                            
-            except Exception as e:
-                logger.error(f"Error scraping {source}: {e}")
-                continue
+                if self.add_grant(grant):
+                    grants.append(grant)
         
-        logger.info(f"Found {len(grants)} grants from foundations")
         return grants
     
-    def scrape_state_grants(self) -> List[Grant]:
-        """Scrape state grant portals"""
+    def scrape_state_portal(self, state: str, url: str) -> List[Grant]:
+        """Scrape one state grant portal"""
         grants = []
-        logger.info("Scraping state grant portals...")
-        
-        # Major state grant portals
-        states = {
-            'california': 'https://www.grants.ca.gov/',
-            'texas': 'https://comptroller.texas.gov/programs/seco/grant-opportunities/',
-            'newyork': 'https://grantsgateway.ny.gov/',
-            'florida': 'https://www.floridagrants.org/',
-        }
+        response = self.fetch(url)
+        soup = BeautifulSoup(response.content, 'html.parser')
         
-        for state, url in states.items():
-            try:
-                response = requests.get(url, timeout=15)
-                soup = BeautifulSoup(response.content, 'html.parser')
+        # Generic grant link finding
+        for link in soup.find_all('a', href=True)[:50]:
+            title = link.text.strip()
+            
+            if (len(title) > 15 and 
+                any(keyword in title.lower() for keyword in ['grant', 'funding', 'program', 'opportunity'])):
                 
-                # Generic grant link finding
-                for link in soup.find_all('a', href=True)[:50]:
-                    title = link.text.strip()
-                    
-                    if (len(title) > 15 and 
-                        any(keyword in title.lower() for keyword in ['grant', 'funding', 'program', 'opportunity'])):
-                        
-                        grant = Grant(
-                            title=title,
-                            source=f'state-{state}',
-                            url=urljoin(url, link.get('href', '')),
-                            description=f"State grant opportunity from {state.title()}"
-                        )
-                        
-                        if self.add_grant(grant):
-                            grants.append(grant)
-                            
-            except Exception as e:
-                logger.error(f"Error scraping {state}: {e}")
-                continue
+                grant = Grant(
+                    title=title,
+                    source=f'state-{state}',
+                    url=urljoin(url, link.get('href', '')),
+                    description=f"State grant opportunity from {state.title()}"
+                )
+                
+                if self.add_grant(grant):
+                    grants.append(grant)
         
-        logger.info(f"Found {len(grants)} grants from state portals")
         return grants
     
-    def scrape_corporate_grants(self) -> List[Grant]:
-        """Scrape corporate grant programs"""
+    def scrape_corporate(self, source: str, url: str) -> List[Grant]:
+        """Scrape one corporate grant program page"""
         grants = []
-        logger.info("Scraping corporate grant programs...")
+        response = self.fetch(url)
+        soup = BeautifulSoup(response.content, 'html.parser')
         
-        corporate_sources = [
-            ('google-grants', 'https://www.google.com/grants/'),
-            ('microsoft-grants', 'https://www.microsoft.com/en-us/philanthropies/grants'),
-            ('amazon-grants', 'https://www.aboutamazon.com/news/community/amazon-announces-grants'),
-        ]
-        
-        for source, url in corporate_sources:
-            try:
-                response = requests.get(url, timeout=15)
-                soup = BeautifulSoup(response.content, 'html.parser')
+        for link in soup.find_all('a', href=True)[:30]:
+            title = link.text.strip()
+            
+            if len(title) > 20:
+                grant = Grant(
+                    title=title,
+                    source=source,
+                    url=urljoin(url, link.get('href', '')),
+                    description=title
+                )
                 
-                for link in soup.find_all('a', href=True)[:30]:
-                    title = link.text.strip()
-                    
-                    if len(title) > 20:
-                        grant = Grant(
-                            title=title,
-                            source=source,
-                            url=urljoin(url, link.get('href', '')),
-                            description=title
-                        )
-                        
-                        if self.add_grant(grant):
-                            grants.append(grant)
-                            
-            except Exception as e:
-                logger.error(f"Error scraping {source}: {e}")
-                continue
+                if self.add_grant(grant):
+                    grants.append(grant)
         
-        logger.info(f"Found {len(grants)} grants from corporate sources")
         return grants
+
+    def source_tasks(self) -> List[Tuple[str, str, Callable[[], List[Grant]]]]:
+        """(source group, task name, fetch) for every page and feed of every source"""
+        tasks = [('grants.gov', f'page {page}', partial(self.scrape_grants_gov_page, page))
+                 for page in range(1, GRANTS_GOV_PAGES + 1)]
+        tasks += [('nsf', feed_url, partial(self.scrape_nsf_feed, feed_url)) for feed_url in NSF_FEEDS]
+        tasks += [('nih', NIH_GUIDE_URL, self.scrape_nih_guide)]
+        tasks += [('foundations', source, partial(self.scrape_foundation, source, url))
+                  for source, url in FOUNDATIONS]
+        tasks += [('state portals', state, partial(self.scrape_state_portal, state, url))
+                  for state, url in STATE_PORTALS.items()]
+        tasks += [('corporate', source, partial(self.scrape_corporate, source, url))
+                  for source, url in CORPORATE_SOURCES]
+        return tasks
     
     def scrape_all_sources(self) -> List[Grant]:
-        """Scrape all sources in parallel"""
-        logger.info(f"Starting aggressive scraping with {MAX_WORKERS} workers...")
+        """Scrape every page of every source in parallel"""
+        tasks = self.source_tasks()
+        logger.info(f"Starting aggressive scraping: {len(tasks)} page tasks on {MAX_WORKERS} workers...")
         logger.info(f"Goal: {GOAL} grants\n")
         
         all_grants = []
+        per_group = Counter()
         
-        # List of scraper methods
-        scrapers = [
-            self.scrape_grants_gov,
-            self.scrape_nsf_rss,
-            self.scrape_nih_guide,
-            self.scrape_foundation_center,
-            self.scrape_state_grants,
-            self.scrape_corporate_grants,
-        ]
-        
-        # Run scrapers in parallel
         with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
-            futures = {executor.submit(scraper): scraper.__name__ for scraper in scrapers}
+            futures = {executor.submit(fn): (group, name) for group, name, fn in tasks}
             
             for future in as_completed(futures):
-                scraper_name = futures[future]
+                group, name = futures[future]
                 try:
                     grants = future.result()
                     all_grants.extend(grants)
-                    logger.info(f"✓ {scraper_name} completed: {len(grants)} grants")
+                    per_group[group] += len(grants)
+                    logger.info(f"✓ {group} {name}: {len(grants)} grants ({len(self.registry)} total)")
                 except Exception as e:
-                    logger.error(f"✗ {scraper_name} failed: {e}")
-                    self.stats['errors'] += 1
+                    logger.error(f"✗ {group} {name} failed: {e}")
+                    self.registry.bump('errors')
         
+        for group, count in per_group.items():
+            logger.info(f"Found {count} grants from {group}")
         return all_grants
     
-    def upload_grants(self, batch_size=50):
-        """Upload grants to backend"""
+    def upload_grants(self, batch_size=200):
+        """Upload grants to backend, batch_size grants per bulk request"""
         logger.info(f"\nUploading {len(self.grants)} grants to backend...")
         
-        url = f"{BACKEND_URL}/api/internal/grants"
-        headers = {
-            'Authorization': f'Bearer {INTERNAL_TOKEN}',
-            'Content-Type': 'application/json'
-        }
-        
+        client = BulkIngestClient(f"{BACKEND_URL}/api/internal/grants", INTERNAL_TOKEN,
+                                  batch_size=batch_size, max_concurrency=MAX_WORKERS)
+        payloads = [grant.to_dict() for grant in self.grants]
+        results = client.post_many(payloads)
+        if self.registry.fingerprints:
+            self.registry.fingerprints.confirm([p for p, r in zip(payloads, results) if r.get('ok')])
+            self.registry.fingerprints.release([p for p, r in zip(payloads, results) if not r.get('ok')])
         uploaded = 0
         failed = 0
-        
-        for i in range(0, len(self.grants), batch_size):
-            batch = self.grants[i:i+batch_size]
-            
-            for grant in batch:
-                try:
-                    response = requests.post(
-                        url,
-                        headers=headers,
-                        json=grant.to_dict(),
-                        timeout=10
-                    )
-                    
-                    if response.status_code in [200, 201]:
-                        uploaded += 1
-                    else:
-                        failed += 1
-                        logger.error(f"Failed to upload grant: {response.status_code} - {response.text[:100]}")
-                        
-                except Exception as e:
-                    failed += 1
-                    logger.error(f"Error uploading grant: {e}")
-            
-            # Progress update
-            if (i + batch_size) % 100 == 0:
-                logger.info(f"Progress: {min(i + batch_size, len(self.grants))}/{len(self.grants)} grants processed")
-            
-            time.sleep(0.1)  # Rate limiting
+        for res in results:
+            if res.get('ok'):
+                uploaded += 1
+            else:
+                failed += 1
+                logger.error(f"Failed to upload grant: {(res.get('error') or '')[:100]}")
         
         self.stats['uploaded'] = uploaded
-        logger.info(f"\n✓ Successfully uploaded {uploaded} grants")
+        conc = client.concurrency_stats()
+        logger.info(f"\n✓ Successfully uploaded {uploaded} grants in {client.stats['requests']} requests "
+                    f"({conc['items_per_sec']} grants/s, concurrency peak {conc['peak']}, final {conc['final']})")
+        for row in conc['timeline']:
+            logger.info(f"  t={row['t']}s: {row['items_per_sec']} grants/s at concurrency {row['concurrency']}")
         if failed > 0:
             logger.warning(f"✗ Failed to upload {failed} grants")
     
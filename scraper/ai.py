@@ -0,0 +1,485 @@
+#!/usr/bin/env python3
+"""
+AI title/summary generation for scraped grants.
+
+One chat completion per grant returns both the improved title and the
+summary as a JSON object. Calls for a whole batch of grants run on an
+asyncio pool with bounded concurrency, a per-call timeout and backoff that
+honours the server's retry-after hints on 429/5xx responses.
+
+Point OPENAI_BASE_URL (or AIClient(base_url=...)) at stub_server.py to run
+the path offline.
+
+With a cache (any object with get/put, normally cache.LRUStore), results are
+stored under a hash of the exact messages, model, sampling settings and
+PROMPT_VERSION, so unchanged grants never reach the API again.
+
+Before a job is sent it passes a gate: titles that are already specific and
+descriptions that are already summary-sized are kept as they are, so a
+grant may need only one of the two fields or no call at all. Long
+descriptions are trimmed to a token budget by keeping the highest-scoring
+sentences in their original order.
+
+Batch files use the OpenAI Batch API request format (one chat completion
+request per line, keyed by custom_id). A sidecar file next to it keeps each
+request's job and the payload to patch once results are in.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import random
+import re
+import time
+from dataclasses import asdict, dataclass, replace
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from summarize import split_sentences
+
+# Bump whenever the prompt or reply format changes.
+PROMPT_VERSION = "2"
+
+SYSTEM_PROMPT = (
+    "You are a research funding expert who writes clear, specific titles and "
+    "concise summaries of grant opportunities for researchers. "
+    "Reply with a JSON object only."
+)
+
+TITLE_MAX = 80
+BACKOFF_BASE_SEC = 1.0
+BACKOFF_MAX_SEC = 30.0
+
+# Words that say "this is a grant" without saying which one
+GENERIC_TITLE_WORDS = {
+    "grant", "grants", "funding", "fund", "funds", "program", "programs", "programme",
+    "opportunity", "opportunities", "apply", "application", "applications", "call",
+    "calls", "proposal", "proposals", "for", "and", "the", "of", "a", "an", "to", "in",
+    "open", "new", "current", "available", "details", "overview", "information", "info",
+    "page", "home", "notice", "announcement", "solicitation", "award", "awards", "now",
+}
+
+# Sentences mentioning these are kept first when a description is trimmed
+TRIM_KEYWORDS = (
+    "deadline", "due", "eligib", "applicant", "apply", "award", "funding", "amount",
+    "purpose", "support", "focus", "research", "$", "€", "£",
+)
+
+
+@dataclass
+class AIJob:
+    title: str
+    description: str
+    eligibility: str
+    funding_min: Optional[float]
+    funding_max: Optional[float]
+    currency: str
+    source: str
+    need_title: bool = True
+    need_summary: bool = True
+
+
+@dataclass
+class AIResult:
+    title: str
+    summary: str
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+
+
+def build_messages(job: AIJob) -> List[Dict[str, str]]:
+    asks = []
+    if job.need_title:
+        asks.append(f"""
+    "title": a specific, descriptive title under {TITLE_MAX} characters. Name the research
+    area or focus, the funding agency if relevant, and the type of funding (research,
+    fellowship, equipment, ...). Use professional academic language.
+""")
+    if job.need_summary:
+        asks.append("""
+    "summary": 2-3 plain-language sentences covering what the grant is for, who can
+    apply, the funding amount and timeline, and key requirements or focus areas.
+""")
+    keys = ", ".join(f'"{k}": "..."' for k, need in (("title", job.need_title), ("summary", job.need_summary)) if need)
+    prompt = f"""
+    Improve the title and write a summary for this grant opportunity.
+
+    Grant Title: {job.title}
+    Description: {job.description}
+    Eligibility: {job.eligibility}
+    Funding: {job.currency} {job.funding_min or 'TBD'} - {job.funding_max or 'TBD'}
+    Source: {job.source}
+{"".join(asks)}
+    Return {{{keys}}}
+    """
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": prompt},
+    ]
+
+
+def estimate_tokens(text: str) -> int:
+    # ~4 characters per token for English prose; good enough for budgeting
+    return (len(text or "") + 3) // 4
+
+
+def title_is_specific(title: str, min_chars: int = 25) -> bool:
+    """Long enough, short enough, and not made only of generic grant words."""
+    title = (title or "").strip()
+    if not (min_chars <= len(title) <= TITLE_MAX):
+        return False
+    words = re.findall(r"[a-z0-9]+", title.lower())
+    specific = [w for w in words if w not in GENERIC_TITLE_WORDS and not w.isdigit()]
+    return len(words) >= 4 and len(specific) >= 2
+
+
+def trim_to_budget(text: str, max_tokens: int, keywords: Sequence[str] = TRIM_KEYWORDS) -> str:
+    """Keep the best sentences (early position, grant details) within max_tokens, in original order."""
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    sentences = split_sentences(text)
+    scored = []
+    for i, sent in enumerate(sentences):
+        low = sent.lower()
+        hits = sum(1 for kw in keywords if kw in low)
+        scored.append((1.0 / (1 + 0.3 * i) + 0.5 * hits, i))
+    keep = set()
+    used = 0
+    for _, i in sorted(scored, reverse=True):
+        cost = estimate_tokens(sentences[i]) + 1
+        if used + cost > max_tokens:
+            continue
+        keep.add(i)
+        used += cost
+    if not keep:
+        return text[:max_tokens * 4]
+    return " ".join(sentences[i] for i in sorted(keep))
+
+
+def parse_reply(content: str) -> Optional[Dict[str, str]]:
+    """Pull title/summary out of the model reply; tolerates code fences around the JSON."""
+    if not content:
+        return None
+    m = re.search(r"\{.*\}", content, re.DOTALL)
+    if not m:
+        return None
+    try:
+        data = json.loads(m.group(0))
+    except ValueError:
+        return None
+    title = str(data.get("title") or "").strip().strip("\"'")
+    summary = str(data.get("summary") or "").strip()
+    if not title and not summary:
+        return None
+    return {"title": title[:TITLE_MAX], "summary": summary}
+
+
+def result_from_completion(body: Dict[str, Any]) -> Optional[AIResult]:
+    """AIResult from a chat completion response body (dict form, as in batch result files)."""
+    try:
+        content = body["choices"][0]["message"]["content"]
+    except (KeyError, IndexError, TypeError):
+        return None
+    parsed = parse_reply(content or "")
+    if not parsed:
+        return None
+    usage = body.get("usage") or {}
+    return AIResult(parsed["title"], parsed["summary"],
+                    usage.get("prompt_tokens", 0) or 0, usage.get("completion_tokens", 0) or 0)
+
+
+def _retry_after(err: Exception) -> Optional[float]:
+    response = getattr(err, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    for name, scale in (("retry-after-ms", 0.001), ("retry-after", 1.0)):
+        value = headers.get(name)
+        if value:
+            try:
+                return float(value) * scale
+            except ValueError:
+                pass
+    return None
+
+
+class AIClient:
+    """Runs AI jobs concurrently against an OpenAI-compatible chat completions API."""
+
+    def __init__(self, api_key: str, model: str = "gpt-3.5-turbo",
+                 base_url: Optional[str] = None, concurrency: int = 8,
+                 timeout_sec: float = 30.0, max_retries: int = 4,
+                 max_tokens: int = 300, temperature: float = 0.3,
+                 cache: Any = None, gate: bool = True, title_min_chars: int = 25,
+                 summary_skip_chars: int = 400, prompt_token_budget: int = 600):
+        self.cache = cache
+        self.gate = gate
+        self.title_min_chars = title_min_chars
+        self.summary_skip_chars = summary_skip_chars
+        self.prompt_token_budget = prompt_token_budget
+        self.api_key = api_key
+        self.model = model
+        self.base_url = base_url
+        self.concurrency = max(1, concurrency)
+        self.timeout_sec = timeout_sec
+        self.max_retries = max_retries
+        self.max_tokens = max_tokens
+        self.temperature = temperature
+        self.stats: Dict[str, Any] = {
+            "calls": 0, "failures": 0, "retries": 0,
+            "prompt_tokens": 0, "completion_tokens": 0, "seconds": 0.0,
+            "cache_hits": 0, "cache_misses": 0, "tokens_saved": 0,
+            "calls_avoided": 0, "titles_kept": 0, "summaries_kept": 0,
+            "prompt_tokens_sent": 0, "prompt_tokens_trimmed": 0, "api_seconds": 0.0,
+            "last_error": None,
+        }
+
+    def prepare(self, job: AIJob) -> AIJob:
+        """Decide which fields need the model and trim the description to the prompt budget."""
+        if not self.gate:
+            return job
+        need_title = job.need_title and not title_is_specific(job.title, self.title_min_chars)
+        need_summary = job.need_summary and len(job.description or "") > self.summary_skip_chars
+        self.stats["titles_kept"] += job.need_title and not need_title
+        self.stats["summaries_kept"] += job.need_summary and not need_summary
+        description = job.description
+        if need_title or need_summary:
+            description = trim_to_budget(job.description, self.prompt_token_budget)
+            self.stats["prompt_tokens_trimmed"] += estimate_tokens(job.description) - estimate_tokens(description)
+        return replace(job, description=description, need_title=need_title, need_summary=need_summary)
+
+    def gate_stats(self) -> Dict[str, Any]:
+        calls = self.stats["calls"]
+        per_call = self.stats["api_seconds"] / calls if calls else 0.0
+        return {
+            "calls_avoided": self.stats["calls_avoided"],
+            "titles_kept": self.stats["titles_kept"],
+            "summaries_kept": self.stats["summaries_kept"],
+            "prompt_tokens_sent": self.stats["prompt_tokens_sent"],
+            "prompt_tokens_trimmed": self.stats["prompt_tokens_trimmed"],
+            "latency_saved_ms": round(self.stats["calls_avoided"] * per_call * 1000),
+        }
+
+    @staticmethod
+    def requested_only(job: AIJob, res: AIResult) -> AIResult:
+        """Blank out fields the job did not ask for; callers keep their own value for those."""
+        return replace(res,
+                       title=res.title if job.need_title else "",
+                       summary=res.summary if job.need_summary else "")
+
+    def request_body(self, job: AIJob) -> Dict[str, Any]:
+        return {
+            "model": self.model,
+            "messages": build_messages(job),
+            "max_tokens": self.max_tokens,
+            "temperature": self.temperature,
+            "response_format": {"type": "json_object"},
+        }
+
+    def cached(self, job: AIJob, key: Optional[str] = None) -> Optional[AIResult]:
+        """Cache lookup only; counts towards the hit-rate stats."""
+        if self.cache is None:
+            return None
+        hit = self.cache.get(key or self.cache_key(job))
+        if not hit:
+            self.stats["cache_misses"] += 1
+            return None
+        res = AIResult(**hit)
+        self.stats["cache_hits"] += 1
+        self.stats["tokens_saved"] += res.prompt_tokens + res.completion_tokens
+        return res
+
+    def remember(self, job: AIJob, result: AIResult):
+        if self.cache is not None:
+            self.cache.put(self.cache_key(job), asdict(result))
+
+    def cache_key(self, job: AIJob) -> str:
+        inputs = [PROMPT_VERSION, self.model, self.max_tokens, self.temperature, build_messages(job)]
+        return hashlib.sha256(json.dumps(inputs, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+    def enrich_many(self, jobs: Sequence[AIJob]) -> List[Optional[AIResult]]:
+        """Results in job order; None where a job failed after retries."""
+        if not jobs:
+            return []
+        t0 = time.perf_counter()
+        try:
+            results: List[Optional[AIResult]] = [None] * len(jobs)
+            jobs = [self.prepare(job) for job in jobs]
+            keys = [self.cache_key(job) for job in jobs] if self.cache is not None else []
+            todo = []
+            for i, job in enumerate(jobs):
+                if not (job.need_title or job.need_summary):
+                    # Nothing for the model to improve: callers keep the scraped fields
+                    self.stats["calls_avoided"] += 1
+                    results[i] = AIResult("", "")
+                    continue
+                results[i] = self.cached(job, keys[i] if keys else None)
+                if results[i] is None:
+                    todo.append(i)
+            if todo:
+                # identical prompts within one batch are sent once
+                groups: Dict[str, List[int]] = {}
+                for i in todo:
+                    groups.setdefault(keys[i] if keys else str(i), []).append(i)
+                firsts = [idx[0] for idx in groups.values()]
+                fresh = asyncio.run(self._run([jobs[i] for i in firsts]))
+                for (key, idx), res in zip(groups.items(), fresh):
+                    for i in idx:
+                        results[i] = res
+                    if res is not None and keys:
+                        self.cache.put(key, asdict(res))
+            for i, res in enumerate(results):
+                if res is not None:
+                    results[i] = self.requested_only(jobs[i], res)
+            return results
+        finally:
+            self.stats["seconds"] = round(self.stats["seconds"] + time.perf_counter() - t0, 3)
+
+    def cache_stats(self) -> Dict[str, Any]:
+        lookups = self.stats["cache_hits"] + self.stats["cache_misses"]
+        return {
+            "hits": self.stats["cache_hits"],
+            "misses": self.stats["cache_misses"],
+            "hit_rate": round(self.stats["cache_hits"] / lookups, 3) if lookups else 0.0,
+            "tokens_saved": self.stats["tokens_saved"],
+        }
+
+    def enrich(self, job: AIJob) -> Optional[AIResult]:
+        return self.enrich_many([job])[0]
+
+    async def _run(self, jobs: List[AIJob]) -> List[Optional[AIResult]]:
+        import httpx
+        from openai import AsyncOpenAI
+        limits = httpx.Limits(max_connections=self.concurrency, max_keepalive_connections=self.concurrency)
+        async with httpx.AsyncClient(limits=limits, timeout=self.timeout_sec) as http:
+            # Retries are handled here so backoff can follow the pool's view of rate limits
+            client = AsyncOpenAI(api_key=self.api_key, base_url=self.base_url,
+                                 timeout=self.timeout_sec, max_retries=0, http_client=http)
+            sem = asyncio.Semaphore(self.concurrency)
+            return await asyncio.gather(*(self._complete(client, sem, job) for job in jobs))
+
+    async def _complete(self, client, sem: asyncio.Semaphore, job: AIJob) -> Optional[AIResult]:
+        import openai
+        retryable = (openai.RateLimitError, openai.APITimeoutError,
+                     openai.APIConnectionError, openai.InternalServerError)
+        for attempt in range(self.max_retries + 1):
+            try:
+                body = self.request_body(job)
+                async with sem:
+                    self.stats["calls"] += 1
+                    self.stats["prompt_tokens_sent"] += sum(estimate_tokens(m["content"]) for m in body["messages"])
+                    t0 = time.perf_counter()
+                    try:
+                        response = await client.chat.completions.create(**body)
+                    finally:
+                        self.stats["api_seconds"] += time.perf_counter() - t0
+                parsed = parse_reply(response.choices[0].message.content or "")
+                if not parsed:
+                    self.stats["failures"] += 1
+                    self.stats["last_error"] = "unparseable reply"
+                    return None
+                usage = getattr(response, "usage", None)
+                result = AIResult(
+                    title=parsed["title"],
+                    summary=parsed["summary"],
+                    prompt_tokens=getattr(usage, "prompt_tokens", 0) or 0,
+                    completion_tokens=getattr(usage, "completion_tokens", 0) or 0,
+                )
+                self.stats["prompt_tokens"] += result.prompt_tokens
+                self.stats["completion_tokens"] += result.completion_tokens
+                return result
+            except retryable as e:
+                self.stats["last_error"] = f"{type(e).__name__}: {e}"
+                if attempt >= self.max_retries:
+                    break
+                self.stats["retries"] += 1
+                delay = _retry_after(e)
+                if delay is None:
+                    delay = min(BACKOFF_MAX_SEC, BACKOFF_BASE_SEC * 2 ** attempt) * random.uniform(0.5, 1.0)
+                await asyncio.sleep(delay)
+            except Exception as e:
+                self.stats["last_error"] = f"{type(e).__name__}: {e}"
+                break
+        self.stats["failures"] += 1
+        return None
+
+
+# ----------------- BATCH FILES -----------------
+def sidecar_path(batch_path: str) -> str:
+    root, ext = os.path.splitext(batch_path)
+    return f"{root}.payloads{ext or '.jsonl'}"
+
+
+def _write_batch(batch_path: str, client: AIClient,
+                 entries: Iterable[Tuple[str, AIJob, Dict[str, Any]]]) -> int:
+    """Replace the batch and sidecar files with (custom_id, job, payload) entries."""
+    paths = (batch_path, sidecar_path(batch_path))
+    n = 0
+    with open(f"{paths[0]}.tmp", "w", encoding="utf-8") as batch, \
+         open(f"{paths[1]}.tmp", "w", encoding="utf-8") as side:
+        for custom_id, job, payload in entries:
+            batch.write(json.dumps({"custom_id": custom_id, "method": "POST",
+                                    "url": "/v1/chat/completions",
+                                    "body": client.request_body(job)}) + "\n")
+            side.write(json.dumps({"custom_id": custom_id, "job": asdict(job),
+                                   "payload": payload}) + "\n")
+            n += 1
+    for path in paths:
+        os.replace(f"{path}.tmp", path)
+    return n
+
+
+def append_batch(batch_path: str, client: AIClient,
+                 entries: Iterable[Tuple[str, AIJob, Dict[str, Any]]]) -> int:
+    """
+    Add (custom_id, job, payload) entries as batch requests plus sidecar records. Both
+    files are rewritten from the sidecar so every custom_id appears once (the Batch API
+    rejects a file that repeats one); a re-queued grant replaces its older entry.
+    """
+    entries = list(entries)
+    if not entries:
+        return 0
+    merged = {cid: (cid, AIJob(**rec["job"]), rec["payload"]) for cid, rec in read_batch(batch_path).items()}
+    for custom_id, job, payload in entries:
+        merged.pop(custom_id, None)
+        merged[custom_id] = (custom_id, job, payload)
+    _write_batch(batch_path, client, merged.values())
+    return len(entries)
+
+
+def read_batch(batch_path: str) -> Dict[str, Dict[str, Any]]:
+    """Sidecar records by custom_id; a later record for the same grant replaces an earlier one."""
+    entries: Dict[str, Dict[str, Any]] = {}
+    path = sidecar_path(batch_path)
+    if not os.path.exists(path):
+        return entries
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                rec = json.loads(line)
+                entries.pop(rec["custom_id"], None)
+                entries[rec["custom_id"]] = rec
+    return entries
+
+
+def read_results(results_path: str) -> Dict[str, Optional[AIResult]]:
+    """Parse a batch results file (OpenAI Batch API output format) by custom_id."""
+    results: Dict[str, Optional[AIResult]] = {}
+    with open(results_path, "r", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            rec = json.loads(line)
+            response = rec.get("response") or {}
+            ok = not rec.get("error") and (response.get("status_code") or 200) < 300
+            results[rec["custom_id"]] = result_from_completion(response.get("body") or {}) if ok else None
+    return results
+
+
+def rewrite_batch(batch_path: str, client: AIClient, remaining: List[Dict[str, Any]]):
+    """Replace the batch and sidecar files with the entries still waiting for AI output."""
+    if remaining:
+        _write_batch(batch_path, client,
+                     ((rec["custom_id"], AIJob(**rec["job"]), rec["payload"]) for rec in remaining))
+        return
+    for path in (batch_path, sidecar_path(batch_path)):
+        if os.path.exists(path):
+            os.remove(path)
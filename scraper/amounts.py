@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Single-pass money-entity scanner shared by all scrapers.
+
+One compiled pattern walks the text once and yields MoneySpan objects for
+currency symbols/codes, numbers, magnitude words ("k", "million", ...) and
+ranges ("$50k - $100k", "between $1 and 2 million"). A span only counts as
+money when it carries a currency symbol or currency word, so bare numbers
+like "3 years" or "2025" are ignored.
+"""
+
+import re
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+SYMBOLS = {"$": "USD", "€": "EUR", "£": "GBP", "¥": "JPY", "₹": "INR"}
+
+CODES = {
+    "usd": "USD", "dollar": "USD", "dollars": "USD",
+    "eur": "EUR", "euro": "EUR", "euros": "EUR",
+    "gbp": "GBP", "pound": "GBP", "pounds": "GBP",
+    "jpy": "JPY", "yen": "JPY",
+    "inr": "INR", "rupee": "INR", "rupees": "INR",
+}
+
+MAGNITUDES = {
+    "k": 1e3, "thousand": 1e3,
+    "m": 1e6, "mn": 1e6, "million": 1e6,
+    "b": 1e9, "bn": 1e9, "billion": 1e9,
+    "lakh": 1e5, "crore": 1e7,
+}
+
+_SYM = r"[$€£¥₹]"
+_NUM = r"\d{1,3}(?:,\d{3})+(?:\.\d+)?|\d+(?:\.\d+)?"
+_MAG = r"thousand|million|billion|lakh|crore|bn|mn|k|m|b"
+_CODE = r"usd|eur|gbp|jpy|inr|dollars?|euros?|pounds?|yen|rupees?"
+
+
+def _amount(i: int) -> str:
+    return (
+        rf"(?:(?P<sym{i}>{_SYM})\s?)?(?P<num{i}>{_NUM})"
+        rf"(?:\s?(?P<mag{i}>{_MAG})\b)?"
+        rf"(?:\s?(?P<code{i}>{_CODE})\b)?"
+    )
+
+
+# The pattern starts on a currency symbol or digit so the regex engine can skip
+# ahead through plain prose; "between"/"from" and leading codes such as
+# "USD 5,000" are recovered from the few characters before each match.
+MONEY_RE = re.compile(
+    rf"""
+    (?<![\w.,]){_amount(1)}
+    (?:\s*(?P<sep>-|–|—|to|and)\s*(?:(?P<lead2>usd|eur|gbp|jpy|inr)\s?)?{_amount(2)})?
+    """,
+    re.IGNORECASE | re.VERBOSE,
+)
+_PREFIX_RE = re.compile(r"(?:\b(?P<between>between|from)\s+)?(?:\b(?P<lead>usd|eur|gbp|jpy|inr)\s?)?$", re.IGNORECASE)
+
+
+@dataclass
+class MoneySpan:
+    start: int
+    end: int
+    low: float
+    high: float
+    currency: Optional[str]
+
+    @property
+    def is_range(self) -> bool:
+        return self.low != self.high
+
+
+def _currency(m: "re.Match", i: int) -> Optional[str]:
+    sym = m.group(f"sym{i}")
+    if sym:
+        return SYMBOLS[sym]
+    code = m.group(f"code{i}")
+    if code:
+        return CODES[code.lower()]
+    return None
+
+
+def _value(m: "re.Match", i: int, mag: Optional[str] = None) -> Optional[float]:
+    try:
+        v = float(m.group(f"num{i}").replace(",", ""))
+    except (TypeError, ValueError):
+        return None
+    mag = (mag or m.group(f"mag{i}") or "").lower()
+    return v * MAGNITUDES.get(mag, 1)
+
+
+def _single_end(m: "re.Match") -> int:
+    for g in ("code1", "mag1", "num1"):
+        if m.group(g):
+            return m.end(g)
+    return m.end()
+
+
+def scan_money(text: str) -> List[MoneySpan]:
+    """Return every money entity in text, in order of appearance."""
+    spans: List[MoneySpan] = []
+    if not text:
+        return spans
+    pos = 0
+    while True:
+        m = MONEY_RE.search(text, pos)
+        if not m:
+            break
+        pos = m.end()
+        prefix = _PREFIX_RE.search(text, max(0, m.start() - 16), m.start())
+        lead = prefix.group("lead")
+        start = prefix.start() if prefix.group(0) else m.start()
+        cur1 = _currency(m, 1) or (CODES[lead.lower()] if lead else None)
+        has_second = m.group("num2") is not None
+        # "X and Y" is only a range after "between"; otherwise rescan Y on its own.
+        if has_second and (m.group("sep") or "").lower() == "and" and not prefix.group("between"):
+            has_second = False
+            pos = _single_end(m)
+        if has_second:
+            lead2 = m.group("lead2")
+            cur2 = _currency(m, 2) or (CODES[lead2.lower()] if lead2 else None)
+            currency = cur1 or cur2
+            if not currency:
+                continue
+            v2 = _value(m, 2)
+            # "$1-2 million": a trailing magnitude also applies to a smaller bare first number
+            mag1 = None
+            if not m.group("mag1") and m.group("mag2"):
+                raw1 = _value(m, 1, mag="")
+                if raw1 is not None and raw1 <= float(m.group("num2").replace(",", "")):
+                    mag1 = m.group("mag2")
+            v1 = _value(m, 1, mag=mag1)
+            if not v1 or not v2:
+                continue
+            lo, hi = (v1, v2) if v1 <= v2 else (v2, v1)
+            spans.append(MoneySpan(start, m.end(), lo, hi, currency))
+        else:
+            if not cur1:
+                continue
+            v = _value(m, 1)
+            if not v:
+                continue
+            spans.append(MoneySpan(start, _single_end(m), v, v, cur1))
+    return spans
+
+
+def amount_range(text: str, default_currency: str = "USD") -> Tuple[Optional[float], Optional[float], str]:
+    """(min, max, currency) across all money spans; (None, None, default) when none are found."""
+    spans = scan_money(text)
+    if not spans:
+        return None, None, default_currency
+    return (min(s.low for s in spans),
+            max(s.high for s in spans),
+            spans[0].currency or default_currency)
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Small SQLite-backed LRU store shared by the scraper's persistent caches.
+
+Each cache lives in its own table inside one state database so a run only
+has a single local file to keep between invocations. Values are JSON
+documents; eviction drops the least recently used rows once either the
+entry cap or the byte cap is exceeded.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+
+
+class LRUStore:
+    """Persistent key -> JSON value map with LRU/size eviction."""
+
+    def __init__(self, path: str, table: str = "entries",
+                 max_entries: int = 50000, max_bytes: int = 256 * 1024 * 1024):
+        self.path = path
+        self.table = table
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._puts_since_evict = 0
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            f'CREATE TABLE IF NOT EXISTS "{table}" ('
+            " key TEXT PRIMARY KEY,"
+            " value TEXT NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " accessed REAL NOT NULL)"
+        )
+        self._conn.execute(
+            f'CREATE INDEX IF NOT EXISTS "{table}_accessed" ON "{table}" (accessed)'
+        )
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                f'SELECT value FROM "{self.table}" WHERE key = ?', (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._conn.execute(
+                f'UPDATE "{self.table}" SET accessed = ? WHERE key = ?', (time.time(), key)
+            )
+            self._conn.commit()
+        return json.loads(row[0])
+
+    def put(self, key: str, value: Dict[str, Any]):
+        blob = json.dumps(value, separators=(",", ":"))
+        with self._lock:
+            self._conn.execute(
+                f'INSERT OR REPLACE INTO "{self.table}" (key, value, size, accessed) VALUES (?, ?, ?, ?)',
+                (key, blob, len(blob), time.time()),
+            )
+            self._conn.commit()
+            # Eviction needs two aggregate queries, so amortize it over writes.
+            self._puts_since_evict += 1
+            if self._puts_since_evict >= 100:
+                self._evict()
+
+    def delete(self, key: str):
+        with self._lock:
+            self._conn.execute(f'DELETE FROM "{self.table}" WHERE key = ?', (key,))
+            self._conn.commit()
+
+    def clear(self) -> int:
+        with self._lock:
+            cur = self._conn.execute(f'DELETE FROM "{self.table}"')
+            self._conn.commit()
+            return cur.rowcount
+
+    def _evict(self):
+        self._puts_since_evict = 0
+        count, total = self._conn.execute(
+            f'SELECT COUNT(*), COALESCE(SUM(size), 0) FROM "{self.table}"'
+        ).fetchone()
+        if count <= self.max_entries and total <= self.max_bytes:
+            return
+        # Walk from the oldest access time and drop rows until both caps hold.
+        drop_rows = max(0, count - self.max_entries)
+        drop_bytes = max(0, total - self.max_bytes)
+        doomed = []
+        freed = 0
+        for key, size in self._conn.execute(
+            f'SELECT key, size FROM "{self.table}" ORDER BY accessed ASC'
+        ):
+            if len(doomed) >= drop_rows and freed >= drop_bytes:
+                break
+            doomed.append((key,))
+            freed += size
+        self._conn.executemany(f'DELETE FROM "{self.table}" WHERE key = ?', doomed)
+        self._conn.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+        }
+
+    def close(self):
+        with self._lock:
+            self._evict()
+            self._conn.close()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Windowed, memoized deadline extraction.
+
+Instead of handing whole descriptions to dateparser, a compiled hint scanner
+finds short windows right after phrases such as "deadline" or "applications
+due", a second compiled scanner pulls date-shaped strings out of those
+windows, and only those strings are parsed. Parsed strings are memoized, so
+the handful of distinct dates a run sees are each parsed once.
+"""
+
+import re
+from datetime import datetime
+from functools import lru_cache
+from typing import Iterable, Iterator, Optional, Sequence, Tuple
+
+DEFAULT_DEADLINE_HINTS = [
+    "deadline", "due date", "submission deadline", "applications due",
+    "closing date", "full proposal due", "letter of intent due", "loi due",
+]
+
+# Characters scanned after (and before) each hint for a date.
+WINDOW_AFTER = 120
+WINDOW_BEFORE = 40
+
+_MONTH = r"(?:jan|feb|mar|apr|may|jun|jul|aug|sep|sept|oct|nov|dec)[a-z]*\.?"
+_DAY = r"\d{1,2}(?:st|nd|rd|th)?"
+_TIME = r"(?:,?\s*(?:at\s+|by\s+)?\d{1,2}(?::\d{2})?\s*(?:a\.?m\.?|p\.?m\.?)(?:\s*(?:et|est|edt|ct|cst|cdt|pt|pst|pdt|utc|gmt))?)?"
+
+DATE_RE = re.compile(
+    rf"""
+    (?:
+        \d{{4}}-\d{{1,2}}-\d{{1,2}}(?:[t\s]\d{{1,2}}:\d{{2}}(?::\d{{2}})?)?   # 2026-03-15[ 17:00]
+      | \d{{1,2}}[/.]\d{{1,2}}[/.]\d{{2,4}}                                # 03/15/2026
+      | {_MONTH}\s+{_DAY},?\s+\d{{4}}                                      # March 15, 2026
+      | {_DAY}\s+(?:of\s+)?{_MONTH},?\s+\d{{4}}                            # 15 March 2026
+    ){_TIME}
+    """,
+    re.IGNORECASE | re.VERBOSE,
+)
+
+_SETTINGS = {"PREFER_DATES_FROM": "future", "RETURN_AS_TIMEZONE_AWARE": True}
+
+
+@lru_cache(maxsize=64)
+def hint_pattern(hints: Tuple[str, ...]) -> "re.Pattern":
+    # Longest first so "submission deadline" wins over "deadline"
+    alts = sorted({h.strip().lower() for h in hints if h.strip()}, key=len, reverse=True)
+    return re.compile("|".join(re.escape(h) for h in alts), re.IGNORECASE)
+
+
+def normalize_date_string(s: str) -> str:
+    return re.sub(r"\s+", " ", s).strip(" ,.;:").lower()
+
+
+@lru_cache(maxsize=4096)
+def parse_date_string(normalized: str, languages: Tuple[str, ...] = ("en",)) -> Optional[datetime]:
+    """dateparser on a short, already-normalized date string (memoized)."""
+    import dateparser
+    try:
+        return dateparser.parse(normalized, languages=list(languages), settings=_SETTINGS)
+    except Exception:
+        return None
+
+
+def deadline_windows(text: str, hints: Iterable[str]) -> Iterator[str]:
+    """Short text windows after (then just before) each deadline hint, in document order."""
+    if not text:
+        return
+    for m in hint_pattern(tuple(hints)).finditer(text):
+        yield text[m.end():m.end() + WINDOW_AFTER]
+        yield text[max(0, m.start() - WINDOW_BEFORE):m.start()]
+
+
+def _first_date(window: str, languages: Tuple[str, ...]) -> Optional[datetime]:
+    for m in DATE_RE.finditer(window):
+        dt = parse_date_string(normalize_date_string(m.group(0)), languages)
+        if dt:
+            return dt
+    return None
+
+
+def extract_deadline(text: str,
+                     hints: Sequence[str] = DEFAULT_DEADLINE_HINTS,
+                     hint: Optional[str] = None,
+                     languages: Sequence[str] = ("en",)) -> Optional[datetime]:
+    """
+    Find a deadline in text. `hint` is an already-targeted snippet (e.g. a CSS/regex
+    rule match) and is tried first; short hints without a date shape are parsed whole.
+    """
+    langs = tuple(languages)
+    if hint:
+        dt = _first_date(hint, langs)
+        if dt:
+            return dt
+        if len(hint) <= 64:
+            dt = parse_date_string(normalize_date_string(hint), langs)
+            if dt:
+                return dt
+    for window in deadline_windows(text, hints):
+        dt = _first_date(window, langs)
+        if dt:
+            return dt
+    return None
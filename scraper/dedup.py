@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Near-duplicate detection for scraped grants in near-linear time.
+
+Each grant is reduced to a set of shingles, the set to a MinHash signature,
+and signatures are split into bands that are hashed into buckets (LSH):
+grants sharing any band bucket become candidate pairs. Only candidates are
+then checked with the exact (and expensive) similarity function, so the
+pairwise comparison count grows with the number of real near-duplicates
+rather than with n². Groups are formed the same greedy way as the old
+all-pairs loops: each grant, in order, collects every later unclaimed grant
+it is similar to.
+"""
+
+import re
+import zlib
+from collections import defaultdict
+from typing import Callable, Dict, Iterable, List, Sequence, Set, Tuple
+
+_WS_RE = re.compile(r"\s+")
+_WORD_RE = re.compile(r"\w+")
+
+# Cap per document so one huge description cannot dominate a signature chunk
+MAX_SHINGLES = 2000
+# Shingles hashed per vectorized step (bounds the (num_perm x shingles) temp array)
+CHUNK_SHINGLES = 200_000
+
+
+def normalize(text: str) -> str:
+    return _WS_RE.sub(" ", (text or "").lower()).strip()
+
+
+def char_shingles(text: str, k: int = 3) -> Set[str]:
+    text = normalize(text)
+    if len(text) <= k:
+        return {text} if text else set()
+    return {text[i:i + k] for i in range(len(text) - k + 1)}
+
+
+def word_shingles(text: str, k: int = 3) -> Set[str]:
+    words = _WORD_RE.findall(normalize(text))
+    if len(words) <= k:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i:i + k]) for i in range(len(words) - k + 1)}
+
+
+class MinHashLSH:
+    """
+    MinHash signatures (num_perm multiply-shift hashes of 32-bit shingle ids) split
+    into `bands` bands of num_perm // bands rows. Pairs with Jaccard similarity well
+    above (1/bands)^(1/rows) share at least one band bucket with high probability.
+    """
+
+    def __init__(self, num_perm: int = 64, bands: int = 16, seed: int = 1):
+        import numpy as np
+
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        rng = np.random.default_rng(seed)
+        # Odd 64-bit multipliers; (a*x + b) >> 32 over wrapping uint64 is a universal hash
+        self._a = rng.integers(1, 2**63, size=num_perm, dtype=np.uint64) | np.uint64(1)
+        self._b = rng.integers(0, 2**63, size=num_perm, dtype=np.uint64)
+
+    @property
+    def threshold(self) -> float:
+        """Jaccard similarity at which a pair becomes a candidate with probability ~0.5."""
+        return (1.0 / self.bands) ** (1.0 / self.rows)
+
+    def signatures(self, shingle_sets: Sequence[Iterable[str]]):
+        """(n, num_perm) uint32 MinHash matrix; empty sets get an all-max row."""
+        import numpy as np
+
+        n = len(shingle_sets)
+        sig = np.full((n, self.num_perm), np.iinfo(np.uint32).max, dtype=np.uint32)
+        ids: List[int] = []
+        owners: List[int] = []
+        pending = 0
+
+        def flush():
+            if not ids:
+                return
+            x = np.asarray(ids, dtype=np.uint64)
+            who = np.asarray(owners, dtype=np.int64)
+            hashed = ((self._a[:, None] * x[None, :] + self._b[:, None]) >> np.uint64(32)).astype(np.uint32)
+            # owners are ascending, so each document's shingles are one contiguous run
+            starts = np.flatnonzero(np.r_[True, who[1:] != who[:-1]])
+            sig[who[starts]] = np.minimum.reduceat(hashed, starts, axis=1).T
+            ids.clear()
+            owners.clear()
+
+        for doc, shingles in enumerate(shingle_sets):
+            # The smallest hashes, not the first in set order: str hashing is randomized per
+            # process, so truncating in iteration order would change signatures between runs
+            hs = sorted(zlib.crc32(s.encode("utf-8")) for s in shingles)[:MAX_SHINGLES]
+            if not hs:
+                continue
+            ids.extend(hs)
+            owners.extend([doc] * len(hs))
+            pending += len(hs)
+            if pending >= CHUNK_SHINGLES:
+                flush()
+                pending = 0
+        flush()
+        return sig
+
+    def candidate_pairs(self, signatures) -> Set[Tuple[int, int]]:
+        """(i, j) with i < j for every pair sharing at least one band bucket."""
+        import numpy as np
+
+        keep = np.flatnonzero(~np.all(signatures == np.iinfo(np.uint32).max, axis=1))
+        sig = signatures[keep].astype(np.uint64)
+        mix = np.asarray([0x9E3779B97F4A7C15 * (k + 1) & 0xFFFFFFFFFFFFFFFF for k in range(self.rows)],
+                         dtype=np.uint64)
+        pairs: Set[Tuple[int, int]] = set()
+        for band in range(self.bands):
+            # One 64-bit key per document and band; equal keys form a bucket
+            keys = (sig[:, band * self.rows:(band + 1) * self.rows] * mix).sum(axis=1)
+            order = np.argsort(keys, kind="stable")
+            sorted_keys = keys[order]
+            starts = np.flatnonzero(np.r_[True, sorted_keys[1:] != sorted_keys[:-1]])
+            sizes = np.diff(np.r_[starts, len(order)])
+            for start, size in zip(starts[sizes > 1].tolist(), sizes[sizes > 1].tolist()):
+                members = keep[order[start:start + size]].tolist()
+                for x in range(size):
+                    for y in range(x + 1, size):
+                        pairs.add((members[x], members[y]) if members[x] < members[y] else (members[y], members[x]))
+        return pairs
+
+    def candidates(self, shingle_sets: Sequence[Iterable[str]]) -> Set[Tuple[int, int]]:
+        return self.candidate_pairs(self.signatures(shingle_sets))
+
+
+def group_duplicates(n: int, pairs: Iterable[Tuple[int, int]],
+                     is_duplicate: Callable[[int, int], bool]) -> List[List[int]]:
+    """
+    Greedy groups in the same format as the old all-pairs loops: for each i in order,
+    the group is i plus every later, not yet grouped j it is a duplicate of. Only
+    candidate pairs are verified.
+    """
+    later: Dict[int, List[int]] = defaultdict(list)
+    for i, j in pairs:
+        if i > j:
+            i, j = j, i
+        later[i].append(j)
+
+    groups: List[List[int]] = []
+    processed: Set[int] = set()
+    for i in range(n):
+        if i in processed or i not in later:
+            continue
+        group = [i]
+        for j in sorted(later[i]):
+            if j in processed:
+                continue
+            if is_duplicate(i, j):
+                group.append(j)
+                processed.add(j)
+        if len(group) > 1:
+            groups.append(group)
+            processed.update(group)
+    return groups
@@ -16,22 +16,12 @@ import logging
 from dataclasses import dataclass
 from collections import defaultdict
 
-import requests
-import yaml
-import feedparser
-from tenacity import retry, wait_exponential_jitter, stop_after_attempt
-from lxml import html as lxml_html
-from bs4 import BeautifulSoup
-from readability import Document
-import dateparser
-from urllib import robotparser
-import feedfinder2
-from requests.adapters import HTTPAdapter, Retry
-from tenacity import RetryError
-import openai
-import pytz
-from fuzzywuzzy import fuzz, process
-from rapidfuzz import fuzz as rapidfuzz
+# Heavy dependencies (rapidfuzz, dateparser) are imported where they are first used.
+
+from amounts import amount_range
+from deadlines import DEFAULT_DEADLINE_HINTS, extract_deadline
+
+logger = logging.getLogger(__name__)
 
 # ----------------- ENHANCED CONFIGURATION -----------------
 @dataclass
@@ -72,14 +62,9 @@ DATE_PATTERNS = [
     r'\\b(?:monday|tuesday|wednesday|thursday|friday|saturday|sunday),?\\s+(?:jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\\s+\\d{1,2},?\\s+\\d{4}\\b',
 ]
 
-# Enhanced amount parsing patterns
-AMOUNT_PATTERNS = [
-    r'\\$\\s*([\\d,]+(?:\\.\\d{2})?)\\s*(?:million|m|k|thousand)?',
-    r'€\\s*([\\d,]+(?:\\.\\d{2})?)\\s*(?:million|m|k|thousand)?',
-    r'£\\s*([\\d,]+(?:\\.\\d{2})?)\\s*(?:million|m|k|thousand)?',
-    r'(?:up\\s+to|maximum|max|award|budget|funding)\\s*:?\\s*\\$\\s*([\\d,]+(?:\\.\\d{2})?)\\s*(?:million|m|k|thousand)?',
-    r'(?:between|from)\\s*\\$\\s*([\\d,]+(?:\\.\\d{2})?)\\s*(?:and|to)\\s*\\$\\s*([\\d,]+(?:\\.\\d{2})?)\\s*(?:million|m|k|thousand)?',
-    r'\\b(?:\\d{1,3}(?:,\\d{3})*(?:\\.\\d{2})?)\\s*(?:million|m|k|thousand|billion|b)\\b',
+# Phrases that introduce a deadline; dates are only looked for right next to these
+DEADLINE_HINTS = DEFAULT_DEADLINE_HINTS + [
+    'apply by', 'applications close', 'no later than', 'must be received by', 'closes',
 ]
 
 # Grant categories for better classification
@@ -110,14 +95,15 @@ def parse_enhanced_deadline(text: str, context: str = "") -> Optional[datetime]:
         return None
     
     # Clean the text
-    text = re.sub(r'\\s+', ' ', text.strip())
+    text = re.sub(r'\s+', ' ', text.strip())
     
-    # Try different parsing strategies
+    # Try different parsing strategies; the regex-only ones run first and
+    # dateparser is only ever given short windows near deadline hints
     strategies = [
         _parse_relative_dates,
-        _parse_absolute_dates,
+        _parse_structured_dates,
         _parse_natural_language_dates,
-        _parse_structured_dates
+        _parse_absolute_dates
     ]
     
     for strategy in strategies:
@@ -135,19 +121,19 @@ def _parse_relative_dates(text: str, context: str) -> Optional[datetime]:
     now = datetime.now(timezone.utc)
     
     # Days
-    days_match = re.search(r'(\\d+)\\s*days?\\s*(?:from\\s+now|hence)', text, re.IGNORECASE)
+    days_match = re.search(r'(\d+)\s*days?\s*(?:from\s+now|hence)', text, re.IGNORECASE)
     if days_match:
         days = int(days_match.group(1))
         return now + timedelta(days=days)
     
     # Weeks
-    weeks_match = re.search(r'(\\d+)\\s*weeks?\\s*(?:from\\s+now|hence)', text, re.IGNORECASE)
+    weeks_match = re.search(r'(\d+)\s*weeks?\s*(?:from\s+now|hence)', text, re.IGNORECASE)
     if weeks_match:
         weeks = int(weeks_match.group(1))
         return now + timedelta(weeks=weeks)
     
     # Months
-    months_match = re.search(r'(\\d+)\\s*months?\\s*(?:from\\s+now|hence)', text, re.IGNORECASE)
+    months_match = re.search(r'(\d+)\s*months?\s*(?:from\s+now|hence)', text, re.IGNORECASE)
     if months_match:
         months = int(months_match.group(1))
         # Approximate month as 30 days
@@ -157,15 +143,9 @@ def _parse_relative_dates(text: str, context: str) -> Optional[datetime]:
 
 def _parse_absolute_dates(text: str, context: str) -> Optional[datetime]:
     """Parse absolute dates with various formats"""
-    # Try dateparser with enhanced settings
-    settings = {
-        'PREFER_DATES_FROM': 'future',
-        'RETURN_AS_TIMEZONE_AWARE': True,
-        'TIMEZONE': 'UTC',
-        'RELATIVE_BASE': datetime.now(timezone.utc)
-    }
-    
-    parsed = dateparser.parse(text, settings=settings)
+    # Short inputs are treated as a targeted deadline snippet; long ones are
+    # only parsed in windows next to deadline hints
+    parsed = extract_deadline(text, DEADLINE_HINTS, hint=text if len(text) <= 200 else None)
     if parsed:
         return parsed.astimezone(timezone.utc)
     
@@ -197,9 +177,9 @@ def _parse_structured_dates(text: str, context: str) -> Optional[datetime]:
     """Parse structured dates from forms and tables"""
     # Look for patterns like "MM/DD/YYYY at HH:MM"
     structured_patterns = [
-        r'(\\d{1,2})/(\\d{1,2})/(\\d{4})\\s+at\\s+(\\d{1,2}):(\\d{2})',
-        r'(\\d{4})-(\\d{1,2})-(\\d{1,2})\\s+(\\d{1,2}):(\\d{2})',
-        r'(\\d{1,2})\\s+(jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)\\s+(\\d{4})\\s+(\\d{1,2}):(\\d{2})',
+        r'(\d{1,2})/(\d{1,2})/(\d{4})\s+at\s+(\d{1,2}):(\d{2})',
+        r'(\d{4})-(\d{1,2})-(\d{1,2})\s+(\d{1,2}):(\d{2})',
+        r'(\d{1,2})\s+(jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)\s+(\d{4})\s+(\d{1,2}):(\d{2})',
     ]
     
     month_names = {
@@ -207,15 +187,18 @@ def _parse_structured_dates(text: str, context: str) -> Optional[datetime]:
         'jul': 7, 'aug': 8, 'sep': 9, 'oct': 10, 'nov': 11, 'dec': 12
     }
     
-    for pattern in structured_patterns:
+    for index, pattern in enumerate(structured_patterns):
         match = re.search(pattern, text, re.IGNORECASE)
         if match:
             groups = match.groups()
             try:
-                if len(groups) == 5:  # MM/DD/YYYY at HH:MM
+                if index == 0:  # MM/DD/YYYY at HH:MM
                     month, day, year, hour, minute = map(int, groups)
                     return datetime(year, month, day, hour, minute, tzinfo=timezone.utc)
-                elif len(groups) == 5 and groups[1] in month_names:  # DD Mon YYYY HH:MM
+                elif index == 1:  # YYYY-MM-DD HH:MM
+                    year, month, day, hour, minute = map(int, groups)
+                    return datetime(year, month, day, hour, minute, tzinfo=timezone.utc)
+                else:  # DD Mon YYYY HH:MM
                     day, month_name, year, hour, minute = groups
                     month = month_names[month_name.lower()]
                     return datetime(int(year), month, int(day), int(hour), int(minute), tzinfo=timezone.utc)
@@ -240,66 +223,7 @@ def _is_valid_deadline(deadline: datetime) -> bool:
 
 def parse_enhanced_amounts(text: str, default_currency: str = "USD") -> Tuple[Optional[float], Optional[float], str]:
     """Enhanced amount parsing with better currency detection and range handling"""
-    if not text:
-        return None, None, default_currency
-    
-    # Detect currency
-    currency = default_currency
-    if '€' in text or 'euro' in text.lower():
-        currency = 'EUR'
-    elif '£' in text or 'pound' in text.lower():
-        currency = 'GBP'
-    elif '¥' in text or 'yen' in text.lower():
-        currency = 'JPY'
-    elif '₹' in text or 'rupee' in text.lower():
-        currency = 'INR'
-    
-    amounts = []
-    
-    # Parse various amount patterns
-    for pattern in AMOUNT_PATTERNS:
-        matches = re.finditer(pattern, text, re.IGNORECASE)
-        for match in matches:
-            groups = match.groups()
-            if len(groups) == 1:  # Single amount
-                amount = _parse_number(groups[0])
-                if amount:
-                    amounts.append(amount)
-            elif len(groups) == 2:  # Range
-                min_amount = _parse_number(groups[0])
-                max_amount = _parse_number(groups[1])
-                if min_amount and max_amount:
-                    amounts.extend([min_amount, max_amount])
-    
-    if not amounts:
-        return None, None, currency
-    
-    # Handle multipliers
-    multiplier_text = text.lower()
-    if 'million' in multiplier_text or 'm' in multiplier_text:
-        amounts = [a * 1000000 for a in amounts if a < 1000]
-    elif 'thousand' in multiplier_text or 'k' in multiplier_text:
-        amounts = [a * 1000 for a in amounts if a < 1000]
-    elif 'billion' in multiplier_text or 'b' in multiplier_text:
-        amounts = [a * 1000000000 for a in amounts if a < 1000]
-    
-    if not amounts:
-        return None, None, currency
-    
-    return min(amounts), max(amounts), currency
-
-def _parse_number(num_str: str) -> Optional[float]:
-    """Parse a number string with various formats"""
-    if not num_str:
-        return None
-    
-    # Clean the number
-    num_str = num_str.replace(',', '').strip()
-    
-    try:
-        return float(num_str)
-    except ValueError:
-        return None
+    return amount_range(text, default_currency)
 
 def extract_grant_category(title: str, description: str) -> Optional[str]:
     """Extract grant category based on content analysis"""
@@ -352,36 +276,30 @@ def calculate_confidence_score(title: str, description: str, deadline: Optional[
     return min(score, 100.0)
 
 def detect_duplicates(grants: List[GrantData], threshold: float = 0.8) -> List[List[int]]:
-    """Detect duplicate grants using fuzzy matching"""
-    duplicates = []
-    processed = set()
-    
-    for i, grant1 in enumerate(grants):
-        if i in processed:
-            continue
-        
-        duplicate_group = [i]
-        
-        for j, grant2 in enumerate(grants[i+1:], i+1):
-            if j in processed:
-                continue
-            
-            # Calculate similarity using rapidfuzz (faster and more compatible)
-            title_sim = rapidfuzz.ratio(grant1.title.lower(), grant2.title.lower()) / 100.0
-            desc_sim = rapidfuzz.ratio(grant1.description.lower(), grant2.description.lower()) / 100.0
-            
-            # Weighted similarity
-            similarity = (title_sim * 0.7) + (desc_sim * 0.3)
-            
-            if similarity >= threshold:
-                duplicate_group.append(j)
-                processed.add(j)
-        
-        if len(duplicate_group) > 1:
-            duplicates.append(duplicate_group)
-            processed.update(duplicate_group)
-    
-    return duplicates
+    """Detect duplicate grants using fuzzy matching on MinHash-LSH candidate pairs"""
+    from rapidfuzz import fuzz as rapidfuzz
+    from dedup import MinHashLSH, char_shingles, group_duplicates, word_shingles
+
+    titles = [g.title.lower() for g in grants]
+    descriptions = [g.description.lower() for g in grants]
+
+    # With weights 0.7/0.3 a duplicate needs title similarity >= (threshold - 0.3) / 0.7,
+    # so a permissive index on title shingles finds them; title+description shingles
+    # add pairs whose titles were reworded.
+    pairs = MinHashLSH(num_perm=160, bands=32).candidates([char_shingles(t) for t in titles])
+    pairs |= MinHashLSH(num_perm=64, bands=16).candidates(
+        [word_shingles(f"{t} {d}") for t, d in zip(titles, descriptions)])
+
+    def similar(i: int, j: int) -> bool:
+        # Calculate similarity using rapidfuzz (faster and more compatible)
+        title_sim = rapidfuzz.ratio(titles[i], titles[j]) / 100.0
+        if title_sim * 0.7 + 0.3 < threshold:  # cannot reach it even with identical descriptions
+            return False
+        desc_sim = rapidfuzz.ratio(descriptions[i], descriptions[j]) / 100.0
+        # Weighted similarity
+        return (title_sim * 0.7) + (desc_sim * 0.3) >= threshold
+
+    return group_duplicates(len(grants), pairs, similar)
 
 def enhance_grant_data(grant: GrantData) -> GrantData:
     """Enhance grant data with additional processing"""
@@ -420,6 +338,38 @@ def enhance_grant_data(grant: GrantData) -> GrantData:
     
     return grant
 
+# Reuse aiTitle/aiSummary that scraper.py already generated (its persistent AI cache).
+# Lookups only: this pipeline never sends grants to the model.
+AI_CACHE_LOOKUP = os.getenv("ENHANCED_AI_CACHE", "false").lower() == "true"
+
+def apply_cached_ai(grants: List[GrantData]) -> int:
+    """Fill ai_title/ai_summary from the AI cache when ENHANCED_AI_CACHE is set; returns grants filled."""
+    if not AI_CACHE_LOOKUP or not grants:
+        return 0
+    from scraper import ai_client
+    from ai import AIJob
+    client = ai_client()
+    if client is None or client.cache is None:
+        logger.warning("ENHANCED_AI_CACHE is set but the AI cache is unavailable")
+        return 0
+    filled = 0
+    for grant in grants:
+        job = client.prepare(AIJob(grant.title, grant.description, grant.eligibility, grant.funding_min,
+                                   grant.funding_max, grant.currency, grant.source))
+        if not (job.need_title or job.need_summary):
+            continue
+        res = client.cached(job)
+        if res is None:
+            continue
+        res = client.requested_only(job, res)
+        if not (res.title or res.summary):
+            continue
+        grant.ai_title = res.title or grant.ai_title
+        grant.ai_summary = res.summary or grant.ai_summary
+        filled += 1
+    logger.info("AI cache filled %d/%d grants (%s)", filled, len(grants), client.cache_stats())
+    return filled
+
 # ----------------- ENHANCED SOURCE CONFIGURATION -----------------
 def create_enhanced_sources_config() -> Dict[str, Any]:
     """Create enhanced sources configuration for 1000+ grants"""
@@ -738,6 +688,8 @@ def main_enhanced():
     print(f"Removed {len(all_grants) - len(unique_grants)} duplicates")
     print(f"Total unique grants: {len(unique_grants)}")
     
+    apply_cached_ai(unique_grants)
+    
     # Post to backend
     print("Posting grants to backend...")
     for grant in unique_grants:
@@ -780,4 +732,5 @@ def main_enhanced():
     print(f"Unique grants: {len(unique_grants)}")
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
     main_enhanced()
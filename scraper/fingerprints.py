@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+"""
+Persistent fingerprints of every grant already in the corpus, for dropping
+re-discovered grants before they are inserted again under a new sourceId.
+
+A grant's fingerprint is its canonical URL plus a 64-bit SimHash of its
+normalized title and description. Lookups are in memory: a dict on the
+canonical URL, and the SimHash split into max_distance + 1 bit bands with
+one hash table per band. Two fingerprints within max_distance bits of each
+other must agree exactly on at least one band (pigeonhole), so only the few
+grants sharing a band bucket are compared bit by bit. Both kinds of match only
+count against another source: a source's own ids are authoritative. The URL is
+the funding/apply link, so it is ignored when it is a site root or shared by
+max_url_keys stored grants (one foundation's common apply page). Rows live in a
+table of the scraper state database and can be rebuilt from a backend export.
+
+A grant that passes the check is held in memory (reserve) and only written to the
+table once the backend has accepted it (confirm); undelivered grants are released,
+so a failed post never makes a grant look known on later runs.
+"""
+
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from outbox import payload_key
+
+# Grant descriptions are short, so a few edited words move more bits than on web pages
+MAX_DISTANCE = 6
+# Texts with fewer features than this are too generic to match on SimHash alone
+MIN_FEATURES = 8
+# A canonical URL shared by this many stored grants is an apply or listing page, not a grant page
+MAX_URL_KEYS = 3
+DESCRIPTION_CHARS = 2000
+
+TRACKING_PARAMS = re.compile(r"^(utm_\w+|gclid|fbclid|msclkid|mc_cid|mc_eid|ref|src|source|_ga)$", re.I)
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+
+def canonical_url(url: Optional[str]) -> str:
+    """Scheme-, www-, fragment- and tracking-insensitive form of a URL ('' if none)."""
+    if not url:
+        return ""
+    parts = urlsplit(url.strip())
+    host = (parts.hostname or "").lower()
+    if host.startswith("www."):
+        host = host[4:]
+    if not host:
+        return ""
+    if parts.port and parts.port not in (80, 443):
+        host = f"{host}:{parts.port}"
+    path = re.sub(r"/+", "/", parts.path or "/")
+    path = re.sub(r"/(index|default)\.(html?|php|aspx?)$", "/", path, flags=re.I)
+    if len(path) > 1:
+        path = path.rstrip("/")
+    query = urlencode(sorted((k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+                             if not TRACKING_PARAMS.match(k)))
+    return urlunsplit(("", host, path, query, ""))[2:]
+
+
+def features(title: str, description: str) -> List[str]:
+    """Title words (doubled, so titles weigh more), then description words and word pairs."""
+    title_words = _WORD_RE.findall((title or "").lower())
+    desc_words = _WORD_RE.findall((description or "")[:DESCRIPTION_CHARS].lower())
+    feats = [f"t:{w}" for w in title_words] * 2
+    feats += desc_words
+    feats += [f"{a} {b}" for a, b in zip(desc_words, desc_words[1:])]
+    return feats
+
+
+def simhash(feats: List[str]) -> int:
+    """64-bit SimHash (unsigned) of the features, each weighted by its count."""
+    import numpy as np
+
+    if not feats:
+        return 0
+    digests = b"".join(hashlib.blake2b(f.encode("utf-8"), digest_size=8).digest() for f in feats)
+    bits = np.unpackbits(np.frombuffer(digests, dtype=np.uint8).reshape(len(feats), 8), axis=1)
+    votes = (bits.astype(np.int32) * 2 - 1).sum(axis=0)
+    return int.from_bytes(np.packbits(votes > 0).tobytes(), "big")
+
+
+def band_layout(max_distance: int) -> List[Tuple[int, int]]:
+    """(shift, width) of max_distance + 1 bands covering all 64 bits."""
+    bands = max_distance + 1
+    widths = [64 // bands + (1 if i < 64 % bands else 0) for i in range(bands)]
+    shifts = [sum(widths[:i]) for i in range(bands)]
+    return list(zip(shifts, widths))
+
+
+def _bands(h: int, layout: List[Tuple[int, int]]) -> List[int]:
+    return [(h >> shift) & ((1 << width) - 1) for shift, width in layout]
+
+
+def _source(key: str) -> str:
+    return key.split("\x1f", 1)[0]
+
+
+def _signed(h: int) -> int:
+    # SQLite INTEGER is signed 64-bit
+    return h - (1 << 64) if h >= 1 << 63 else h
+
+
+class FingerprintStore:
+    def __init__(self, path: str, table: str = "fingerprints", max_distance: int = MAX_DISTANCE,
+                 max_url_keys: int = MAX_URL_KEYS):
+        if not 0 <= max_distance < 32:
+            raise ValueError("max_distance must be between 0 and 31")
+        self.path = path
+        self.table = table
+        self.max_distance = max_distance
+        self.max_url_keys = max_url_keys
+        self.hits = {"url": 0, "simhash": 0}
+        self._lock = threading.Lock()
+        self._by_url: Dict[str, Set[str]] = defaultdict(set)
+        self._hash: Dict[str, Tuple[int, bool, str]] = {}  # key -> (simhash, usable for matching, url)
+        # key -> (reserved fingerprint, stored fingerprint it replaced in memory)
+        self._reserved: Dict[str, Tuple[Tuple[str, int, bool], Optional[Tuple[str, int, bool]]]] = {}
+        self._layout = band_layout(max_distance)
+        self._tables: List[Dict[int, Set[str]]] = [defaultdict(set) for _ in self._layout]
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            f'CREATE TABLE IF NOT EXISTS "{table}" ('
+            " key TEXT PRIMARY KEY,"
+            " url TEXT NOT NULL,"
+            " simhash INTEGER NOT NULL,"
+            " usable INTEGER NOT NULL)"
+        )
+        self._conn.commit()
+        for key, url, h, usable in self._conn.execute(f'SELECT key, url, simhash, usable FROM "{table}"'):
+            self._index(key, url, h & ((1 << 64) - 1), bool(usable))
+
+    def __len__(self) -> int:
+        return len(self._hash)
+
+    @staticmethod
+    def fingerprint(payload: Dict[str, Any]) -> Tuple[str, int, bool]:
+        feats = features(payload.get("title") or "", payload.get("description") or "")
+        url = canonical_url(payload.get("url"))
+        if url.endswith("/"):  # site root: a home page, not a grant page
+            url = ""
+        return url, simhash(feats), len(feats) >= MIN_FEATURES
+
+    def _index(self, key: str, url: str, h: int, usable: bool):
+        self._unindex(key)
+        if url:
+            self._by_url[url].add(key)
+        self._hash[key] = (h, usable, url)
+        if usable:
+            for table, band in zip(self._tables, _bands(h, self._layout)):
+                table[band].add(key)
+
+    def _unindex(self, key: str):
+        old = self._hash.pop(key, None)
+        if not old:
+            return
+        if old[1]:
+            for table, band in zip(self._tables, _bands(old[0], self._layout)):
+                table[band].discard(key)
+        if old[2] in self._by_url:
+            self._by_url[old[2]].discard(key)
+            if not self._by_url[old[2]]:
+                del self._by_url[old[2]]
+
+    def _stored(self, key: str) -> Optional[Tuple[str, int, bool]]:
+        old = self._hash.get(key)
+        return (old[2], old[0], old[1]) if old else None
+
+    def _match(self, key: str, url: str, h: int, usable: bool) -> Optional[str]:
+        # A source's own ids are authoritative: its listings sharing an apply page or
+        # near-identical text (yearly cycles, regional variants) are separate grants,
+        # so both checks only match across sources
+        source = _source(key)
+        sharing = self._by_url.get(url, set()) - {key} if url else set()
+        if len(sharing) < self.max_url_keys:
+            for other in sorted(sharing):
+                if _source(other) != source:
+                    self.hits["url"] += 1
+                    return other
+        if not usable:
+            return None
+        for table, band in zip(self._tables, _bands(h, self._layout)):
+            for other in table.get(band, ()):
+                if _source(other) != source and (self._hash[other][0] ^ h).bit_count() <= self.max_distance:
+                    self.hits["simhash"] += 1
+                    return other
+        return None
+
+    def match(self, payload: Dict[str, Any]) -> Optional[str]:
+        """Key of another source's grant with the same (rarely shared) canonical URL or near-identical text."""
+        url, h, usable = self.fingerprint(payload)
+        with self._lock:
+            return self._match(payload_key(payload), url, h, usable)
+
+    def reserve(self, payload: Dict[str, Any]) -> Optional[str]:
+        """
+        match() and, when there is no duplicate, hold the payload's fingerprint in memory
+        in the same step (so later grants of this run match it) until confirm() or release().
+        """
+        key = payload_key(payload)
+        url, h, usable = self.fingerprint(payload)
+        with self._lock:
+            other = self._match(key, url, h, usable)
+            if other is None:
+                previous = self._reserved[key][1] if key in self._reserved else self._stored(key)
+                self._reserved[key] = ((url, h, usable), previous)
+                self._index(key, url, h, usable)
+            return other
+
+    def confirm(self, payloads: Iterable[Dict[str, Any]]):
+        """Store the fingerprints of payloads the backend accepted (reserved ones as reserved)."""
+        rows = []
+        with self._lock:
+            for p in payloads:
+                key = payload_key(p)
+                held = self._reserved.pop(key, None)
+                if held:
+                    url, h, usable = held[0]
+                elif key in self._hash:
+                    continue  # stored when it was first delivered
+                else:
+                    url, h, usable = self.fingerprint(p)
+                    self._index(key, url, h, usable)
+                rows.append((key, url, _signed(h), int(usable)))
+            if rows:
+                self._conn.executemany(
+                    f'INSERT OR REPLACE INTO "{self.table}" (key, url, simhash, usable) VALUES (?, ?, ?, ?)', rows
+                )
+                self._conn.commit()
+
+    def release(self, payloads: Iterable[Dict[str, Any]]):
+        """Forget reservations of payloads that were not delivered; stored fingerprints are kept."""
+        with self._lock:
+            for p in payloads:
+                key = payload_key(p)
+                held = self._reserved.pop(key, None)
+                if held is None:
+                    continue
+                self._unindex(key)
+                if held[1]:
+                    self._index(key, *held[1])
+
+    def rebuild(self, payloads: Iterable[Dict[str, Any]]) -> int:
+        """Replace the store with fingerprints of `payloads` (e.g. a backend export)."""
+        rows = []
+        for p in payloads:
+            url, h, usable = self.fingerprint(p)
+            rows.append((payload_key(p), url, h, usable))
+        with self._lock:
+            self._by_url.clear()
+            self._hash.clear()
+            self._reserved.clear()
+            for table in self._tables:
+                table.clear()
+            self._conn.execute(f'DELETE FROM "{self.table}"')
+            self._conn.executemany(
+                f'INSERT OR REPLACE INTO "{self.table}" (key, url, simhash, usable) VALUES (?, ?, ?, ?)',
+                [(k, u, _signed(h), int(ok)) for k, u, h, ok in rows],
+            )
+            self._conn.commit()
+            for k, u, h, ok in rows:
+                self._index(k, u, h, ok)
+        return len(rows)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"entries": len(self._hash), "url_hits": self.hits["url"], "simhash_hits": self.hits["simhash"]}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
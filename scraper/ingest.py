@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+Bulk ingest client for the backend's internal grants endpoint.
+
+Grants are sent N per request to POST <internal url>/bulk as a gzip-compressed
+JSON body; the backend upserts each one on (source, sourceId) and answers
+with a result per item. Against a backend without the bulk route (404) the
+client falls back to one POST per grant on the single-item route.
+
+Requests are sent from a small thread pool whose in-flight limit is adapted
+AIMD-style: it grows by one per round trip while the backend answers quickly,
+and halves on a 429/5xx or when latency climbs well above its baseline. The
+achieved rate and concurrency over time are kept for the run summary.
+"""
+
+import gzip
+import json
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class AIMDLimiter:
+    """In-flight request limit with additive increase / multiplicative decrease."""
+
+    def __init__(self, initial: int = 2, minimum: int = 1, maximum: int = 16,
+                 backoff: float = 0.5, latency_factor: float = 3.0):
+        self.minimum = max(1, minimum)
+        self.maximum = max(self.minimum, maximum)
+        self.limit = float(min(max(initial, self.minimum), self.maximum))
+        self.backoff = backoff
+        self.latency_factor = latency_factor
+        self.in_flight = 0
+        self.baseline_ms: Optional[float] = None
+        self.decreases = 0
+        self.peak = self.limit
+        self._last_decrease = 0.0
+        self._cond = threading.Condition()
+        self._t0 = time.perf_counter()
+        # (seconds since start, limit, items completed by this response)
+        self.events: List[Tuple[float, float, int]] = []
+
+    def acquire(self):
+        with self._cond:
+            while self.in_flight >= int(self.limit):
+                self._cond.wait()
+            self.in_flight += 1
+
+    def release(self, latency_ms: float, overloaded: bool, items: int = 0):
+        with self._cond:
+            saturated = self.in_flight >= int(self.limit)
+            self.in_flight -= 1
+            now = time.perf_counter()
+            slow = self.baseline_ms is not None and latency_ms > self.baseline_ms * self.latency_factor
+            if overloaded or slow:
+                # Requests already in flight report the same overload; cut once per round trip
+                if now - self._last_decrease > latency_ms / 1000.0:
+                    self.limit = max(self.minimum, self.limit * self.backoff)
+                    self.decreases += 1
+                    self._last_decrease = now
+            else:
+                # Only grow while the limit is what holds requests back
+                if saturated:
+                    self.limit = min(self.maximum, self.limit + 1.0 / self.limit)
+                self.baseline_ms = latency_ms if self.baseline_ms is None else 0.9 * self.baseline_ms + 0.1 * latency_ms
+            self.peak = max(self.peak, self.limit)
+            self.events.append((now - self._t0, self.limit, items))
+            self._cond.notify_all()
+
+    def timeline(self, buckets: int = 10) -> List[Dict[str, Any]]:
+        """Achieved items/s and mean concurrency limit over up to `buckets` equal time slices."""
+        with self._cond:
+            events = list(self.events)
+        if not events:
+            return []
+        span = max(events[-1][0], 1e-3)
+        width = span / buckets
+        rows: List[Dict[str, Any]] = []
+        for b in range(buckets):
+            lo, hi = b * width, (b + 1) * width
+            inside = [e for e in events if lo <= e[0] < hi or (b == buckets - 1 and e[0] == hi)]
+            if not inside:
+                continue
+            rows.append({
+                "t": round(hi, 2),
+                "items_per_sec": round(sum(e[2] for e in inside) / width, 1),
+                "concurrency": round(sum(e[1] for e in inside) / len(inside), 1),
+            })
+        return rows
+
+
+def _pooled_session(pool_size: int) -> requests.Session:
+    s = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+    s.mount("http://", adapter)
+    s.mount("https://", adapter)
+    return s
+
+
+def bulk_url(internal_url: str) -> str:
+    """.../api/internal/grants -> .../api/internal/grants/bulk"""
+    return internal_url.rstrip("/") + "/bulk"
+
+
+class BulkIngestClient:
+    def __init__(self, internal_url: str, token: Optional[str] = None,
+                 session: Optional[requests.Session] = None, batch_size: int = 200,
+                 timeout_sec: float = 60.0, compress: bool = True, max_retries: int = 3,
+                 concurrency: int = 2, max_concurrency: int = 16):
+        self.url = internal_url.rstrip("/")
+        self.bulk_url = bulk_url(self.url)
+        self.limiter = AIMDLimiter(initial=concurrency, maximum=max_concurrency)
+        # No transport-level retries: 429/5xx must reach the limiter
+        self.session = session or _pooled_session(self.limiter.maximum)
+        self._lock = threading.Lock()
+        self.batch_size = max(1, batch_size)
+        self.timeout_sec = timeout_sec
+        self.compress = compress
+        self.max_retries = max_retries
+        self.bulk_supported = True
+        self.headers = {"Content-Type": "application/json"}
+        if token:
+            self.headers["Authorization"] = f"Bearer {token}"
+            self.headers["x-internal-token"] = token
+        self.stats: Dict[str, Any] = {
+            "requests": 0, "items": 0, "succeeded": 0, "failed": 0,
+            "bytes_raw": 0, "bytes_sent": 0, "seconds": 0.0,
+        }
+
+    def post_many(self, payloads: Sequence[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """One result per payload, in order: {"ok": True, "id": ...} or {"ok": False, "error": ...}."""
+        t0 = time.perf_counter()
+        results: List[Optional[Dict[str, Any]]] = [None] * len(payloads)
+        if self.bulk_supported:
+            units = [(list(range(i, min(i + self.batch_size, len(payloads)))), False)
+                     for i in range(0, len(payloads), self.batch_size)]
+        else:
+            units = [([i], True) for i in range(len(payloads))]
+        with ThreadPoolExecutor(max_workers=self.limiter.maximum) as pool:
+            pending = {pool.submit(self._post_unit, payloads, idxs, single): idxs for idxs, single in units}
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    idxs = pending.pop(fut)
+                    out = fut.result()
+                    if out is None:  # backend has no bulk route: resend one by one
+                        for i in idxs:
+                            pending[pool.submit(self._post_unit, payloads, [i], True)] = [i]
+                        continue
+                    for i, res in zip(idxs, out):
+                        results[i] = res
+        self.stats["items"] += len(payloads)
+        self.stats["succeeded"] += sum(1 for r in results if r and r.get("ok"))
+        self.stats["failed"] += sum(1 for r in results if not (r and r.get("ok")))
+        self.stats["seconds"] = round(self.stats["seconds"] + time.perf_counter() - t0, 3)
+        return results  # type: ignore[return-value]
+
+    def concurrency_stats(self) -> Dict[str, Any]:
+        lim = self.limiter
+        secs = self.stats["seconds"]
+        return {
+            "items_per_sec": round(self.stats["items"] / secs, 1) if secs else None,
+            "final": round(lim.limit, 1), "peak": round(lim.peak, 1), "decreases": lim.decreases,
+            "baseline_ms": round(lim.baseline_ms, 1) if lim.baseline_ms is not None else None,
+            "timeline": lim.timeline(),
+        }
+
+    def _post_unit(self, payloads: Sequence[Dict[str, Any]], idxs: List[int],
+                   single: bool) -> Optional[List[Dict[str, Any]]]:
+        if single:
+            return [self._post_one(payloads[idxs[0]])]
+        return self._post_bulk([payloads[i] for i in idxs])
+
+    def _bump(self, **counts: int):
+        with self._lock:
+            for k, v in counts.items():
+                self.stats[k] += v
+
+    def _send(self, url: str, body: Any, items: int = 1) -> requests.Response:
+        raw = json.dumps(body, separators=(",", ":"), default=str).encode("utf-8")
+        headers = dict(self.headers)
+        data = raw
+        if self.compress:
+            data = gzip.compress(raw, compresslevel=5)
+            headers["Content-Encoding"] = "gzip"
+        for attempt in range(self.max_retries + 1):
+            self._bump(requests=1, bytes_raw=len(raw), bytes_sent=len(data))
+            self.limiter.acquire()
+            start = time.perf_counter()
+            try:
+                r = self.session.post(url, data=data, headers=headers, timeout=self.timeout_sec)
+            except requests.RequestException:
+                self.limiter.release((time.perf_counter() - start) * 1000, overloaded=True)
+                raise
+            overloaded = r.status_code in RETRY_STATUSES
+            self.limiter.release((time.perf_counter() - start) * 1000, overloaded,
+                                 items=0 if overloaded or r.status_code >= 300 else items)
+            if not overloaded or attempt >= self.max_retries:
+                return r
+            retry_after = r.headers.get("Retry-After")
+            try:
+                delay = float(retry_after) if retry_after else 0.5 * 2 ** attempt
+            except ValueError:
+                delay = 0.5 * 2 ** attempt
+            time.sleep(min(delay, 30.0))
+        return r
+
+    def _post_bulk(self, chunk: List[Dict[str, Any]]) -> Optional[List[Dict[str, Any]]]:
+        try:
+            r = self._send(self.bulk_url, {"grants": chunk}, items=len(chunk))
+        except requests.RequestException as e:
+            return [{"ok": False, "error": f"{type(e).__name__}: {e}"} for _ in chunk]
+        if r.status_code in (404, 405):
+            self.bulk_supported = False
+            return None
+        if r.status_code >= 300:
+            err = f"bulk POST failed {r.status_code}: {r.text[:200]}"
+            return [{"ok": False, "error": err} for _ in chunk]
+        try:
+            items = r.json().get("results") or []
+        except ValueError:
+            return [{"ok": False, "error": "bulk POST returned non-JSON"} for _ in chunk]
+        by_index = {it.get("index", i): it for i, it in enumerate(items)}
+        return [
+            {"ok": bool(by_index.get(i, {}).get("ok")),
+             "id": by_index.get(i, {}).get("id"),
+             "error": by_index.get(i, {}).get("error") if i in by_index else "missing from bulk response"}
+            for i in range(len(chunk))
+        ]
+
+    def _post_one(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        try:
+            r = self._send(self.url, payload)
+        except requests.RequestException as e:
+            return {"ok": False, "error": f"{type(e).__name__}: {e}"}
+        if r.status_code >= 300:
+            return {"ok": False, "error": f"POST failed {r.status_code}: {r.text[:200]}"}
+        try:
+            return {"ok": True, "id": r.json().get("id")}
+        except ValueError:
+            return {"ok": True, "id": None}
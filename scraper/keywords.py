@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Multi-keyword matcher for relevance scoring.
+
+All keyword lists (grant keywords, exclusions, deadline/amount hints, strong
+indicators) are compiled once into a single Aho-Corasick automaton, and one
+pass over "title body" reports which keywords occur in the title part, the
+body part, or anywhere (including phrases that span the join). Matching is
+plain substring matching, exactly like `kw in text`.
+
+Very short keywords ("k", "m", "$") would fire on almost every character, so
+they stay out of the automaton and are checked with C-level `in` instead.
+A scan can also stop at the first hit from a given category, which keeps
+rejected pages (exclusion keywords) as cheap as the old early return.
+
+pyahocorasick provides the automaton; without it the matcher falls back to
+per-keyword substring checks with identical results.
+"""
+
+from typing import Dict, Iterable, Optional, Set
+
+try:
+    import ahocorasick
+except ImportError:  # pragma: no cover - fallback keeps results identical, just slower
+    ahocorasick = None
+
+
+class KeywordHits:
+    """Distinct keywords found in each region of a scanned text."""
+
+    __slots__ = ("matcher", "head", "tail", "anywhere", "stopped")
+
+    def __init__(self, matcher: "KeywordMatcher", head: Set[str], tail: Set[str], anywhere: Set[str],
+                 stopped: bool = False):
+        self.matcher = matcher
+        self.head = head
+        self.tail = tail
+        self.anywhere = anywhere
+        # True when the scan ended early on a `stop_on` keyword; regions are then incomplete
+        self.stopped = stopped
+
+    def _region(self, region: str) -> Set[str]:
+        return getattr(self, region)
+
+    def count(self, category: str, region: str = "anywhere") -> int:
+        """Number of list entries in `category` found in `region` (duplicate list entries count twice)."""
+        weights = self.matcher.categories[category]
+        return sum(weights[kw] for kw in self._region(region) if kw in weights)
+
+    def found(self, category: str, region: str = "anywhere") -> bool:
+        weights = self.matcher.categories[category]
+        return any(kw in weights for kw in self._region(region))
+
+
+# Keywords this short are matched with `in` rather than through the automaton
+SHORT_KEYWORD_LEN = 2
+
+
+class KeywordMatcher:
+    def __init__(self, categories: Dict[str, Iterable[str]]):
+        # category -> keyword -> how many times it appears in that list
+        self.categories: Dict[str, Dict[str, int]] = {}
+        for name, kws in categories.items():
+            weights: Dict[str, int] = {}
+            for kw in kws:
+                if kw:
+                    weights[kw] = weights.get(kw, 0) + 1
+            self.categories[name] = weights
+        self.keywords = sorted({kw for weights in self.categories.values() for kw in weights})
+        self._automaton = None
+        self._substring = self.keywords
+        if ahocorasick is not None:
+            automaton = ahocorasick.Automaton()
+            for kw in self.keywords:
+                if len(kw) > SHORT_KEYWORD_LEN:
+                    automaton.add_word(kw, (len(kw), kw))
+            if len(automaton):
+                automaton.make_automaton()
+                self._automaton = automaton
+                self._substring = [kw for kw in self.keywords if len(kw) <= SHORT_KEYWORD_LEN]
+
+    def scan(self, text: str, split: Optional[int] = None, stop_on: Optional[str] = None) -> KeywordHits:
+        """
+        Scan text once. With `split`, text[:split] is the head and text[split + 1:]
+        the tail (the caller joins title and body with one separator character).
+        With `stop_on`, return as soon as any keyword of that category is found.
+        """
+        split = len(text) if split is None else split
+        tail_start = split + 1
+        head: Set[str] = set()
+        tail: Set[str] = set()
+        anywhere: Set[str] = set()
+        stop = self.categories[stop_on] if stop_on else {}
+        head_text, tail_text = text[:split], text[tail_start:]
+        # Short keywords first: they are cheap and may settle a stop_on category
+        for kw in self._substring:
+            if kw in text:
+                anywhere.add(kw)
+                if kw in stop:
+                    return KeywordHits(self, head, tail, anywhere, stopped=True)
+                if kw in head_text:
+                    head.add(kw)
+                if kw in tail_text:
+                    tail.add(kw)
+        if self._automaton is not None:
+            for end, (length, kw) in self._automaton.iter(text):
+                if kw in stop:
+                    anywhere.add(kw)
+                    return KeywordHits(self, head, tail, anywhere, stopped=True)
+                anywhere.add(kw)
+                if end < split:
+                    head.add(kw)
+                elif end - length + 1 >= tail_start:
+                    tail.add(kw)
+        return KeywordHits(self, head, tail, anywhere)
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Change-detection ledger for posted grants.
+
+Remembers, per (source, sourceId), a hash of the payload last accepted by
+the backend. Grants whose payload hashes the same are not re-sent, which
+saves a round trip and a full-row rewrite (plus an updatedAt bump) on the
+backend. Entries older than a sync window are treated as changed so the
+backend is still refreshed periodically and drift heals on its own.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence
+
+from outbox import payload_key
+
+
+def payload_hash(payload: Dict[str, Any]) -> str:
+    """Hash of the fields sent to the backend (underscore-prefixed keys are local-only)."""
+    fields = {k: v for k, v in payload.items() if not k.startswith("_")}
+    blob = json.dumps(fields, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+class Ledger:
+    def __init__(self, path: str, table: str = "ingest_ledger"):
+        self.path = path
+        self.table = table
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            f'CREATE TABLE IF NOT EXISTS "{table}" ('
+            " key TEXT PRIMARY KEY,"
+            " hash TEXT NOT NULL,"
+            " posted REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    def changed(self, payloads: Sequence[Dict[str, Any]], max_age_sec: Optional[float] = None) -> List[bool]:
+        """Per payload: True if it is new, differs from the last post, or that post is older than max_age_sec."""
+        oldest = time.time() - max_age_sec if max_age_sec else None
+        out: List[bool] = []
+        with self._lock:
+            for p in payloads:
+                row = self._conn.execute(
+                    f'SELECT hash, posted FROM "{self.table}" WHERE key = ?', (payload_key(p),)
+                ).fetchone()
+                out.append(row is None or row[0] != payload_hash(p)
+                           or (oldest is not None and row[1] < oldest))
+        return out
+
+    def record(self, payloads: Sequence[Dict[str, Any]]):
+        """Remember payloads the backend has accepted."""
+        now = time.time()
+        with self._lock:
+            self._conn.executemany(
+                f'INSERT OR REPLACE INTO "{self.table}" (key, hash, posted) VALUES (?, ?, ?)',
+                [(payload_key(p), payload_hash(p), now) for p in payloads],
+            )
+            self._conn.commit()
+
+    def clear(self) -> int:
+        with self._lock:
+            cur = self._conn.execute(f'DELETE FROM "{self.table}"')
+            self._conn.commit()
+            return cur.rowcount
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
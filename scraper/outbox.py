@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Durable outbox for payloads on their way to the backend.
+
+Every payload is written to a SQLite table before it is posted and marked
+delivered once the backend accepts it, so a failed post or a crashed run
+loses nothing: undelivered rows are retried on the next run (or by
+`scraper.py --drain-outbox`) without re-scraping or new AI calls. Failed rows
+are rescheduled with exponential backoff and given up on after
+max_attempts; they stay in the table for inspection.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+
+def payload_key(payload: Dict[str, Any]) -> str:
+    """Same identity the backend upserts on: (source, sourceId or url)."""
+    source = payload.get("source") or ""
+    source_id = payload.get("sourceId") or payload.get("url") or ""
+    return f"{source}\x1f{source_id}"
+
+
+class Outbox:
+    def __init__(self, path: str, table: str = "outbox", max_attempts: int = 10,
+                 base_delay_sec: float = 60.0, max_delay_sec: float = 6 * 3600):
+        self.path = path
+        self.table = table
+        self.max_attempts = max_attempts
+        self.base_delay_sec = base_delay_sec
+        self.max_delay_sec = max_delay_sec
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            f'CREATE TABLE IF NOT EXISTS "{table}" ('
+            " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+            " key TEXT NOT NULL,"
+            " payload TEXT NOT NULL,"
+            " created REAL NOT NULL,"
+            " attempts INTEGER NOT NULL DEFAULT 0,"
+            " next_attempt REAL NOT NULL,"
+            " last_error TEXT,"
+            " delivered REAL)"
+        )
+        self._conn.execute(
+            f'CREATE INDEX IF NOT EXISTS "{table}_pending" ON "{table}" (delivered, next_attempt)'
+        )
+        self._conn.execute(f'CREATE INDEX IF NOT EXISTS "{table}_key" ON "{table}" (key)')
+        self._conn.commit()
+
+    def add_many(self, payloads: Sequence[Dict[str, Any]]) -> List[int]:
+        """Store payloads as undelivered; an older undelivered copy of the same grant is superseded."""
+        now = time.time()
+        ids: List[int] = []
+        with self._lock:
+            for p in payloads:
+                key = payload_key(p)
+                self._conn.execute(
+                    f'DELETE FROM "{self.table}" WHERE key = ? AND delivered IS NULL', (key,)
+                )
+                cur = self._conn.execute(
+                    f'INSERT INTO "{self.table}" (key, payload, created, next_attempt) VALUES (?, ?, ?, ?)',
+                    (key, json.dumps(p, separators=(",", ":"), default=str), now, now),
+                )
+                ids.append(cur.lastrowid)
+            self._conn.commit()
+        return ids
+
+    def pending(self, due_only: bool = True, limit: Optional[int] = None) -> List[Tuple[int, Dict[str, Any]]]:
+        """Undelivered rows still under max_attempts, oldest first."""
+        sql = f'SELECT id, payload FROM "{self.table}" WHERE delivered IS NULL AND attempts < ?'
+        args: List[Any] = [self.max_attempts]
+        if due_only:
+            sql += " AND next_attempt <= ?"
+            args.append(time.time())
+        sql += " ORDER BY id"
+        if limit:
+            sql += " LIMIT ?"
+            args.append(limit)
+        with self._lock:
+            rows = self._conn.execute(sql, args).fetchall()
+        return [(row_id, json.loads(blob)) for row_id, blob in rows]
+
+    def mark_delivered(self, ids: Sequence[int]):
+        now = time.time()
+        with self._lock:
+            self._conn.executemany(
+                f'UPDATE "{self.table}" SET delivered = ?, attempts = attempts + 1, last_error = NULL WHERE id = ?',
+                [(now, i) for i in ids],
+            )
+            self._conn.commit()
+
+    def mark_failed(self, failures: Sequence[Tuple[int, str]]):
+        """Record a failed attempt and push the row's next attempt out exponentially."""
+        now = time.time()
+        with self._lock:
+            for row_id, error in failures:
+                row = self._conn.execute(
+                    f'SELECT attempts FROM "{self.table}" WHERE id = ?', (row_id,)
+                ).fetchone()
+                if row is None:
+                    continue
+                delay = min(self.max_delay_sec, self.base_delay_sec * 2 ** row[0])
+                self._conn.execute(
+                    f'UPDATE "{self.table}" SET attempts = attempts + 1, next_attempt = ?, last_error = ? WHERE id = ?',
+                    (now + delay, (error or "")[:500], row_id),
+                )
+            self._conn.commit()
+
+    def purge_delivered(self, older_than_sec: float) -> int:
+        with self._lock:
+            cur = self._conn.execute(
+                f'DELETE FROM "{self.table}" WHERE delivered IS NOT NULL AND delivered < ?',
+                (time.time() - older_than_sec,),
+            )
+            self._conn.commit()
+            return cur.rowcount
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.time()
+        with self._lock:
+            delivered, due, deferred, dead = self._conn.execute(
+                "SELECT"
+                " COALESCE(SUM(delivered IS NOT NULL), 0),"
+                " COALESCE(SUM(delivered IS NULL AND attempts < ? AND next_attempt <= ?), 0),"
+                " COALESCE(SUM(delivered IS NULL AND attempts < ? AND next_attempt > ?), 0),"
+                " COALESCE(SUM(delivered IS NULL AND attempts >= ?), 0)"
+                f' FROM "{self.table}"',
+                (self.max_attempts, now, self.max_attempts, now, self.max_attempts),
+            ).fetchone()
+        return {"delivered": delivered, "due": due, "deferred": deferred, "dead": dead}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
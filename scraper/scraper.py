@@ -6,27 +6,35 @@
 #    3) Authorization: Bearer <INTERNAL_API_TOKEN> to match your Express middleware
 #    4) Fetch pacing and body size cap to reduce errors / timeouts
 
-import os, sys, time, json, re, traceback, hashlib
+import os, sys, time, json, re, traceback, hashlib, importlib
+_IMPORT_T0 = time.perf_counter()
+from dataclasses import asdict
 from datetime import datetime, timezone
-from typing import List, Dict, Any, Optional, Set, Tuple
+from typing import TYPE_CHECKING, List, Dict, Any, Optional, Set, Tuple
 from urllib.parse import urljoin, urlparse
 
 import requests
 import yaml
-import textwrap
-import feedparser
-from tenacity import retry, wait_exponential_jitter, stop_after_attempt
-
-from lxml import html as lxml_html
-from bs4 import BeautifulSoup
-from readability import Document
-import dateparser
+
 from urllib import robotparser
-import feedfinder2
 
 from requests.adapters import HTTPAdapter, Retry
-from tenacity import RetryError
-import openai
+
+# Heavy parsers (feedparser, feedfinder2, bs4, lxml, readability, dateparser, openai)
+# are imported on first use so maintenance runs like --validate-existing start fast.
+if TYPE_CHECKING:
+    from lxml.html import HtmlElement
+
+from ai import AIClient, AIJob, AIResult, append_batch, read_batch, read_results, rewrite_batch
+from amounts import amount_range
+from ingest import BulkIngestClient
+from cache import LRUStore
+from deadlines import extract_deadline
+from fingerprints import FingerprintStore
+from keywords import KeywordMatcher
+from ledger import Ledger
+from outbox import Outbox
+from summarize import summarize
 
 # ----------------- ENV / CONFIG -----------------
 def _dequote(s: str | None) -> str:
@@ -37,9 +45,24 @@ def _dequote(s: str | None) -> str:
     return s
 
 # OpenAI configuration
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
-if OPENAI_API_KEY:
-    openai.api_key = OPENAI_API_KEY
+OPENAI_API_KEY  = os.getenv("OPENAI_API_KEY")
+OPENAI_BASE_URL = _dequote(os.getenv("OPENAI_BASE_URL")) or None   # e.g. http://127.0.0.1:8787/v1 (stub_server.py)
+AI_MODEL        = os.getenv("SCRAPER_AI_MODEL", "gpt-3.5-turbo")
+AI_CONCURRENCY  = int(os.getenv("SCRAPER_AI_CONCURRENCY", "8"))
+AI_TIMEOUT_SEC  = float(os.getenv("SCRAPER_AI_TIMEOUT_SEC", "30"))
+AI_MAX_RETRIES  = int(os.getenv("SCRAPER_AI_MAX_RETRIES", "4"))
+# Gate: skip the model for titles that are already specific and descriptions already summary-sized
+AI_GATE               = (os.getenv("SCRAPER_AI_GATE", "true") or "true").lower() == "true"
+AI_TITLE_MIN_CHARS    = int(os.getenv("SCRAPER_AI_TITLE_MIN_CHARS", "25"))
+AI_SUMMARY_SKIP_CHARS = int(os.getenv("SCRAPER_AI_SUMMARY_SKIP_CHARS", "400"))
+AI_PROMPT_TOKEN_BUDGET = int(os.getenv("SCRAPER_AI_PROMPT_TOKEN_BUDGET", "600"))
+# ai: model summary with the extractive summary as fallback; extractive: never ask the model for summaries
+SUMMARY_MODE    = (os.getenv("SCRAPER_SUMMARY_MODE", "ai") or "ai").lower()
+# inline: AI runs before posting; batch: post with fallbacks now, queue AI requests for `--enrich`
+AI_MODE         = (os.getenv("SCRAPER_AI_MODE", "inline") or "inline").lower()
+AI_BATCH_FILE   = os.getenv("SCRAPER_AI_BATCH_FILE", os.path.join(os.path.dirname(os.path.abspath(__file__)), "ai_batch.jsonl"))
+AI_CACHE_ENABLED     = (os.getenv("SCRAPER_AI_CACHE_ENABLED", "true") or "true").lower() == "true"
+AI_CACHE_MAX_ENTRIES = int(os.getenv("SCRAPER_AI_CACHE_MAX_ENTRIES", "100000"))
 
 # ----------------- FILTERS / LIMITS -----------------
 # Keywords used to keep only grant-like items from RSS/HTML.
@@ -85,6 +108,12 @@ EXCLUDE_KEYWORDS = [
 # Max response bytes we’ll read from any HTTP fetch
 MAX_BODY = int(os.getenv("SCRAPER_MAX_BODY_BYTES", "2000000"))
 
+# Probe fetches read only the start of a page, count grant keywords in the URL path,
+# <title> and meta description (probe_score) and drop the connection for pages with none.
+PROBE_ENABLED   = (os.getenv("SCRAPER_PROBE_ENABLED", "true") or "true").lower() == "true"
+PROBE_BYTES     = int(os.getenv("SCRAPER_PROBE_BYTES", "16384"))
+PROBE_MIN_SCORE = int(os.getenv("SCRAPER_PROBE_MIN_SCORE", "1"))
+
 # ----------------- HINTS FOR SCORING/PARSING -----------------
 # Comma-separated env overrides:
 #   SCRAPER_DEADLINE_HINTS="deadline,due date,applications due"
@@ -98,6 +127,9 @@ DEADLINE_HINTS = [
     if h.strip()
 ]
 
+# Languages dateparser may consider for deadline strings (fewer = faster)
+DATE_LANGUAGES = [l.strip() for l in (os.getenv("SCRAPER_DATE_LANGUAGES") or "en").split(",") if l.strip()]
+
 AMOUNT_HINTS = [
     h.strip().lower()
     for h in (os.getenv("SCRAPER_AMOUNT_HINTS") or
@@ -113,6 +145,33 @@ AMOUNT_HINTS = [
 
 BACKEND_INTERNAL_URL = _dequote(os.getenv("BACKEND_INTERNAL_URL"))  # e.g., https://.../api/internal/grants
 INTERNAL_API_TOKEN   = _dequote(os.getenv("INTERNAL_API_TOKEN"))
+# Grants are posted this many per gzip request to the bulk route (<internal url>/bulk)
+INGEST_BATCH_SIZE    = int(os.getenv("SCRAPER_INGEST_BATCH_SIZE", "200"))
+INGEST_GZIP          = (os.getenv("SCRAPER_INGEST_GZIP", "true") or "true").lower() == "true"
+# Posting concurrency starts here and adapts (AIMD) up to the max on the backend's responses
+INGEST_CONCURRENCY     = int(os.getenv("SCRAPER_INGEST_CONCURRENCY", "2"))
+INGEST_MAX_CONCURRENCY = int(os.getenv("SCRAPER_INGEST_MAX_CONCURRENCY", "16"))
+# Payloads are written to an outbox table in STATE_DB before posting; undelivered ones are
+# retried with backoff on later runs (or `--drain-outbox`) instead of being lost
+OUTBOX_ENABLED         = (os.getenv("SCRAPER_OUTBOX_ENABLED", "true") or "true").lower() == "true"
+OUTBOX_MAX_ATTEMPTS    = int(os.getenv("SCRAPER_OUTBOX_MAX_ATTEMPTS", "10"))
+OUTBOX_RETENTION_DAYS  = float(os.getenv("SCRAPER_OUTBOX_RETENTION_DAYS", "7"))
+# Grants whose payload hash matches the last accepted post are not re-sent; after
+# FULL_SYNC_DAYS (0 = never) they are sent anyway. SCRAPER_FULL_SYNC / --full-sync sends everything.
+LEDGER_ENABLED         = (os.getenv("SCRAPER_LEDGER_ENABLED", "true") or "true").lower() == "true"
+FULL_SYNC_DAYS         = float(os.getenv("SCRAPER_FULL_SYNC_DAYS", "7"))
+FULL_SYNC              = (os.getenv("SCRAPER_FULL_SYNC", "false") or "false").lower() == "true"
+# Grants already in the corpus under another (source, sourceId) - same canonical URL or a
+# title/description SimHash within this many bits - are dropped before posting
+FINGERPRINTS_ENABLED   = (os.getenv("SCRAPER_FINGERPRINTS_ENABLED", "true") or "true").lower() == "true"
+SIMHASH_MAX_DISTANCE   = int(os.getenv("SCRAPER_SIMHASH_MAX_DISTANCE", "6"))
+
+# Validation of existing grants: ids are paged from the backend, batches validated concurrently
+VALIDATE_PAGE_SIZE     = int(os.getenv("SCRAPER_VALIDATE_PAGE_SIZE", "1000"))
+VALIDATE_BATCH_SIZE    = int(os.getenv("SCRAPER_VALIDATE_BATCH_SIZE", "50"))
+VALIDATE_WORKERS       = int(os.getenv("SCRAPER_VALIDATE_WORKERS", "4"))
+VALIDATE_TIMEOUT_SEC   = int(os.getenv("SCRAPER_VALIDATE_TIMEOUT_SEC", "120"))
+VALIDATE_PROGRESS_SEC  = float(os.getenv("SCRAPER_VALIDATE_PROGRESS_SEC", "10"))
 
 BATCH_LIMIT          = int(os.getenv("SCRAPER_BATCH_LIMIT", "10"))
 LOG_LEVEL            = (os.getenv("SCRAPER_LOG_LEVEL", "info") or "info").lower()
@@ -132,12 +191,34 @@ RELEVANCE_MIN_SCORE   = int(os.getenv("SCRAPER_RELEVANCE_MIN_SCORE", "6"))
 TITLE_WEIGHT          = 4
 BODY_WEIGHT           = 1
 
+# Pre-fetch link filter: discovered links are scored on anchor text, nearby text and
+# URL path before they are queued; links scoring below the minimum are never fetched.
+LINK_MIN_SCORE        = int(os.getenv("SCRAPER_LINK_MIN_SCORE", "0"))
+LINK_CONTEXT_CHARS    = int(os.getenv("SCRAPER_LINK_CONTEXT_CHARS", "200"))
+LINK_BLOCKED_SEGMENTS = set(
+    s.strip().lower() for s in
+    (os.getenv("SCRAPER_LINK_BLOCKED_SEGMENTS") or
+     "about, about-us, news, newsroom, press, blog, events, login, logout, signin, sign-in, "
+     "signup, register, account, profile, privacy, privacy-policy, terms, legal, cookies, "
+     "contact, contact-us, faq, help, careers, jobs, search, cart, donate, subscribe, sitemap"
+    ).split(",")
+    if s.strip()
+)
+
 SERPAPI_KEY          = _dequote(os.getenv("SERPAPI_KEY"))      # optional
 BING_API_KEY         = _dequote(os.getenv("BING_API_KEY"))     # optional
 GOOGLE_API_KEY       = _dequote(os.getenv("GOOGLE_API_KEY"))   # optional
 GOOGLE_CSE_ID        = _dequote(os.getenv("GOOGLE_CSE_ID"))    # optional
 DUCKDUCKGO_API_KEY   = _dequote(os.getenv("DUCKDUCKGO_API_KEY")) # optional
 
+# Local state (extraction cache) kept between runs
+STATE_DB             = os.getenv("SCRAPER_STATE_DB", os.path.join(os.path.dirname(os.path.abspath(__file__)), "scraper_state.sqlite"))
+CACHE_ENABLED        = (os.getenv("SCRAPER_CACHE_ENABLED", "true") or "true").lower() == "true"
+CACHE_MAX_ENTRIES    = int(os.getenv("SCRAPER_CACHE_MAX_ENTRIES", "50000"))
+CACHE_MAX_MB         = int(os.getenv("SCRAPER_CACHE_MAX_MB", "256"))
+# Bump whenever extraction/parsing/AI code changes so cached payload fields are recomputed.
+EXTRACTOR_VERSION    = "3"
+
 
 def _build_session() -> requests.Session:
     s = requests.Session()
@@ -196,44 +277,6 @@ def auth_sanity_check():
         log("error", "auth_check.exception", error=str(e))
 
 
-@retry(wait=wait_exponential_jitter(initial=1, max=20), stop=stop_after_attempt(5))
-def post_grant(payload: Dict[str, Any]) -> Dict[str, Any]:
-    if DRY_RUN:
-        log("info", "DRY_RUN on, skipping POST", title=payload.get("title"))
-        return {"ok": True, "dryRun": True}
-
-    if not BACKEND_INTERNAL_URL:
-        hard_fail("Missing BACKEND_INTERNAL_URL")
-
-    # Send BOTH headers to maximize compatibility with your middleware
-    headers = {"Content-Type": "application/json"}
-    if INTERNAL_API_TOKEN:
-        headers["Authorization"] = f"Bearer {INTERNAL_API_TOKEN}"
-        headers["x-internal-token"] = INTERNAL_API_TOKEN
-
-    r = SESSION.post(
-        BACKEND_INTERNAL_URL,
-        json=payload,
-        headers=headers,
-        timeout=TIMEOUT_SEC,
-    )
-    if r.status_code == 429:
-        raise RuntimeError(f"429 from backend: {r.text[:200]}")
-    if r.status_code == 401:
-        # Add helpful context in logs
-        raise RuntimeError(
-            "POST failed 401: Unauthorized. "
-            "Tried both Authorization: Bearer and x-internal-token. "
-            "Check token value and backend auth middleware."
-        )
-    if r.status_code >= 300:
-        raise RuntimeError(f"POST failed {r.status_code}: {r.text[:200]}")
-    try:
-        return r.json()
-    except Exception:
-        return {"ok": r.ok}
-
-
 # ----------------- LOGGING -----------------
 def log(level: str, msg: str, **ctx):
     levels = ["debug", "info", "warn", "error"]
@@ -246,6 +289,33 @@ def hard_fail(msg: str):
     log("error", msg)
     sys.exit(1)
 
+# ----------------- RUN STATS -----------------
+# Counters reported with "Scraper completed"
+STATS: Dict[str, int] = {
+    "pages_fetched": 0,
+    "links_seen": 0,
+    "links_skipped": 0,
+    "grants_accepted": 0,
+    "bytes_fetched": 0,
+    "probe_rejected": 0,
+    "probe_bytes": 0,        # bytes read from pages the probe rejected
+    "probe_full_bytes": 0,   # their advertised Content-Length, where known
+    "grants_posted": 0,
+    "grants_unchanged": 0,   # skipped: same payload hash as the last accepted post
+    "grants_duplicate": 0,   # dropped: fingerprint matches a different grant in the corpus
+}
+
+def bump(counter: str, n: int = 1):
+    STATS[counter] = STATS.get(counter, 0) + n
+
+def run_stats() -> Dict[str, Any]:
+    stats: Dict[str, Any] = dict(STATS)
+    accepted = STATS["grants_accepted"]
+    stats["fetches_per_grant"] = round(STATS["pages_fetched"] / accepted, 2) if accepted else None
+    full = STATS["probe_full_bytes"]
+    stats["probe_full_ratio"] = round(STATS["probe_bytes"] / full, 3) if full else None
+    return stats
+
 # ----------------- UTIL -----------------
 def sha1(s: str) -> str:
     return hashlib.sha1(s.encode("utf-8", errors="ignore")).hexdigest()
@@ -258,15 +328,74 @@ def same_host(u1: str, u2: str) -> bool:
     a, b = urlparse(u1), urlparse(u2)
     return a.netloc == b.netloc
 
-def fetch(url: str) -> Optional[requests.Response]:
+TITLE_TAG_RE = re.compile(rb"<title[^>]*>(.*?)</title", re.IGNORECASE | re.DOTALL)
+META_TAG_RE  = re.compile(rb"<meta\s[^>]*>", re.IGNORECASE)
+META_DESC_RE = re.compile(rb"""(?:name|property)\s*=\s*["']?(?:og:)?description["'\s>/]""", re.IGNORECASE)
+META_CONTENT_RE = re.compile(rb"""content\s*=\s*(?:"([^"]*)"|'([^']*)')""", re.IGNORECASE)
+
+def probe_head(head: bytes, encoding: Optional[str] = None) -> Tuple[str, str]:
+    """<title> and meta description from the first bytes of an HTML page."""
+    import html as html_lib
+    def dec(b: bytes) -> str:
+        return re.sub(r"\s+", " ", html_lib.unescape(b.decode(encoding or "utf-8", errors="replace"))).strip()
+    title = ""
+    m = TITLE_TAG_RE.search(head)
+    if m:
+        title = dec(m.group(1))
+    desc = ""
+    for tag in META_TAG_RE.finditer(head):
+        if META_DESC_RE.search(tag.group(0)):
+            c = META_CONTENT_RE.search(tag.group(0))
+            if c:
+                desc = dec(c.group(1) or c.group(2) or b"")
+                break
+    return title, desc
+
+def _read_body(chunks, limit: int, buf: bytes = b"", stop: Optional[bytes] = None) -> bytes:
+    parts = [buf] if buf else []
+    size = len(buf)
+    for chunk in chunks:
+        if not chunk:
+            continue
+        parts.append(chunk)
+        size += len(chunk)
+        if size >= limit or (stop and stop in chunk.lower()):
+            break
+    return b"".join(parts)[:limit]
+
+def fetch(url: str, probe: bool = False) -> Optional[requests.Response]:
+    """
+    GET a page, reading at most MAX_BODY bytes. With probe=True, HTML pages are
+    read PROBE_BYTES at a time first and abandoned if their URL path, <title> and
+    meta description carry no grant keyword; otherwise the same stream is read on.
+    """
+    bump("pages_fetched")
     try:
-        r = SESSION.get(url, timeout=TIMEOUT_SEC, allow_redirects=True)
+        r = SESSION.get(url, timeout=TIMEOUT_SEC, allow_redirects=True, stream=True)
         if r.status_code >= 400:
             log("warn", "Fetch bad status", url=url, status=r.status_code)
+            r.close()
             return None
+        chunks = r.iter_content(chunk_size=8192)
+        body = b""
+        if probe and PROBE_ENABLED and "html" in (r.headers.get("Content-Type") or "html").lower():
+            body = _read_body(chunks, PROBE_BYTES, stop=b"</head>")
+            title, desc = probe_head(body, r.encoding)
+            if (title or desc) and probe_score(url, title, desc) < PROBE_MIN_SCORE:
+                full = int(r.headers.get("Content-Length") or 0)
+                bump("probe_rejected")
+                bump("bytes_fetched", len(body))
+                if full:
+                    bump("probe_bytes", len(body))
+                    bump("probe_full_bytes", full)
+                log("debug", "Probe rejected", url=url, title=title[:140], probe_bytes=len(body), full_bytes=full or None)
+                r.close()
+                return None
         # trim oversized responses to protect parsers
-        if r.content and len(r.content) > MAX_BODY:
-            r._content = r.content[:MAX_BODY]
+        r._content = _read_body(chunks, MAX_BODY, buf=body)
+        r._content_consumed = True
+        r.close()
+        bump("bytes_fetched", len(r._content))
         return r
     except Exception as e:
         log("warn", "Fetch error", url=url, error=str(e))
@@ -298,89 +427,12 @@ def regex_group(pattern: str, text: str, group_index: int = -1) -> Optional[str]
     return m.group(group_index if group_index != -1 else (m.lastindex or 0))
 
 def parse_amounts(text: str, default_currency: str = "USD") -> Tuple[int,int,str]:
-    if not text: return (0,0,default_currency)
-    currency = default_currency
-    vals = []
-    
-    # Enhanced patterns for amount extraction
-    patterns = [
-        # Currency symbols with numbers
-        r"([$€£])\s?([\d,\.]+(?:\s?[km]?)?)",
-        # Numbers with currency words
-        r"([\d,\.]+(?:\s?[km]?)?)\s*(?:dollars?|euros?|pounds?|usd|eur|gbp)",
-        # "up to", "maximum", "minimum" patterns
-        r"(?:up\s+to|maximum|max)\s*([$€£]?)\s?([\d,\.]+(?:\s?[km]?)?)",
-        # Range patterns like "$50,000 - $100,000"
-        r"([$€£])\s?([\d,\.]+(?:\s?[km]?)?)\s*[-–—]\s*[$€£]?\s?([\d,\.]+(?:\s?[km]?)?)",
-        # "between X and Y" patterns
-        r"between\s+([$€£]?)\s?([\d,\.]+(?:\s?[km]?)?)\s+and\s+[$€£]?\s?([\d,\.]+(?:\s?[km]?)?)",
-    ]
-    
-    for pattern in patterns:
-        for match in re.finditer(pattern, text, re.IGNORECASE):
-            groups = match.groups()
-            if len(groups) >= 2:
-                # Handle range patterns
-                if len(groups) == 3 and groups[2]:
-                    # Range pattern: extract both values
-                    sym1, num1, num2 = groups[0], groups[1], groups[2]
-                    if sym1 == "€": currency = "EUR"
-                    elif sym1 == "£": currency = "GBP"
-                    
-                    try:
-                        v1 = _parse_number(num1)
-                        v2 = _parse_number(num2)
-                        if v1 and v2:
-                            vals.extend([v1, v2])
-                    except Exception:
-                        pass
-                else:
-                    # Single value pattern
-                    sym, num = groups[0], groups[1]
-                    if sym == "€": currency = "EUR"
-                    elif sym == "£": currency = "GBP"
-                    
-                    try:
-                        v = _parse_number(num)
-                        if v:
-                            vals.append(v)
-                    except Exception:
-                        pass
-    
-    if not vals: return (0,0,currency)
-    return (min(vals), max(vals), currency)
+    lo, hi, currency = amount_range(text, default_currency)
+    if lo is None: return (0,0,currency)
+    return (int(lo), int(hi), currency)
 
-def _parse_number(num_str: str) -> Optional[int]:
-    """Parse a number string with k/m suffixes"""
-    if not num_str:
-        return None
-    
-    # Clean the number
-    num_str = num_str.replace(",", "").strip()
-    
-    # Handle k/m suffixes
-    multiplier = 1
-    if num_str.lower().endswith('k'):
-        multiplier = 1000
-        num_str = num_str[:-1]
-    elif num_str.lower().endswith('m'):
-        multiplier = 1000000
-        num_str = num_str[:-1]
-    elif num_str.lower().endswith('b'):
-        multiplier = 1000000000
-        num_str = num_str[:-1]
-    
-    try:
-        return int(float(num_str) * multiplier)
-    except Exception:
-        return None
-
-def parse_deadline(text: str) -> Optional[str]:
-    if not text: return None
-    dt = dateparser.parse(
-        text,
-        settings={"PREFER_DATES_FROM": "future", "RETURN_AS_TIMEZONE_AWARE": True}
-    )
+def parse_deadline(text: str, hint: Optional[str] = None) -> Optional[str]:
+    dt = extract_deadline(text, DEADLINE_HINTS, hint=hint, languages=DATE_LANGUAGES)
     if dt: return dt.astimezone(timezone.utc).isoformat()
     return None
 
@@ -403,33 +455,44 @@ def is_allowed_tld(url: str) -> bool:
     tld = "." + domain_tld(url)
     return (not ALLOWED_TLDS) or (tld in ALLOWED_TLDS)
 
+# Phrases that on their own strongly suggest a grant page
+STRONG_INDICATORS = ["rfp", "rfa", "solicitation", "proposal", "application", "deadline", "funding opportunity"]
+
+_KEYWORD_MATCHER: Optional[KeywordMatcher] = None
+
+def keyword_matcher() -> KeywordMatcher:
+    # Built once from all keyword lists; a single pass over a document finds every hit
+    global _KEYWORD_MATCHER
+    if _KEYWORD_MATCHER is None:
+        _KEYWORD_MATCHER = KeywordMatcher({
+            "grant": GRANT_KEYWORDS,
+            "exclude": EXCLUDE_KEYWORDS,
+            "deadline": DEADLINE_HINTS,
+            "amount": AMOUNT_HINTS,
+            "strong": STRONG_INDICATORS,
+        })
+    return _KEYWORD_MATCHER
+
 def relevance_score(title: str, body: str) -> int:
     t = (title or "").lower()
     b = (body or "").lower()
     combined_text = f"{t} {b}"
-
-    def hits(text: str, kws: set[str]) -> int:
-        score = 0
-        for kw in kws:
-            if kw in text:
-                score += 1
-        return score
+    hits = keyword_matcher().scan(combined_text, split=len(t), stop_on="exclude")
 
     # Check for exclusion keywords first
-    if any(exclude_kw in combined_text for exclude_kw in EXCLUDE_KEYWORDS):
+    if hits.stopped:
         return 0  # Immediately reject if contains exclusion keywords
 
     score = 0
-    score += TITLE_WEIGHT * hits(t, GRANT_KEYWORDS)
-    score += BODY_WEIGHT  * hits(b, GRANT_KEYWORDS)
+    score += TITLE_WEIGHT * hits.count("grant", "head")
+    score += BODY_WEIGHT  * hits.count("grant", "tail")
     
     # Bonus points for grant-specific indicators
-    if any(h in t or h in b for h in DEADLINE_HINTS): score += 2
-    if any(h in t or h in b for h in AMOUNT_HINTS):   score += 2
+    if hits.found("deadline", "head") or hits.found("deadline", "tail"): score += 2
+    if hits.found("amount", "head") or hits.found("amount", "tail"):     score += 2
     
     # Additional bonus for strong grant indicators
-    strong_indicators = ["rfp", "rfa", "solicitation", "proposal", "application", "deadline", "funding opportunity"]
-    if any(indicator in combined_text for indicator in strong_indicators):
+    if hits.found("strong"):
         score += 3
     
     # Penalty for very short content (likely not a real grant)
@@ -438,9 +501,57 @@ def relevance_score(title: str, body: str) -> int:
     
     return max(0, score)  # Ensure non-negative score
 
+def probe_score(url: str, title: str, description: str) -> int:
+    """
+    Positive grant signals in a page's URL path, <title> and meta description, for the
+    fetch probe. Unlike relevance_score there are no exclusions and no short-text penalty:
+    heads are short and often carry the site name ("Grants | Foundation Home").
+    """
+    path = re.sub(r"[^a-z0-9]+", " ", urlparse(url).path.lower())
+    hits = keyword_matcher().scan(f"{title} {description} {path}".lower())
+    return sum(hits.count(category) for category in ("grant", "deadline", "amount", "strong"))
+
 def looks_like_grant_page(url: str, title: str, description: str) -> bool:
     return relevance_score(title, description) >= RELEVANCE_MIN_SCORE
 
+# ----------------- LINK SCORING (before fetch) -----------------
+_EXCLUDE_WORDS_RE: Optional["re.Pattern"] = None
+
+def _exclude_words_re() -> "re.Pattern":
+    # Whole words only: link text is short, and "main"/"index" inside "domain"/"indexed" are not signals
+    global _EXCLUDE_WORDS_RE
+    if _EXCLUDE_WORDS_RE is None:
+        alts = sorted(set(EXCLUDE_KEYWORDS), key=len, reverse=True)
+        _EXCLUDE_WORDS_RE = re.compile(r"\b(?:" + "|".join(re.escape(k) for k in alts) + r")\b")
+    return _EXCLUDE_WORDS_RE
+
+def url_path_tokens(url: str) -> List[str]:
+    return [t for t in re.split(r"[^a-z0-9]+", urlparse(url).path.lower()) if t]
+
+def link_blocked(url: str) -> bool:
+    segments = [seg for seg in urlparse(url).path.lower().split("/") if seg]
+    return any(seg.rsplit(".", 1)[0] in LINK_BLOCKED_SEGMENTS for seg in segments)
+
+def link_score(url: str, anchor_text: str = "", context: str = "") -> Optional[int]:
+    """
+    Cheap relevance estimate for a link that has not been fetched yet.
+    Returns None for links under a blocked path segment (/about, /news, /login, ...).
+    """
+    if link_blocked(url):
+        return None
+    label = f"{(anchor_text or '').lower()} {' '.join(url_path_tokens(url))}"
+    ctx = (context or "").lower()[:LINK_CONTEXT_CHARS]
+    hits = keyword_matcher().scan(f"{label} {ctx}", split=len(label))
+    score = 2 * hits.count("grant", "head") + hits.count("grant", "tail")
+    if hits.found("strong", "head"):
+        score += 2
+    score -= 2 * len(set(_exclude_words_re().findall(label)))
+    return score
+
+def link_allowed(url: str, anchor_text: str = "", context: str = "") -> bool:
+    score = link_score(url, anchor_text, context)
+    return score is not None and score >= LINK_MIN_SCORE
+
 # ----------------- HTML Sanitation & Readability Fallback -----------------
 CONTROL_CHARS_RE = re.compile(r"[\x00-\x08\x0B\x0C\x0E-\x1F\x7F]")
 
@@ -448,12 +559,15 @@ def _safe_text(s: str) -> str:
     if not s: return ""
     return CONTROL_CHARS_RE.sub(" ", s)
 
-def download_and_readable(url: str) -> Optional[lxml_html.HtmlElement]:
+def download_and_readable(url: str) -> Optional["HtmlElement"]:
     resp = fetch(url)
     if not resp:
         return None
+    return readable_root(resp.text or "")
 
-    raw = resp.text or ""
+def readable_root(raw: str) -> Optional["HtmlElement"]:
+    from lxml import html as lxml_html
+    from readability import Document
     raw = _safe_text(raw)
 
     # Try Readability first, sanitized
@@ -471,6 +585,7 @@ def download_and_readable(url: str) -> Optional[lxml_html.HtmlElement]:
     except Exception:
         # Final fallback: BeautifulSoup → text in a minimal container
         try:
+            from bs4 import BeautifulSoup
             soup = BeautifulSoup(raw, "html.parser")
             text = soup.get_text(separator=" ", strip=True)
             html_min = f"<html><body><article>{_safe_text(text)}</article></body></html>"
@@ -513,84 +628,155 @@ def extract_funding_page_url(original_url: str, page_content: str) -> str:
         log("warn", "Failed to extract funding page URL", error=str(e), url=original_url)
         return original_url
 
-def generate_ai_summary(title: str, description: str, eligibility: str, funding_min: Optional[float], funding_max: Optional[float], currency: str) -> str:
-    """Generate AI summary using OpenAI GPT"""
-    if not OPENAI_API_KEY:
-        return description[:500]  # Fallback to truncated description
-    
-    try:
-        prompt = f"""
-        Create a clear, concise summary of this grant opportunity. Focus on:
-        1. What the grant is for (purpose/goals)
-        2. Who can apply (eligibility)
-        3. Funding amount and timeline
-        4. Key requirements or focus areas
-        
-        Grant Title: {title}
-        Description: {description}
-        Eligibility: {eligibility}
-        Funding: {currency} {funding_min or 'TBD'} - {funding_max or 'TBD'}
-        
-        Write a 2-3 sentence summary in plain language that researchers can quickly understand.
-        """
-        
-        response = openai.ChatCompletion.create(
-            model="gpt-3.5-turbo",
-            messages=[
-                {"role": "system", "content": "You are a research funding expert who creates clear, concise summaries of grant opportunities for researchers."},
-                {"role": "user", "content": prompt}
-            ],
-            max_tokens=200,
-            temperature=0.3
-        )
-        
-        return response.choices[0].message.content.strip()
-        
-    except Exception as e:
-        log("warn", "Failed to generate AI summary", error=str(e))
-        return description[:500]  # Fallback to truncated description
+_AI_CLIENT: Optional[AIClient] = None
+_AI_CACHE: Optional[LRUStore] = None
 
-def generate_ai_title(title: str, description: str, source: str) -> str:
-    """Generate a better, more specific title using OpenAI GPT"""
-    if not OPENAI_API_KEY:
-        return title  # Fallback to original title
-    
+def ai_cache() -> Optional[LRUStore]:
+    # AI outputs keyed by prompt inputs + model + prompt version (see ai.AIClient.cache_key)
+    global _AI_CACHE
+    if not AI_CACHE_ENABLED:
+        return None
+    if _AI_CACHE is None:
+        try:
+            _AI_CACHE = LRUStore(STATE_DB, table="ai_cache", max_entries=AI_CACHE_MAX_ENTRIES)
+        except Exception as e:
+            log("warn", "AI cache unavailable", error=str(e), path=STATE_DB)
+            return None
+    return _AI_CACHE
+
+def ai_client() -> Optional[AIClient]:
+    global _AI_CLIENT
+    # batch mode only writes request files, so it does not need a key until --enrich
+    if not OPENAI_API_KEY and AI_MODE != "batch":
+        return None
+    if _AI_CLIENT is None:
+        _AI_CLIENT = AIClient(OPENAI_API_KEY or "", model=AI_MODEL, base_url=OPENAI_BASE_URL,
+                              concurrency=AI_CONCURRENCY, timeout_sec=AI_TIMEOUT_SEC,
+                              max_retries=AI_MAX_RETRIES, cache=ai_cache(),
+                              gate=AI_GATE, title_min_chars=AI_TITLE_MIN_CHARS,
+                              summary_skip_chars=AI_SUMMARY_SKIP_CHARS,
+                              prompt_token_budget=AI_PROMPT_TOKEN_BUDGET)
+    return _AI_CLIENT
+
+def invalidate_ai_cache():
+    cache = ai_cache()
+    if cache is None:
+        log("warn", "AI cache disabled; nothing to invalidate")
+        return
+    removed = cache.clear()
+    cache.close()
+    log("info", "AI cache invalidated", removed=removed, path=STATE_DB)
+
+def extractive_summary(description: str) -> str:
     try:
-        prompt = f"""
-        Create a more specific and descriptive title for this grant opportunity. The current title is too broad or generic.
-        
-        Current Title: {title}
-        Description: {description}
-        Source: {source}
-        
-        Requirements:
-        - Be specific about the research area or focus
-        - Include the funding agency if relevant
-        - Keep it under 80 characters
-        - Make it clear what type of funding this is (research, fellowship, equipment, etc.)
-        - Use professional academic language
-        
-        Return only the new title, nothing else.
-        """
-        
-        response = openai.ChatCompletion.create(
-            model="gpt-3.5-turbo",
-            messages=[
-                {"role": "system", "content": "You are a research funding expert who creates clear, specific titles for grant opportunities."},
-                {"role": "user", "content": prompt}
-            ],
-            max_tokens=50,
-            temperature=0.3
-        )
-        
-        new_title = response.choices[0].message.content.strip()
-        # Remove quotes if present
-        new_title = new_title.strip('"\'')
-        return new_title[:80]  # Ensure it fits in database
-        
+        return summarize(description, max_sentences=3, max_chars=500) or description[:500]
     except Exception as e:
-        log("warn", "Failed to generate AI title", error=str(e))
-        return title  # Fallback to original title
+        log("warn", "Extractive summary failed", error=str(e))
+        return description[:500]
+
+def apply_ai_result(payload: Dict[str, Any], res: AIResult):
+    if res.title:
+        payload["title"] = payload["aiTitle"] = res.title[:500]
+    if res.summary:
+        payload["summary"] = payload["aiSummary"] = res.summary[:2000]
+
+def enrich_items(items: List[Dict[str, Any]]):
+    """
+    Fill aiTitle/aiSummary for a batch of payloads with one structured AI call per
+    grant, run concurrently. Payloads keep their fallbacks when AI is off or fails.
+    In batch mode, uncached grants are queued to AI_BATCH_FILE and posted as they are.
+    """
+    pending = [p for p in items if "_aiInput" in p]
+    jobs = [AIJob(**p.pop("_aiInput")) for p in pending]
+    client = ai_client()
+    if not client or not jobs:
+        return
+    if AI_MODE == "batch":
+        queue_ai_batch(client, pending, jobs)
+        return
+    t0 = time.perf_counter()
+    results = client.enrich_many(jobs)
+    enriched = 0
+    for payload, res in zip(pending, results):
+        if not res or not (res.title or res.summary):
+            continue
+        apply_ai_result(payload, res)
+        enriched += 1
+    elapsed = time.perf_counter() - t0
+    ctx: Dict[str, Any] = {}
+    failed = sum(res is None for res in results)
+    if failed:
+        # gated grants come back empty, not None; only real failures carry an error
+        ctx["failed"] = failed
+        ctx["last_error"] = client.stats["last_error"]
+    log("info", "AI enrichment", items=len(jobs), enriched=enriched,
+        ms_per_grant=round(elapsed * 1000 / len(jobs), 1), cache=client.cache_stats(),
+        gate=client.gate_stats(), **ctx)
+
+def queue_ai_batch(client: AIClient, pending: List[Dict[str, Any]], jobs: List[AIJob]):
+    queued = []
+    for payload, job in zip(pending, jobs):
+        job = client.prepare(job)
+        if not (job.need_title or job.need_summary):
+            client.stats["calls_avoided"] += 1
+            continue
+        res = client.cached(job)
+        if res:
+            apply_ai_result(payload, client.requested_only(job, res))
+            continue
+        # the sidecar keeps the fallback payload; the patch re-posts it in full
+        queued.append((f"{payload['source']}/{payload['sourceId']}", job, dict(payload)))
+    try:
+        n = append_batch(AI_BATCH_FILE, client, queued)
+    except OSError as e:
+        log("warn", "AI batch file not writable", error=str(e), path=AI_BATCH_FILE)
+        return
+    log("info", "AI requests queued", queued=n, cached=len(jobs) - n, path=AI_BATCH_FILE)
+
+def run_enrich(results_path: Optional[str] = None, batch_path: str = AI_BATCH_FILE):
+    """
+    Enrich grants queued in batch mode and patch them in the backend. With a results
+    file (OpenAI Batch API output), outputs are ingested from it; otherwise the queued
+    requests are sent through the async AI pool now. Unfinished entries stay queued.
+    """
+    client = ai_client()
+    entries = read_batch(batch_path)
+    if not client or not entries:
+        log("info", "AI enrich: nothing to do", queued=len(entries), path=batch_path)
+        return
+    ids = list(entries)
+    jobs = [AIJob(**entries[cid]["job"]) for cid in ids]
+    if results_path:
+        from_file = read_results(results_path)
+        results = [from_file.get(cid) for cid in ids]
+        for i, (job, res) in enumerate(zip(jobs, results)):
+            if res:
+                client.remember(job, res)
+                results[i] = client.requested_only(job, res)
+    else:
+        results = client.enrich_many(jobs)
+
+    remaining = []
+    done = []
+    for cid, res in zip(ids, results):
+        rec = entries[cid]
+        if not res:
+            remaining.append(rec)
+            continue
+        apply_ai_result(rec["payload"], res)
+        done.append(rec)
+    patched = 0
+    outcomes = deliver([rec["payload"] for rec in done]) if done and not DRY_RUN else [{"ok": True}] * len(done)
+    for rec, out in zip(done, outcomes):
+        if out.get("ok"):
+            patched += 1
+        else:
+            log("error", "AI patch failed", url=rec["payload"].get("url", ""), error=out.get("error"))
+            if not outbox():  # otherwise the outbox already holds the patched payload for retry
+                remaining.append(rec)
+    rewrite_batch(batch_path, client, remaining)
+    log("info", "AI enrich completed", queued=len(ids), patched=patched, remaining=len(remaining),
+        source="results" if results_path else "api", cache=client.cache_stats())
 
 def to_payload(source: str, url: str, title: str, description: str,
                eligibility: str,
@@ -602,16 +788,16 @@ def to_payload(source: str, url: str, title: str, description: str,
         (amount_hint or "") + " " + title + " " + description,
         default_currency=default_currency or "USD"
     )
-    deadline_iso = parse_deadline(deadline_hint or description) or "2030-01-01T00:00:00.000Z"
+    deadline_iso = parse_deadline(description, hint=deadline_hint) or "2030-01-01T00:00:00.000Z"
     
     # Extract funding page URL if page content is available
     funding_url = url
     if page_content:
         funding_url = extract_funding_page_url(url, page_content)
     
-    # Generate AI content
-    ai_summary = generate_ai_summary(title, description, eligibility, fund_min, fund_max, currency)
-    ai_title = generate_ai_title(title, description, source)
+    # Fallbacks until enrich_items() replaces them with AI output
+    ai_summary = extractive_summary(description)
+    ai_title = title
     
     return {
         "source": source,
@@ -627,8 +813,90 @@ def to_payload(source: str, url: str, title: str, description: str,
         "fundingMax": fund_max,
         "currency": currency,
         "deadline": deadline_iso,
+        # Inputs for the AI call made by enrich_items() before posting; never posted
+        "_aiInput": asdict(AIJob(title, description, eligibility, fund_min, fund_max, currency, source,
+                                 need_summary=SUMMARY_MODE != "extractive")),
     }
 
+# ----------------- EXTRACTION CACHE -----------------
+# Payload fields are cached per (normalized body hash, rules version, code version)
+# so re-scraping a byte-identical page skips parsing, extraction and AI calls.
+_PAYLOAD_CACHE: Optional[LRUStore] = None
+
+def payload_cache() -> Optional[LRUStore]:
+    global _PAYLOAD_CACHE
+    if not CACHE_ENABLED:
+        return None
+    if _PAYLOAD_CACHE is None:
+        try:
+            _PAYLOAD_CACHE = LRUStore(STATE_DB, table="payload_cache",
+                                      max_entries=CACHE_MAX_ENTRIES,
+                                      max_bytes=CACHE_MAX_MB * 1024 * 1024)
+        except Exception as e:
+            log("warn", "Payload cache unavailable", error=str(e), path=STATE_DB)
+            return None
+    return _PAYLOAD_CACHE
+
+def normalize_body(raw: str) -> str:
+    return re.sub(r"\s+", " ", _safe_text(raw or "")).strip()
+
+def payload_cache_key(raw: str, url: str, rules: Dict[str, Any], *extra: Any) -> str:
+    rules_version = sha1(json.dumps([rules, url, *extra], sort_keys=True, default=str))
+    return sha1(f"{sha1(normalize_body(raw))}:{rules_version}:{EXTRACTOR_VERSION}")
+
+def cached_payload(key: str, source: str, url: str) -> Tuple[bool, Optional[Dict[str, Any]]]:
+    """Returns (hit, payload). A hit with payload None means the page was rejected last time."""
+    cache = payload_cache()
+    entry = cache.get(key) if cache else None
+    if entry is None:
+        return False, None
+    if entry.get("rejected"):
+        return True, None
+    return True, {"source": source, "sourceId": sha1(url)[:32], **entry}
+
+def remember_payload(key: str, payload: Optional[Dict[str, Any]]):
+    cache = payload_cache()
+    if not cache:
+        return
+    if payload is None:
+        cache.put(key, {"rejected": True})
+    else:
+        cache.put(key, {k: v for k, v in payload.items() if k not in ("source", "sourceId")})
+
+def extract_page_payload(source: str, url: str, rules: Dict[str, Any], default_currency: str,
+                         attach_page_content: bool = False) -> Optional[Dict[str, Any]]:
+    """Fetch a page once, then apply rules + to_payload unless the body is already cached."""
+    resp = fetch(url, probe=True)
+    if not resp:
+        return None
+    raw = resp.text or ""
+    key = payload_cache_key(raw, url, rules, default_currency, attach_page_content)
+    hit, payload = cached_payload(key, source, url)
+    if hit:
+        log("debug", "Payload cache hit", url=url, rejected=payload is None)
+        return payload
+
+    fields = apply_rules(url, rules, raw=raw)
+    title = fields.get("title","")
+    desc  = fields.get("description","")
+    if not (title and desc) or not looks_like_grant_page(url, title, desc):
+        remember_payload(key, None)
+        return None
+
+    payload = to_payload(
+        source=source,
+        url=url,
+        title=title,
+        description=desc,
+        eligibility=fields.get("eligibility","") or "See source page.",
+        default_currency=default_currency,
+        deadline_hint=fields.get("deadline",""),
+        amount_hint=fields.get("amount",""),
+        page_content=raw if attach_page_content else None,
+    )
+    remember_payload(key, payload)
+    return payload
+
 # ----------------- LOAD SOURCES -----------------
 def load_sources() -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
     path = os.path.join(os.path.dirname(__file__), "sources.yml")
@@ -642,6 +910,7 @@ def load_sources() -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
 
 # ----------------- COLLECTORS -----------------
 def collect_rss(feed_name: str, url: str, limit: int, default_currency: str) -> List[Dict[str, Any]]:
+    import feedparser
     log("info", "RSS fetch", feed=feed_name, url=url)
     parsed = feedparser.parse(url)
     items = []
@@ -672,7 +941,11 @@ def collect_rss(feed_name: str, url: str, limit: int, default_currency: str) ->
             except Exception as e:
                 log("debug", "Failed to fetch page content", url=link, error=str(e))
 
-            payload = to_payload(feed_name, link, title, desc, "See source page.", default_currency, page_content=page_content)
+            key = payload_cache_key(page_content, link, {"title": title, "description": desc}, default_currency)
+            hit, payload = cached_payload(key, feed_name, link)
+            if not hit:
+                payload = to_payload(feed_name, link, title, desc, "See source page.", default_currency, page_content=page_content)
+                remember_payload(key, payload)
             items.append(payload)
         except Exception as e:
             log("warn", "RSS entry parse error", error=str(e))
@@ -680,6 +953,7 @@ def collect_rss(feed_name: str, url: str, limit: int, default_currency: str) ->
     return items
 
 def collect_autorss(feed_name: str, homepage: str, limit: int, default_currency: str) -> List[Dict[str, Any]]:
+    import feedfinder2
     log("info", "Auto-discovering feeds", url=homepage)
     feeds = feedfinder2.findFeeds(homepage)[:5]
     out = []
@@ -688,6 +962,7 @@ def collect_autorss(feed_name: str, homepage: str, limit: int, default_currency:
     return out[:limit]
 
 def collect_sitemap_urls(name: str, url: str, include: List[str], limit: int) -> List[str]:
+    from bs4 import BeautifulSoup
     resp = fetch(url)
     if not resp: return []
     soup = BeautifulSoup(resp.text, "xml")
@@ -708,10 +983,13 @@ def crawl_html(seed_urls: List[str],
                max_pages: int,
                per_page_delay_ms: int,
                fanout_depth: int = FANOUT_DEPTH) -> List[str]:
+    from bs4 import BeautifulSoup
     seen: Set[str] = set()
+    seeds = set(seed_urls)
     queue: List[Tuple[str,int]] = [(u, 0) for u in dict.fromkeys(seed_urls)]
     out: List[str] = []
     distinct_hosts: Set[str] = set()
+    skipped = 0
 
     # robots from first seed host (best effort)
     robots_txt = None
@@ -734,7 +1012,8 @@ def crawl_html(seed_urls: List[str],
             log("debug", "Blocked by robots.txt", url=url)
             continue
 
-        resp = fetch(url)
+        # discovered pages are probed; seeds are always read in full for their links
+        resp = fetch(url, probe=url not in seeds)
         if not resp:
             continue
 
@@ -766,6 +1045,18 @@ def crawl_html(seed_urls: List[str],
                     continue
                 if exclude_patterns and any(pat.lower() in next_url.lower() for pat in exclude_patterns):
                     continue
+                if next_url in seen:
+                    continue
+
+                # score the link before it can cost a fetch (seeds are always fetched)
+                bump("links_seen")
+                parent = a.parent
+                context = parent.get_text(" ", strip=True)[:LINK_CONTEXT_CHARS] if parent is not None else ""
+                if not link_allowed(next_url, a.get_text(" ", strip=True), context):
+                    skipped += 1
+                    bump("links_skipped")
+                    log("debug", "Link skipped", url=next_url)
+                    continue
 
                 if next_url not in seen and (len(queue) + len(out)) < max_pages * 3:
                     queue.append((next_url, depth + (0 if same_host_only else 1)))
@@ -774,11 +1065,12 @@ def crawl_html(seed_urls: List[str],
 
         sleep_ms(per_page_delay_ms or REQUEST_DELAY_MS)
 
-    log("info", "Crawl completed", pages=len(out), hosts=len(distinct_hosts))
+    log("info", "Crawl completed", pages=len(out), hosts=len(distinct_hosts), links_skipped=skipped)
     return out
 
-def apply_rules(page_url: str, rules: Dict[str, Any]) -> Dict[str, str]:
-    root = download_and_readable(page_url)
+def apply_rules(page_url: str, rules: Dict[str, Any], raw: Optional[str] = None) -> Dict[str, str]:
+    # Callers that already hold the page body pass it in to avoid a second fetch
+    root = download_and_readable(page_url) if raw is None else readable_root(raw)
     if root is None:
         return {"title":"","description":"","deadline":"","amount":"","eligibility":""}
 
@@ -850,23 +1142,9 @@ def collect_html(name: str, cfg: Dict[str, Any], default_currency: str) -> List[
     limit = int(cfg.get("limit", BATCH_LIMIT))
     for p in pages[:limit]:
         try:
-            fields = apply_rules(p, rules)
-            title = fields.get("title","")
-            desc  = fields.get("description","")
-            if not (title and desc): continue
-            if not looks_like_grant_page(p, title, desc): continue
-
-            payload = to_payload(
-                source=name,
-                url=p,
-                title=title,
-                description=desc,
-                eligibility=fields.get("eligibility","") or "See source page.",
-                default_currency=default_currency,
-                deadline_hint=fields.get("deadline",""),
-                amount_hint=fields.get("amount",""),
-            )
-            items.append(payload)
+            payload = extract_page_payload(name, p, rules, default_currency)
+            if payload:
+                items.append(payload)
         except Exception as e:
             log("warn", "HTML extract error", url=p, error=str(e))
     log("info", "HTML items", feed=name, count=len(items))
@@ -974,6 +1252,8 @@ def collect_search(name: str, cfg: Dict[str, Any], default_currency: str) -> Lis
     max_results = int(cfg.get("max_results_per_query", 25))
     rules = cfg.get("rules", {}) or {}
     seeds = search_web(queries, max_results)
+    # search hits have no anchor text yet; only the URL path can rule them out
+    seeds = [u for u in seeds if not link_blocked(u)]
 
     items: List[Dict[str, Any]] = []
     limit = int(cfg.get("limit", BATCH_LIMIT))
@@ -993,23 +1273,9 @@ def collect_search(name: str, cfg: Dict[str, Any], default_currency: str) -> Lis
         for p in host_pages:
             if len(items) >= limit: break
             try:
-                fields = apply_rules(p, rules)
-                title = fields.get("title","")
-                desc  = fields.get("description","")
-                if not (title and desc): continue
-                if not looks_like_grant_page(p, title, desc): continue
-
-                payload = to_payload(
-                    source=name,
-                    url=p,
-                    title=title,
-                    description=desc,
-                    eligibility=fields.get("eligibility","") or "See source page.",
-                    default_currency=default_currency,
-                    deadline_hint=fields.get("deadline",""),
-                    amount_hint=fields.get("amount",""),
-                )
-                items.append(payload)
+                payload = extract_page_payload(name, p, rules, default_currency)
+                if payload:
+                    items.append(payload)
             except Exception as e:
                 log("warn", "Search extract error", url=p, error=str(e))
 
@@ -1017,87 +1283,330 @@ def collect_search(name: str, cfg: Dict[str, Any], default_currency: str) -> Lis
     return items
 
 
+_INGEST_CLIENT: Optional[BulkIngestClient] = None
+
+def ingest_client() -> BulkIngestClient:
+    global _INGEST_CLIENT
+    if not BACKEND_INTERNAL_URL:
+        hard_fail("Missing BACKEND_INTERNAL_URL")
+    if _INGEST_CLIENT is None:
+        _INGEST_CLIENT = BulkIngestClient(BACKEND_INTERNAL_URL, INTERNAL_API_TOKEN,
+                                          batch_size=INGEST_BATCH_SIZE, timeout_sec=max(TIMEOUT_SEC, 60),
+                                          compress=INGEST_GZIP, concurrency=INGEST_CONCURRENCY,
+                                          max_concurrency=INGEST_MAX_CONCURRENCY)
+    return _INGEST_CLIENT
+
+_OUTBOX: Optional[Outbox] = None
+
+def outbox() -> Optional[Outbox]:
+    global _OUTBOX
+    if not OUTBOX_ENABLED or DRY_RUN:
+        return None
+    if _OUTBOX is None:
+        try:
+            _OUTBOX = Outbox(STATE_DB, max_attempts=OUTBOX_MAX_ATTEMPTS)
+        except Exception as e:
+            log("warn", "Outbox unavailable", error=str(e), path=STATE_DB)
+            return None
+    return _OUTBOX
+
+_LEDGER: Optional[Ledger] = None
+
+def ingest_ledger() -> Optional[Ledger]:
+    global _LEDGER
+    if not LEDGER_ENABLED or DRY_RUN:
+        return None
+    if _LEDGER is None:
+        try:
+            _LEDGER = Ledger(STATE_DB)
+        except Exception as e:
+            log("warn", "Ingest ledger unavailable", error=str(e), path=STATE_DB)
+            return None
+    return _LEDGER
+
+_FINGERPRINTS: Optional[FingerprintStore] = None
+
+def fingerprint_store() -> Optional[FingerprintStore]:
+    global _FINGERPRINTS
+    if not FINGERPRINTS_ENABLED:
+        return None
+    if _FINGERPRINTS is None:
+        try:
+            _FINGERPRINTS = FingerprintStore(STATE_DB, max_distance=SIMHASH_MAX_DISTANCE)
+        except Exception as e:
+            log("warn", "Fingerprint store unavailable", error=str(e), path=STATE_DB)
+            return None
+    return _FINGERPRINTS
+
+def rebuild_fingerprints():
+    """Refill the fingerprint store from every grant currently in the backend."""
+    store = fingerprint_store()
+    if store is None:
+        log("warn", "Fingerprints disabled; nothing to rebuild")
+        return
+    started = time.perf_counter()
+    n = store.rebuild(grant for grant, _ in iter_grants(include="description"))
+    log("info", "Fingerprints rebuilt", grants=n, seconds=round(time.perf_counter() - started, 1), path=STATE_DB)
+    store.close()
+
+def drop_known_duplicates(items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Drop payloads whose fingerprint matches another grant in the corpus. Runs before
+    enrichment, so no AI call is spent on them; the rest stay reserved in the store
+    until deliver() confirms or releases them.
+    """
+    store = fingerprint_store()
+    if store is None:
+        return items
+    kept = []
+    for payload in items:
+        other = store.reserve(payload)
+        if other is None:
+            kept.append(payload)
+        else:
+            log("debug", "Duplicate of existing grant", title=payload.get("title", "")[:140],
+                url=payload.get("url", ""), existing=other)
+    if len(kept) < len(items):
+        bump("grants_duplicate", len(items) - len(kept))
+        log("info", "Dropped duplicates of existing grants", count=len(items) - len(kept))
+    return kept
+
+def full_sync() -> bool:
+    return FULL_SYNC or "--full-sync" in sys.argv
+
+def deliver(items: List[Dict[str, Any]], ids: Optional[List[int]] = None) -> List[Dict[str, Any]]:
+    """
+    Post payloads through the bulk client with an outbox record for each: rows are
+    written before the request and marked delivered or rescheduled after it. `ids`
+    are existing outbox rows for the same payloads (when draining).
+    """
+    box = outbox()
+    if box and ids is None:
+        ids = box.add_many(items)
+    results = ingest_client().post_many(items)
+    ledger = ingest_ledger()
+    if ledger:
+        ledger.record([p for p, r in zip(items, results) if r.get("ok")])
+    # Fingerprints are stored only once the backend has the grant
+    store = fingerprint_store()
+    if store:
+        store.confirm([p for p, r in zip(items, results) if r.get("ok")])
+        store.release([p for p, r in zip(items, results) if not r.get("ok")])
+    if box and ids:
+        box.mark_delivered([i for i, r in zip(ids, results) if r.get("ok")])
+        box.mark_failed([(i, r.get("error") or "") for i, r in zip(ids, results) if not r.get("ok")])
+    return results
+
+def drain_outbox(due_only: bool = True) -> int:
+    """Re-post undelivered outbox payloads (only those whose retry time has come unless due_only=False)."""
+    box = outbox()
+    if box is None:
+        return 0
+    rows = box.pending(due_only=due_only)
+    if not rows:
+        return 0
+    results = deliver([p for _, p in rows], ids=[i for i, _ in rows])
+    delivered = sum(1 for r in results if r.get("ok"))
+    bump("outbox_redelivered", delivered)
+    log("info", "Outbox drained", attempted=len(rows), delivered=delivered, outbox=box.stats())
+    return delivered
+
 def post_items(items: List[Dict[str, Any]]) -> int:
+    if not items:
+        return 0
+    if DRY_RUN:
+        log("info", "DRY_RUN on, skipping POST", count=len(items))
+        return len(items)
+    ledger = ingest_ledger()
+    if ledger and not full_sync():
+        fresh = ledger.changed(items, max_age_sec=FULL_SYNC_DAYS * 86400 or None)
+        unchanged = len(items) - sum(fresh)
+        bump("grants_unchanged", unchanged)
+        if unchanged and fingerprint_store():
+            # delivered by an earlier run
+            fingerprint_store().confirm([p for p, f in zip(items, fresh) if not f])
+        items = [p for p, f in zip(items, fresh) if f]
+        if unchanged:
+            log("info", "Skipping unchanged grants", count=unchanged)
+        if not items:
+            return 0
+    results = deliver(items)
     posted = 0
-    for payload in items:
-        try:
-            res = post_grant(payload)
+    for payload, res in zip(items, results):
+        if res.get("ok"):
             posted += 1
-            log("info", "Posted grant", title=payload["title"][:140], id_hint=res.get("id"))
-            sleep_ms(400)  # be polite to downstream
-        except Exception as e:
-            # Unwrap Tenacity to surface the real error text/status
-            err_txt = str(e)
-            try:
-                if isinstance(e, RetryError) and e.last_attempt:
-                    inner = e.last_attempt.exception()
-                    if inner:
-                        err_txt = f"{type(inner).__name__}: {inner}"
-            except Exception:
-                pass
-            log("error", "Post failed", title=payload.get("title",""), error=err_txt, url=payload.get("url",""))
+            log("debug", "Posted grant", title=payload["title"][:140], id_hint=res.get("id"))
+        else:
+            log("error", "Post failed", title=payload.get("title",""), error=res.get("error"), url=payload.get("url",""))
+    bump("grants_posted", posted)
+    log("info", "Posted grants", posted=posted, failed=len(items) - posted,
+        deferred=len(items) - posted if outbox() else 0, bulk=ingest_client().bulk_supported)
     return posted
 
 # ----------------- MAIN -----------------
+def iter_grants(page_size: int = VALIDATE_PAGE_SIZE, include: str = ""):
+    """
+    Yield (grant, total) for every grant in the backend, one keyset page at a time, so
+    memory stays flat however large the table gets. Grants carry id, source, sourceId,
+    url and title (plus `include` fields); total comes from the first page.
+    """
+    url = f"{BACKEND_INTERNAL_URL.replace('/api/internal/grants', '')}/api/internal/grants"
+    headers = {"Authorization": f"Bearer {INTERNAL_API_TOKEN}", "x-internal-token": INTERNAL_API_TOKEN or ""}
+    after = None
+    total = None
+    while True:
+        params = {"limit": page_size}
+        if include:
+            params["include"] = include
+        if after:
+            params["after"] = after
+        r = SESSION.get(url, headers=headers, params=params, timeout=TIMEOUT_SEC)
+        if r.status_code != 200:
+            raise RuntimeError(f"grant list failed {r.status_code}: {r.text[:200]}")
+        page = r.json()
+        if total is None:
+            total = page.get("total")
+        for grant in page.get("grants") or []:
+            yield grant, total
+        after = page.get("nextCursor")
+        if not after:
+            return
+
+def validate_batch(batch: List[str]) -> Dict[str, Any]:
+    r = SESSION.post(
+        f"{BACKEND_INTERNAL_URL.replace('/api/internal/grants', '')}/api/internal/grants/validate",
+        headers={"Authorization": f"Bearer {INTERNAL_API_TOKEN}", "x-internal-token": INTERNAL_API_TOKEN or ""},
+        json={"grantIds": batch},
+        timeout=VALIDATE_TIMEOUT_SEC,
+    )
+    if r.status_code != 200:
+        raise RuntimeError(f"validate failed {r.status_code}: {r.text[:200]}")
+    return r.json()
+
 def validate_existing_grants():
-    """Validate existing grants in the database"""
+    """
+    Validate existing grants in the database: ids are streamed page by page and
+    validated in batches on a bounded worker pool, with progress and ETA logged.
+    """
+    from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
     log("info", "Starting grant validation...")
-    
-    try:
-        # Get all grant IDs from the database
-        response = requests.get(
-            f"{BACKEND_INTERNAL_URL.replace('/api/internal/grants', '')}/api/internal/grants",
-            headers={"Authorization": f"Bearer {INTERNAL_API_TOKEN}"},
-            timeout=30
-        )
-        
-        if response.status_code != 200:
-            log("error", "Failed to fetch grants for validation", status=response.status_code)
-            return
-        
-        grants_data = response.json()
-        if not grants_data.get('ok') or not grants_data.get('grants'):
-            log("warn", "No grants found for validation")
-            return
-        
-        grants = grants_data['grants']
-        grant_ids = [grant['id'] for grant in grants if grant.get('id')]
-        
-        if not grant_ids:
-            log("warn", "No grant IDs found for validation")
+    started = time.perf_counter()
+    done = valid = invalid = failed_batches = 0
+    total = None
+    last_progress = started
+
+    def collect(finished):
+        nonlocal done, valid, invalid, failed_batches
+        for fut in finished:
+            size = pending.pop(fut)
+            done += size
+            try:
+                result = fut.result()
+                valid += result.get("valid", 0)
+                invalid += result.get("invalid", 0)
+            except Exception as e:
+                failed_batches += 1
+                log("error", "Validation batch failed", size=size, error=str(e))
+
+    def progress(force: bool = False):
+        nonlocal last_progress
+        now = time.perf_counter()
+        if not force and now - last_progress < VALIDATE_PROGRESS_SEC:
             return
-        
-        log("info", f"Validating {len(grant_ids)} grants...")
-        
-        # Validate grants in batches
-        batch_size = 50
-        for i in range(0, len(grant_ids), batch_size):
-            batch = grant_ids[i:i + batch_size]
-            
-            validation_response = requests.post(
-                f"{BACKEND_INTERNAL_URL.replace('/api/internal/grants', '')}/api/internal/grants/validate",
-                headers={"Authorization": f"Bearer {INTERNAL_API_TOKEN}"},
-                json={"grantIds": batch},
-                timeout=60
-            )
-            
-            if validation_response.status_code == 200:
-                result = validation_response.json()
-                log("info", f"Batch {i//batch_size + 1}: {result.get('valid', 0)} valid, {result.get('invalid', 0)} invalid")
-            else:
-                log("error", f"Validation failed for batch {i//batch_size + 1}", status=validation_response.status_code)
-            
-            # Small delay between batches
-            time.sleep(1)
-        
-        log("info", "Grant validation completed")
-        
+        last_progress = now
+        rate = done / (now - started) if now > started else 0.0
+        eta = round((total - done) / rate) if total and rate else None
+        log("info", "Validation progress", done=done, total=total, valid=valid, invalid=invalid,
+            grants_per_sec=round(rate, 1), eta_sec=eta)
+
+    pending: Dict[Any, int] = {}
+    try:
+        with ThreadPoolExecutor(max_workers=VALIDATE_WORKERS) as pool:
+            batch: List[str] = []
+            for grant, total in iter_grants():
+                if not grant.get("id"):
+                    continue
+                batch.append(grant["id"])
+                if len(batch) < VALIDATE_BATCH_SIZE:
+                    continue
+                # Bounded queue: never more than two batches per worker outstanding
+                while len(pending) >= VALIDATE_WORKERS * 2:
+                    finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    collect(finished)
+                    progress()
+                pending[pool.submit(validate_batch, batch)] = len(batch)
+                batch = []
+            if batch:
+                pending[pool.submit(validate_batch, batch)] = len(batch)
+            while pending:
+                finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                collect(finished)
+                progress()
     except Exception as e:
-        log("error", "Grant validation failed", error=str(e))
+        log("error", "Grant validation failed", error=str(e), done=done)
+        return
+
+    progress(force=True)
+    log("info", "Grant validation completed", validated=done, valid=valid, invalid=invalid,
+        failed_batches=failed_batches, seconds=round(time.perf_counter() - started, 1))
+
+# Lazily imported dependencies, grouped by the feed type / stage that first needs them
+LAZY_IMPORTS = {
+    "rss": ["feedparser"],
+    "autorss": ["feedfinder2"],
+    "sitemap": ["bs4", "lxml.html", "readability"],
+    "html": ["bs4", "lxml.html", "readability"],
+    "search": ["bs4", "lxml.html", "readability"],
+    "deadlines": ["dateparser"],
+    "ai": ["openai", "httpx"],
+    "summary": ["numpy"],
+}
+
+def startup_profile():
+    """Report import cost of scraper.py itself and of each lazily loaded dependency."""
+    log("info", "startup_profile.module", module="scraper", ms=round(_IMPORT_MS, 1))
+    seen: Set[str] = set()
+    for group, modules in LAZY_IMPORTS.items():
+        for mod in modules:
+            if mod in seen: continue
+            seen.add(mod)
+            preloaded = mod in sys.modules
+            t0 = time.perf_counter()
+            importlib.import_module(mod)
+            # Incremental: shared transitive imports are charged to the first module that pulls them in
+            log("info", "startup_profile.import", group=group, module=mod,
+                ms=round((time.perf_counter() - t0) * 1000, 1), preloaded=preloaded)
+    # dateparser loads its language data on the first parse, not on import
+    t0 = time.perf_counter()
+    parse_deadline("", hint="January 1, 2030")
+    log("info", "startup_profile.import", group="deadlines", module="dateparser (language data)",
+        ms=round((time.perf_counter() - t0) * 1000, 1), preloaded=False)
 
 def main():
+    if "--startup-profile" in sys.argv:
+        startup_profile()
+        return
+
+    if "--invalidate-ai-cache" in sys.argv:
+        invalidate_ai_cache()
+        return
+
     auth_sanity_check()
     total_posted = 0
+
+    if "--rebuild-fingerprints" in sys.argv:
+        rebuild_fingerprints()
+        return
+
+    if "--drain-outbox" in sys.argv:
+        drain_outbox(due_only=False)
+        return
+
+    if "--enrich" in sys.argv:
+        i = sys.argv.index("--results") if "--results" in sys.argv else -1
+        run_enrich(sys.argv[i + 1] if 0 <= i < len(sys.argv) - 1 else None)
+        return
     
     # Check if this is a validation-only run
     if "--validate-existing" in sys.argv:
@@ -1110,6 +1619,9 @@ def main():
             hard_fail("No feeds defined in sources.yml")
         default_currency = (defaults.get("currency") if isinstance(defaults, dict) else None) or "USD"
 
+        # Payloads left undelivered by earlier runs go first
+        total_posted += drain_outbox()
+
         for f in feeds:
             name = f.get("name") or f.get("source") or "unknown"
             typ  = (f.get("type") or "rss").lower()
@@ -1124,31 +1636,10 @@ def main():
                     rules = f.get("rules", {"title":{"css":"h1, h2"}, "description":{"css":"main, article, .content"}})
                     items = []
                     for p in urls[:limit]:
-                        fields = apply_rules(p, rules)
-                        title = fields.get("title","")
-                        desc  = fields.get("description","")
-                        if not (title and desc): continue
-                        if not looks_like_grant_page(p, title, desc): continue
-                        
-                        # Get page content for better URL extraction and AI processing
-                        page_content = ""
-                        try:
-                            page_resp = fetch(p)
-                            if page_resp and page_resp.text:
-                                page_content = page_resp.text
-                        except Exception as e:
-                            log("debug", "Failed to fetch page content", url=p, error=str(e))
-                        
-                        payload = to_payload(
-                            source=name, url=p,
-                            title=title, description=desc,
-                            eligibility=fields.get("eligibility","") or "See source page.",
-                            default_currency=default_currency,
-                            deadline_hint=fields.get("deadline",""),
-                            amount_hint=fields.get("amount",""),
-                            page_content=page_content,
-                        )
-                        items.append(payload)
+                        # Page content is reused for better URL extraction and AI processing
+                        payload = extract_page_payload(name, p, rules, default_currency, attach_page_content=True)
+                        if payload:
+                            items.append(payload)
                 elif typ == "html":
                     items = collect_html(name, f, default_currency)
                 elif typ == "search":
@@ -1157,13 +1648,43 @@ def main():
                     log("warn", "Unknown type; skipping", type=typ, feed=name)
                     continue
 
+                bump("grants_accepted", len(items))
+                items = drop_known_duplicates(items)
+                enrich_items(items)
                 total_posted += post_items(items)
             except KeyError as ke:
                 log("error", "Feed config missing key", feed=name, missing=str(ke))
             except Exception as e:
                 log("error", "Feed processing error", feed=name, error=str(e))
 
-        log("info", "Scraper completed", posted=total_posted, dryRun=DRY_RUN)
+        # Retry this run's failures whose backoff has already passed; the rest wait for the next run
+        total_posted += drain_outbox()
+        box = outbox()
+        if box:
+            box.purge_delivered(OUTBOX_RETENTION_DAYS * 86400)
+
+        cache = payload_cache()
+        log("info", "Scraper completed", posted=total_posted, dryRun=DRY_RUN,
+            skipped_unchanged=STATS["grants_unchanged"], full_sync=full_sync(),
+            duplicates=STATS["grants_duplicate"],
+            fingerprints=fingerprint_store().stats() if fingerprint_store() else None,
+            payload_cache=cache.stats() if cache else None, stats=run_stats(),
+            ai=ai_client().stats if ai_client() else None,
+            ai_cache=ai_client().cache_stats() if ai_client() else None,
+            ai_gate=ai_client().gate_stats() if ai_client() else None,
+            ingest=_INGEST_CLIENT.stats if _INGEST_CLIENT else None,
+            ingest_concurrency=_INGEST_CLIENT.concurrency_stats() if _INGEST_CLIENT else None,
+            outbox=box.stats() if box else None)
+        if cache:
+            cache.close()
+        if box:
+            box.close()
+        if ingest_ledger():
+            ingest_ledger().close()
+        if fingerprint_store():
+            fingerprint_store().close()
+        if ai_cache():
+            ai_cache().close()
         
         # After scraping, validate a sample of existing grants
         if not DRY_RUN:
@@ -1174,5 +1695,7 @@ def main():
         log("error", "Fatal crash", error=str(e), tb=traceback.format_exc())
         sys.exit(1)
 
+_IMPORT_MS = (time.perf_counter() - _IMPORT_T0) * 1000
+
 if __name__ == "__main__":
     main()
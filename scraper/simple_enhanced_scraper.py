@@ -348,41 +348,45 @@ def calculate_confidence_score(title: str, description: str, deadline: Optional[
     
     return min(score, 100.0)
 
+# Titles sharing one candidate word and length bucket beyond this are not paired on that
+# word: it is a near-stopword there, and pairing them would be quadratic
+SIMPLE_DUP_MAX_BUCKET = 200
+
 def simple_duplicate_detection(grants: List[GrantData], threshold: float = 0.8) -> List[List[int]]:
-    """Simple duplicate detection using basic string similarity"""
-    duplicates = []
-    processed = set()
-    
-    for i, grant1 in enumerate(grants):
-        if i in processed:
+    """Simple duplicate detection using basic string similarity, on candidate pairs from a word index"""
+    from collections import Counter
+    from itertools import combinations
+    from dedup import group_duplicates
+
+    titles = [grant.title.lower().strip() for grant in grants]
+    words = [set(title.split()) for title in titles]
+
+    # Candidates (prefix filter): a match needs 3 common words and lengths less than 5
+    # apart. Two titles sharing 3 words share the rarest of them, which is among the
+    # len(words) - 2 rarest words of each, so every title is indexed on those words in
+    # its length bucket and paired with the same and the next bucket.
+    freq = Counter(w for ws in words for w in ws)
+    buckets = defaultdict(list)
+    for i, (title, ws) in enumerate(zip(titles, words)):
+        for word in sorted(ws, key=lambda w: (freq[w], w))[:len(ws) - 2]:
+            buckets[word, len(title) // 5].append(i)
+    pairs = set()
+    for (word, size), members in buckets.items():
+        neighbours = buckets.get((word, size + 1), ())
+        if len(members) + len(neighbours) > SIMPLE_DUP_MAX_BUCKET:
             continue
-        
-        duplicate_group = [i]
-        
-        for j, grant2 in enumerate(grants[i+1:], i+1):
-            if j in processed:
-                continue
-            
-            # Simple similarity check using basic string operations
-            title1 = grant1.title.lower().strip()
-            title2 = grant2.title.lower().strip()
-            
-            # Check for exact matches or very similar titles
-            if title1 == title2 or abs(len(title1) - len(title2)) < 5:
-                # Check if they share significant words
-                words1 = set(title1.split())
-                words2 = set(title2.split())
-                common_words = words1.intersection(words2)
-                
-                if len(common_words) >= 3:  # At least 3 common words
-                    duplicate_group.append(j)
-                    processed.add(j)
-        
-        if len(duplicate_group) > 1:
-            duplicates.append(duplicate_group)
-            processed.update(duplicate_group)
-    
-    return duplicates
+        pairs.update(combinations(members, 2))
+        pairs.update((min(i, j), max(i, j)) for i in members for j in neighbours)
+
+    def similar(i: int, j: int) -> bool:
+        title1, title2 = titles[i], titles[j]
+        # Check for exact matches or very similar titles
+        if title1 == title2 or abs(len(title1) - len(title2)) < 5:
+            # Check if they share significant words
+            return len(words[i] & words[j]) >= 3  # At least 3 common words
+        return False
+
+    return group_duplicates(len(grants), pairs, similar)
 
 def enhance_grant_data(grant: GrantData) -> GrantData:
     """Enhance grant data with additional processing"""
@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the external APIs the scraper talks to, for offline runs
+and benchmarks.
+
+    python3 stub_server.py [--port 8787] [--latency-ms 300] [--rate-limit-every 0] [--capacity 0]
+    python3 stub_server.py --batch-input ai_batch.jsonl --batch-output results.jsonl
+
+Routes:
+    POST /v1/chat/completions   OpenAI-compatible; replies with a JSON
+                                {"title", "summary"} built from the prompt
+    POST /api/internal/grants   single upsert on (source, sourceId), kept in memory
+    POST /api/internal/grants/bulk
+                                {"grants": [...]} (gzip accepted), per-item results
+    GET  /api/internal/grants   keyset pages of stored grants (?after=<id>&limit=N)
+    POST /api/internal/grants/validate
+                                {"grantIds": [...]}; grants with a URL count as valid
+
+Point the scraper at it with OPENAI_BASE_URL=http://127.0.0.1:8787/v1 and
+any OPENAI_API_KEY, and BACKEND_INTERNAL_URL=http://127.0.0.1:8787/api/internal/grants
+for ingest. --rate-limit-every N answers every Nth request with a
+429 and a retry-after-ms header, to exercise client backoff; --capacity N
+answers ingest requests beyond N in flight with a 429, to exercise the
+poster's adaptive concurrency.
+
+With --batch-input/--batch-output no server is started: each request in an
+OpenAI Batch API input file is answered offline and written to a results
+file in the Batch API output format (for `scraper.py --enrich --results`).
+"""
+
+import argparse
+import gzip
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional
+from urllib.parse import parse_qs, urlparse
+
+
+def _field(prompt: str, label: str) -> str:
+    m = re.search(rf"{label}:\s*(.*)", prompt)
+    return m.group(1).strip() if m else ""
+
+
+def fake_completion(body: Dict[str, Any]) -> Dict[str, Any]:
+    prompt = "\n".join(m.get("content") or "" for m in body.get("messages") or [])
+    title = _field(prompt, "Grant Title") or "Grant opportunity"
+    description = _field(prompt, "Description")
+    summary = " ".join(re.split(r"(?<=[.!?])\s+", description)[:2])[:400] or f"Funding opportunity: {title}."
+    content = json.dumps({"title": f"{title} (stub)"[:80], "summary": summary})
+    prompt_tokens = len(prompt) // 4
+    completion_tokens = len(content) // 4
+    return {
+        "id": f"chatcmpl-stub-{int(time.time() * 1000)}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": body.get("model") or "stub",
+        "choices": [{
+            "index": 0,
+            "message": {"role": "assistant", "content": content},
+            "finish_reason": "stop",
+        }],
+        "usage": {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        },
+    }
+
+
+def answer_batch(input_path: str, output_path: str) -> int:
+    n = 0
+    with open(input_path, "r", encoding="utf-8") as src, open(output_path, "w", encoding="utf-8") as out:
+        for line in src:
+            if not line.strip():
+                continue
+            req = json.loads(line)
+            out.write(json.dumps({
+                "id": f"batch_req_stub_{n}",
+                "custom_id": req["custom_id"],
+                "response": {"status_code": 200, "request_id": f"stub-{n}", "body": fake_completion(req.get("body") or {})},
+                "error": None,
+            }) + "\n")
+            n += 1
+    return n
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    server_version = "GrantFinderStub/1.0"
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, fmt, *args):
+        if self.server.verbose:
+            super().log_message(fmt, *args)
+
+    def _send(self, status: int, payload: Any, headers: Optional[Dict[str, str]] = None):
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _body(self) -> Any:
+        length = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(length) if length else b""
+        if raw and (self.headers.get("Content-Encoding") or "").lower() == "gzip":
+            raw = gzip.decompress(raw)
+        return json.loads(raw or b"{}")
+
+    def _upsert(self, grant: Any) -> Dict[str, Any]:
+        srv = self.server
+        if not isinstance(grant, dict) or not grant.get("title") or not grant.get("source"):
+            return {"ok": False, "error": "Missing required fields: title, source"}
+        key = (grant["source"], str(grant.get("sourceId") or grant.get("url") or "unknown"))
+        with srv.lock:
+            rec = srv.grants.get(key)
+            if rec is None:
+                rec = srv.grants[key] = {"id": f"stub-{len(srv.grants) + 1:09d}"}
+            rec.update({"source": key[0], "sourceId": key[1], "url": grant.get("url"), "title": grant["title"],
+                        "description": grant.get("description") or ""})
+        return {"ok": True, "id": rec["id"]}
+
+    def do_GET(self):
+        srv = self.server
+        url = urlparse(self.path)
+        if url.path.rstrip("/").endswith("/internal/grants"):
+            q = parse_qs(url.query)
+            after = (q.get("after") or [""])[0]
+            limit = min(max(int((q.get("limit") or ["500"])[0]), 1), 5000)
+            with srv.lock:
+                rows = sorted((dict(r) for r in srv.grants.values()), key=lambda r: r["id"])
+            page = [r for r in rows if r["id"] > after][:limit]
+            if "description" not in (q.get("include") or [""])[0].split(","):
+                page = [{k: v for k, v in r.items() if k != "description"} for r in page]
+            body = {"ok": True, "grants": page, "nextCursor": page[-1]["id"] if len(page) == limit else None}
+            if not after:
+                body["total"] = len(rows)
+            self._send(200, body)
+            return
+        self._send(404, {"error": f"no stub route for {self.path}"})
+
+    def do_POST(self):
+        srv = self.server
+        with srv.lock:
+            srv.requests += 1
+            n = srv.requests
+        path = self.path.split("?", 1)[0].rstrip("/")
+        if "/internal/grants" in path:
+            with srv.lock:
+                srv.in_flight += 1
+                over = srv.capacity and srv.in_flight > srv.capacity
+            try:
+                if srv.latency_ms:
+                    time.sleep(srv.latency_ms / 1000.0)
+                if over:
+                    self._body()
+                    self._send(429, {"error": "Too many concurrent requests (stub)"}, {"Retry-After": "0"})
+                    return
+                self._internal(path)
+            finally:
+                with srv.lock:
+                    srv.in_flight -= 1
+            return
+        if srv.latency_ms:
+            time.sleep(srv.latency_ms / 1000.0)
+        if path.endswith("/chat/completions"):
+            body = self._body()
+            if srv.rate_limit_every and n % srv.rate_limit_every == 0:
+                self._send(429, {"error": {"message": "Rate limit reached (stub)", "type": "requests"}},
+                           {"retry-after-ms": "100"})
+                return
+            self._send(200, fake_completion(body))
+            return
+        length = int(self.headers.get("Content-Length") or 0)
+        self.rfile.read(length)  # drain so the keep-alive connection stays usable
+        self._send(404, {"error": f"no stub route for {self.path}"})
+
+    def _internal(self, path: str):
+        srv = self.server
+        if path.endswith("/internal/grants/validate"):
+            ids = self._body().get("grantIds") or []
+            with srv.lock:
+                urls = {r["id"]: r.get("url") for r in srv.grants.values()}
+            results = [{"id": i, "valid": bool(urls.get(i)), "reason": "URL accessible" if urls.get(i) else "No URL"}
+                       for i in ids if i in urls]
+            valid = sum(1 for r in results if r["valid"])
+            self._send(200, {"ok": True, "total": len(results), "valid": valid,
+                             "invalid": len(results) - valid, "results": results})
+            return
+        if path.endswith("/internal/grants/bulk"):
+            body = self._body()
+            grants = body if isinstance(body, list) else body.get("grants") or []
+            results = [dict(index=i, **self._upsert(g)) for i, g in enumerate(grants)]
+            succeeded = sum(1 for r in results if r["ok"])
+            self._send(200, {"ok": succeeded == len(results), "count": len(results),
+                             "succeeded": succeeded, "failed": len(results) - succeeded, "results": results})
+            return
+        if path.endswith("/internal/grants"):
+            res = self._upsert(self._body())
+            if res["ok"]:
+                self._send(200, {"ok": True, "id": res["id"]})
+            else:
+                self._send(400, {"error": res["error"]})
+            return
+        self._body()
+        self._send(404, {"error": f"no stub route for {self.path}"})
+
+
+def make_server(port: int = 8787, latency_ms: int = 0, rate_limit_every: int = 0,
+                verbose: bool = False, host: str = "127.0.0.1", capacity: int = 0) -> ThreadingHTTPServer:
+    srv = ThreadingHTTPServer((host, port), StubHandler)
+    srv.daemon_threads = True
+    srv.latency_ms = latency_ms
+    srv.rate_limit_every = rate_limit_every
+    srv.verbose = verbose
+    srv.requests = 0
+    srv.grants = {}
+    srv.capacity = capacity
+    srv.in_flight = 0
+    srv.lock = threading.Lock()
+    return srv
+
+
+def serve_in_thread(**kwargs) -> ThreadingHTTPServer:
+    """Start a stub server on a background thread (port 0 picks a free port)."""
+    srv = make_server(**kwargs)
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    return srv
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8787)
+    parser.add_argument("--latency-ms", type=int, default=300)
+    parser.add_argument("--rate-limit-every", type=int, default=0)
+    parser.add_argument("--capacity", type=int, default=0, help="max concurrent ingest requests before 429s (0 = unlimited)")
+    parser.add_argument("--verbose", action="store_true")
+    parser.add_argument("--batch-input", help="answer this batch request file offline instead of serving")
+    parser.add_argument("--batch-output", help="where to write batch results (with --batch-input)")
+    args = parser.parse_args()
+    if args.batch_input:
+        output = args.batch_output or args.batch_input.replace(".jsonl", "") + ".results.jsonl"
+        n = answer_batch(args.batch_input, output)
+        print(json.dumps({"msg": "Stub batch results written", "requests": n, "path": output}), flush=True)
+        return
+    srv = make_server(args.port, args.latency_ms, args.rate_limit_every, args.verbose, capacity=args.capacity)
+    print(json.dumps({"msg": "Stub server listening", "url": f"http://127.0.0.1:{srv.server_address[1]}"}), flush=True)
+    try:
+        srv.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
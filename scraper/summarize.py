@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Local extractive summarizer for grant descriptions.
+
+Sentences are weighted by TF-IDF, linked by cosine similarity and ranked
+with TextRank (power iteration on the similarity graph), with a small bias
+towards the opening sentences. The top 2-3 sentences are returned in their
+original order, so summaries always end on a sentence boundary. All the
+matrix math is vectorized NumPy; a typical description takes a few
+milliseconds on CPU.
+"""
+
+import re
+from typing import List
+
+# Sentence end followed by something that looks like a new sentence
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+(?=[\"'(\[]?[A-Z0-9])")
+_WORD_RE = re.compile(r"[a-z][a-z0-9]+")
+
+STOPWORDS = frozenset("""
+a about above after again all also an and any are as at be because been before being
+below between both but by can could did do does doing during each few for from further
+had has have having he her here hers him his how i if in into is it its itself just
+may me more most must my no nor not now of off on once only or other our ours out over
+own same shall she should so some such than that the their them then there these they
+this those through to too under until up upon very was we were what when where which
+while who whom why will with within would you your
+""".split())
+
+# Sentences beyond this are ignored; descriptions are capped at 5000 chars anyway
+MAX_SENTENCES = 80
+DAMPING = 0.85
+ITERATIONS = 30
+LEAD_BIAS = 0.15
+# Skip a candidate this similar (cosine) to a sentence already picked
+REDUNDANCY = 0.8
+
+
+def split_sentences(text: str) -> List[str]:
+    text = re.sub(r"\s+", " ", text or "").strip()
+    return [s for s in _SENTENCE_RE.split(text) if s] if text else []
+
+
+def _words(sentence: str) -> List[str]:
+    return [w for w in _WORD_RE.findall(sentence.lower()) if w not in STOPWORDS]
+
+
+def rank_sentences(sentences: List[str]):
+    """TextRank score per sentence (numpy array summing to ~1)."""
+    return _textrank(sentences)[0]
+
+
+def _textrank(sentences: List[str]):
+    """(scores, cosine similarity matrix) for the sentences."""
+    import numpy as np
+
+    n = len(sentences)
+    vocab = {}
+    rows, cols = [], []
+    for i, sent in enumerate(sentences):
+        for w in _words(sent):
+            rows.append(i)
+            cols.append(vocab.setdefault(w, len(vocab)))
+    if not vocab:
+        return np.full(n, 1.0 / n), np.zeros((n, n))
+
+    tf = np.zeros((n, len(vocab)))
+    np.add.at(tf, (np.asarray(rows), np.asarray(cols)), 1.0)
+    df = np.count_nonzero(tf, axis=0)
+    idf = np.log((1.0 + n) / (1.0 + df)) + 1.0
+    m = tf * idf
+    norms = np.linalg.norm(m, axis=1, keepdims=True)
+    m = np.divide(m, norms, out=np.zeros_like(m), where=norms > 0)
+
+    cos = m @ m.T
+    sim = cos.copy()
+    np.fill_diagonal(sim, 0.0)
+    out_weight = sim.sum(axis=1, keepdims=True)
+    # Sentences with no overlap link uniformly so the walk stays stochastic
+    trans = np.divide(sim, out_weight, out=np.full_like(sim, 1.0 / n), where=out_weight > 0)
+
+    scores = np.full(n, 1.0 / n)
+    for _ in range(ITERATIONS):
+        nxt = (1.0 - DAMPING) / n + DAMPING * (trans.T @ scores)
+        if np.abs(nxt - scores).sum() < 1e-6:
+            scores = nxt
+            break
+        scores = nxt
+    return scores, cos
+
+
+def summarize(text: str, max_sentences: int = 3, max_chars: int = 500) -> str:
+    """2-3 of the most central sentences, in document order, within max_chars."""
+    sentences = split_sentences(text)[:MAX_SENTENCES]
+    if not sentences:
+        return ""
+    if len(sentences) <= max_sentences and sum(len(s) + 1 for s in sentences) <= max_chars:
+        return " ".join(sentences)
+
+    import numpy as np
+    scores, cos = _textrank(sentences)
+    scores = scores * (1.0 + LEAD_BIAS / (1.0 + np.arange(len(sentences))))
+
+    picked: List[int] = []
+    used = 0
+    for i in np.argsort(-scores, kind="stable"):
+        if len(picked) >= max_sentences:
+            break
+        cost = len(sentences[i]) + (1 if picked else 0)
+        if used + cost > max_chars:
+            continue
+        if picked and cos[i, picked].max() > REDUNDANCY:
+            continue
+        picked.append(int(i))
+        used += cost
+    if not picked:
+        # Every sentence is longer than the budget: cut the best one at a word boundary
+        best = sentences[int(np.argmax(scores))]
+        return best[:max_chars].rsplit(" ", 1)[0]
+    return " ".join(sentences[i] for i in sorted(picked))